@@ -62,12 +62,39 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'ghl_automation.wsgi.application'
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Database: SQLite (db.sqlite3) by default; set POSTGRES_DB to use PostgreSQL instead (needs psycopg)
+if os.environ.get('POSTGRES_DB', '').strip():
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ['POSTGRES_DB'].strip(),
+            'USER': os.environ.get('POSTGRES_USER', ''),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            # Persistent connections: reuse a worker's connection for this many seconds (0 = per request)
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+            # Check a reused connection is still alive before the request uses it
+            'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', 'True').lower() in ('1', 'true', 'yes'),
+            'OPTIONS': {'connect_timeout': int(os.environ.get('POSTGRES_CONNECT_TIMEOUT', '5'))},
+        }
     }
-}
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
+    }
+
+# SQLite PRAGMAs set on every new connection (inbound.db); an empty mode keeps SQLite's default.
+# WAL lets readers run alongside the single writer; busy_timeout makes writers wait for
+# the lock instead of failing with "database is locked"; synchronous=NORMAL is durable
+# in WAL mode except for the last commits on power loss; mmap_size in bytes (0 = off).
+SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'wal').strip().lower()
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'normal').strip().lower()
+SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
 
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -90,6 +117,14 @@ DEEPSEEK_API_KEY = os.environ.get('DEEPSEEK_API_KEY', '')
 # GoHighLevel (GHL) – contact mapping; all keys in .env
 GHL_API_KEY = os.environ.get('GHL_API_KEY', '')
 GHL_LOCATION_ID = os.environ.get('GHL_LOCATION_ID', '')
+# API base URL; point at a local stand-in (python manage.py run_ghl_stub) for load testing
+GHL_API_BASE = os.environ.get('GHL_API_BASE', 'https://services.leadconnectorhq.com').rstrip('/')
+# Contact search: phone and listing searches run concurrently under one deadline, paginated
+GHL_SEARCH_CONCURRENT = os.environ.get('GHL_SEARCH_CONCURRENT', 'True').lower() in ('1', 'true', 'yes')
+GHL_SEARCH_WORKERS = int(os.environ.get('GHL_SEARCH_WORKERS', '8'))
+GHL_SEARCH_DEADLINE = float(os.environ.get('GHL_SEARCH_DEADLINE', '20'))  # seconds, for all pages of both searches
+GHL_SEARCH_PAGE_LIMIT = int(os.environ.get('GHL_SEARCH_PAGE_LIMIT', '100'))
+GHL_SEARCH_MAX_PAGES = int(os.environ.get('GHL_SEARCH_MAX_PAGES', '10'))
 # Optional: GHL custom field IDs (get from Location → Custom Fields in GHL)
 GHL_CUSTOM_FIELD_LISTING_ID = os.environ.get('GHL_CUSTOM_FIELD_LISTING_ID', '')
 GHL_CUSTOM_FIELD_LISTING_NAME = os.environ.get('GHL_CUSTOM_FIELD_LISTING_NAME', '')
@@ -100,8 +135,77 @@ GHL_CUSTOM_FIELD_AMOUNT_TO_INVEST = os.environ.get('GHL_CUSTOM_FIELD_AMOUNT_TO_I
 GHL_CUSTOM_FIELD_LEAD_MESSAGE = os.environ.get('GHL_CUSTOM_FIELD_LEAD_MESSAGE', '')
 # File Upload / Text custom field ID for signed NDA (stores link to PDF)
 GHL_CUSTOM_FIELD_SIGNED_NDA = os.environ.get('GHL_CUSTOM_FIELD_SIGNED_NDA', '')
+# Custom field IDs not set above are resolved by field name from GHL and cached (memory + disk)
+GHL_CUSTOM_FIELD_AUTO_RESOLVE = os.environ.get('GHL_CUSTOM_FIELD_AUTO_RESOLVE', 'True').lower() in ('1', 'true', 'yes')
+GHL_CUSTOM_FIELD_CACHE_PATH = os.environ.get('GHL_CUSTOM_FIELD_CACHE_PATH', str(BASE_DIR / '.ghl_custom_fields.json'))
+GHL_CUSTOM_FIELD_CACHE_TTL = int(os.environ.get('GHL_CUSTOM_FIELD_CACHE_TTL', '3600'))  # seconds
 # Public base URL for NDA links (PDF stored on platform, link saved to GHL)
 NDA_PUBLIC_BASE_URL = os.environ.get('NDA_PUBLIC_BASE_URL', 'http://50.16.97.238').rstrip('/')
+# NDA PDF fill: keep a prepared copy of the template per worker (invalidated when the file changes)
+NDA_TEMPLATE_CACHE = os.environ.get('NDA_TEMPLATE_CACHE', 'True').lower() in ('1', 'true', 'yes')
+# Also compare the template's sha256 on every fill (catches edits that keep mtime and size)
+NDA_TEMPLATE_CACHE_VERIFY_HASH = os.environ.get('NDA_TEMPLATE_CACHE_VERIFY_HASH', 'False').lower() in ('1', 'true', 'yes')
+# 'full' rewrites the whole PDF per fill; 'incremental' appends only changed fields to the template bytes
+NDA_PDF_FILL_MODE = os.environ.get('NDA_PDF_FILL_MODE', 'full')
+# Library used to fill NDA forms: 'pypdf' (honours NDA_PDF_FILL_MODE) or 'pymupdf' (regenerates field appearances)
+NDA_PDF_BACKEND = os.environ.get('NDA_PDF_BACKEND', 'pypdf')
+# Linearize ("fast web view") rendered NDA PDFs in the background (served once cached; needs qpdf and
+# NDA_PDF_CACHE) / the template written by add_nda_form_fields
+NDA_PDF_LINEARIZE = os.environ.get('NDA_PDF_LINEARIZE', 'False').lower() in ('1', 'true', 'yes')
+NDA_TEMPLATE_LINEARIZE = os.environ.get('NDA_TEMPLATE_LINEARIZE', 'False').lower() in ('1', 'true', 'yes')
+NDA_QPDF_PATH = os.environ.get('NDA_QPDF_PATH', 'qpdf')
+# Save signed NDAs flattened (fields baked into the page), garbage-collected and deflated
+NDA_SIGNED_FINALIZE = os.environ.get('NDA_SIGNED_FINALIZE', 'True').lower() in ('1', 'true', 'yes')
+# Signed NDA downloads: '' streams from Django; 'x-accel-redirect' (nginx) or 'x-sendfile' (Apache/lighttpd)
+# hands the file to the web server. The accel prefix must be an nginx "internal" location for nda_signed/.
+NDA_SIGNED_SENDFILE = os.environ.get('NDA_SIGNED_SENDFILE', '')
+NDA_SIGNED_ACCEL_PREFIX = os.environ.get('NDA_SIGNED_ACCEL_PREFIX', '/protected/nda_signed/')
+# Browser cache lifetime (seconds) of signed NDA downloads; sent as private, so shared caches never keep them
+NDA_SIGNED_CACHE_MAX_AGE = int(os.environ.get('NDA_SIGNED_CACHE_MAX_AGE', '3600'))
+# Rendered NDA PDFs keyed by hash of field values + template: 'memory' (per worker LRU), 'disk' (shared) or 'off'
+NDA_PDF_CACHE = os.environ.get('NDA_PDF_CACHE', 'memory')
+NDA_PDF_CACHE_MAX_BYTES = int(os.environ.get('NDA_PDF_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+NDA_PDF_CACHE_DIR = os.environ.get('NDA_PDF_CACHE_DIR', str(BASE_DIR / '.nda_pdf_cache'))
+# Render a contact's NDA into the cache in the background as soon as its GHL contact is created
+NDA_PRERENDER = os.environ.get('NDA_PRERENDER', 'True').lower() in ('1', 'true', 'yes')
+NDA_PRERENDER_WORKERS = int(os.environ.get('NDA_PRERENDER_WORKERS', '1'))
+# Per-contact NDA lookups (latest contact row, NDA answers, viewer form context) read through
+# Django's cache and dropped when the contact or its answers are saved: 'disk' (FileBasedCache in
+# NDA_CONTACT_CACHE_DIR, shared by all workers), 'memory' (LocMemCache per worker; other workers
+# only see a change after NDA_CONTACT_CACHE_TTL, so use it with a single worker) or 'off'
+NDA_CONTACT_CACHE = os.environ.get('NDA_CONTACT_CACHE', 'disk')
+NDA_CONTACT_CACHE_TTL = int(os.environ.get('NDA_CONTACT_CACHE_TTL', '300'))  # seconds
+NDA_CONTACT_CACHE_DIR = os.environ.get('NDA_CONTACT_CACHE_DIR', str(BASE_DIR / '.nda_contact_cache'))
+
+CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+if NDA_CONTACT_CACHE == 'disk':
+    CACHES['nda_contacts'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': NDA_CONTACT_CACHE_DIR,
+        'TIMEOUT': NDA_CONTACT_CACHE_TTL,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+elif NDA_CONTACT_CACHE == 'memory':
+    CACHES['nda_contacts'] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'nda_contacts',
+        'TIMEOUT': NDA_CONTACT_CACHE_TTL,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+
+# Checkpoints of chunked maintenance commands (inbound.management.batch), for --resume
+BATCH_CHECKPOINT_DIR = os.environ.get('BATCH_CHECKPOINT_DIR', str(BASE_DIR / '.batch_checkpoints'))
+
+# archive_emails: where old email bodies go (append-only compressed segments) and the size of each segment
+EMAIL_ARCHIVE_DIR = os.environ.get('EMAIL_ARCHIVE_DIR', str(BASE_DIR / 'email_archive'))
+EMAIL_ARCHIVE_SEGMENT_BYTES = int(os.environ.get('EMAIL_ARCHIVE_SEGMENT_BYTES', str(64 * 1024 * 1024)))
+
+# Heavy modules (fitz, pypdf, requests, openai) load on first use. List them comma-separated, or 'all',
+# to import them at startup instead (useful with gunicorn --preload so forked workers share them)
+PRELOAD_HEAVY_MODULES = os.environ.get('PRELOAD_HEAVY_MODULES', '')
+
+# Optional bearer token required to scrape /metrics (Prometheus); empty = open
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
 
 # Logging: show INFO for inbound app (helps debug NDA upload flow)
 LOGGING = {
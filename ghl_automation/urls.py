@@ -5,7 +5,7 @@ from django.contrib import admin
 from django.urls import path, include
 from django.views.generic import RedirectView
 
-from inbound.views import sendgrid_inbound
+from inbound.views import prometheus_metrics, sendgrid_inbound
 
 urlpatterns = [
     path('', RedirectView.as_view(url='/inbound/nda/contacts/', permanent=False)),
@@ -13,4 +13,6 @@ urlpatterns = [
     path('inbound/', include('inbound.urls')),
     # SendGrid Inbound Parse: support both URL styles
     path('sendgrid/webhook/inbound/', sendgrid_inbound),
+    # Prometheus scrape endpoint (GHL call metrics)
+    path('metrics', prometheus_metrics),
 ]
@@ -1,11 +1,99 @@
+import calendar
+import re
+from datetime import datetime
+
 from django.contrib import admin
-from .models import InboundEmail
+from django.contrib.admin.views.main import ChangeList
+from django.db.models import Max, Min
+from django.utils import timezone
+from .archive import load_bodies
+from .models import LEAD_SOURCES, InboundEmail, NdaSubmission
+from .pagination import EstimatedCountPaginator
+from .search import has_search_index, search_emails
+
+
+class LeadSourceFilter(admin.SimpleListFilter):
+    """lead_source filter with fixed choices (the default one runs SELECT DISTINCT over the table)."""
+    title = 'lead source'
+    parameter_name = 'lead_source'
+
+    def lookups(self, request, model_admin):
+        return [(source, source) for source in LEAD_SOURCES] + [('-', '(none)')]
+
+    def queryset(self, request, queryset):
+        if self.value() == '-':
+            return queryset.filter(lead_source='')
+        if self.value():
+            return queryset.filter(lead_source=self.value())
+        return queryset
+
+
+class ReceivedFilter(admin.SimpleListFilter):
+    """
+    Year/month filter on received_at. Choices span Min to Max of received_at (two index
+    lookups); the built-in date_hierarchy lists them with SELECT DISTINCT over every row.
+    Selecting a year also lists its months.
+    """
+    title = 'received'
+    parameter_name = 'received'
+    value_re = re.compile(r'^(\d{4})(?:-(\d{2}))?$')
+
+    def parsed_value(self):
+        match = self.value_re.match(self.value() or '')
+        if not match:
+            return None, None
+        year, month = int(match.group(1)), int(match.group(2)) if match.group(2) else None
+        if month is not None and not 1 <= month <= 12:
+            return None, None
+        return year, month
+
+    def lookups(self, request, model_admin):
+        queryset = model_admin.get_queryset(request)
+        # Separate aggregates: SQLite only reads an index endpoint for a lone MIN or MAX
+        first = queryset.aggregate(first=Min('received_at'))['first']
+        last = queryset.aggregate(last=Max('received_at'))['last']
+        if first is None:
+            return []
+        first, last = timezone.localtime(first), timezone.localtime(last)
+        selected_year, _ = self.parsed_value()
+        choices = []
+        for year in range(last.year, first.year - 1, -1):
+            choices.append((str(year), str(year)))
+            if year == selected_year:
+                months = range(1 if year > first.year else first.month, (12 if year < last.year else last.month) + 1)
+                choices += [(f'{year}-{month:02d}', f'{calendar.month_name[month]} {year}') for month in months]
+        return choices
+
+    def queryset(self, request, queryset):
+        year, month = self.parsed_value()
+        if year is None:
+            return queryset
+        if month is None:
+            start, end = datetime(year, 1, 1), datetime(year + 1, 1, 1)
+        else:
+            start = datetime(year, month, 1)
+            end = datetime(year + month // 12, month % 12 + 1, 1)
+        # Bounded range on inbound_received_at_idx
+        return queryset.filter(received_at__gte=timezone.make_aware(start), received_at__lt=timezone.make_aware(end))
+
+
+class InboundEmailChangeList(ChangeList):
+    def get_queryset(self, request, *args, **kwargs):
+        # Read only the listed columns; bodies and JSON stay on disk
+        return super().get_queryset(request, *args, **kwargs).only('pk', *self.model_admin.changelist_columns)
 
 
 @admin.register(InboundEmail)
 class InboundEmailAdmin(admin.ModelAdmin):
     list_display = ('subject', 'lead_source', 'from_address', 'name', 'listing_id', 'ghl_contact_id', 'received_at')
-    list_filter = ('received_at', 'lead_source')
+    # Columns the changelist loads (list_display fields)
+    changelist_columns = list_display
+    # No date_hierarchy: it lists dates with SELECT DISTINCT over the table (ReceivedFilter instead)
+    list_filter = (LeadSourceFilter, ReceivedFilter)
+    # Estimated total for the unfiltered list and no second COUNT(*) for "N total"
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # LIKE fallback when the FTS5 index is missing (see get_search_results)
     search_fields = (
         'from_address', 'to_address', 'subject', 'text_body', 'name', 'email',
         'listing_id', 'listing_name', 'ref_id', 'original_email_message_id',
@@ -16,5 +104,35 @@ class InboundEmailAdmin(admin.ModelAdmin):
         'lead_source', 'listing_id', 'listing_name', 'listing_profit',
         'name', 'email', 'phone', 'purchase_timeframe', 'amount_to_invest',
         'lead_message', 'ref_id', 'email_title', 'time_horizon',
-        'parsed_at', 'raw_parsed', 'ghl_contact_id',
+        'parsed_at', 'raw_parsed', 'ghl_contact_id', 'body_segment', 'body_offset',
     )
+
+    def get_changelist(self, request, **kwargs):
+        return InboundEmailChangeList
+
+    def get_object(self, request, object_id, from_field=None):
+        # Show archived bodies (archive_emails) as if they were still in the row
+        obj = super().get_object(request, object_id, from_field)
+        return load_bodies(obj) if obj is not None else None
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            return super().save_model(request, obj, form, change)
+        # Write only the changed columns: a full save() would write archived bodies (loaded
+        # for display by get_object) back into the row and re-index it for search
+        fields = [f for f in form.changed_data if not (obj.body_segment and f in ('text_body', 'html_body'))]
+        if fields:
+            obj.save(update_fields=fields)
+
+    def get_search_results(self, request, queryset, search_term):
+        # One FTS5 MATCH instead of a LIKE '%term%' scan per search field
+        if search_term and has_search_index(queryset.db):
+            return search_emails(queryset, search_term), False
+        return super().get_search_results(request, queryset, search_term)
+
+
+@admin.register(NdaSubmission)
+class NdaSubmissionAdmin(admin.ModelAdmin):
+    list_display = ('contact_id', 'listing_id', 'signature', 'city', 'state', 'updated_at')
+    search_fields = ('contact_id', 'listing_id', 'signature', 'partner_name')
+    readonly_fields = ('created_at', 'updated_at')
@@ -5,3 +5,15 @@ class InboundConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'inbound'
     verbose_name = 'Inbound Email'
+
+    def ready(self):
+        from django.conf import settings
+
+        from . import db  # noqa: F401 - connects the SQLite PRAGMA hook (connection_created)
+        from . import nda  # noqa: F401 - connects the contact_synced pre-render receiver
+        from .lazy import preload
+
+        # Heavy modules are lazy by default; preload them here for fork-time warm-up (gunicorn --preload)
+        modules = getattr(settings, 'PRELOAD_HEAVY_MODULES', '')
+        if modules:
+            preload(modules)
@@ -0,0 +1,156 @@
+"""
+Cold storage for old email bodies: append-only, compressed segment files.
+
+archive_emails moves text_body/html_body of old emails into segment files under
+EMAIL_ARCHIVE_DIR (bodies-000001.seg, ...) and leaves a pointer on the row
+(body_segment, body_offset), so the database keeps only the small, hot columns.
+Segments are only ever appended to; a new one is started once the current one
+reaches EMAIL_ARCHIVE_SEGMENT_BYTES.
+
+Each record is a header (magic, email id, payload length) followed by the zlib
+compressed JSON {"text_body": ..., "html_body": ...}. The email id in the header lets
+readers check the pointer lands on the right record. Bytes written by a run that
+stopped before its database update are never pointed to and are simply skipped.
+
+load_bodies(email) puts archived bodies back on an instance (not saved), so views
+read them as if they had never moved.
+"""
+
+import json
+import logging
+import os
+import re
+import struct
+import zlib
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"EMB1"
+HEADER = struct.Struct(">4sQI")  # magic, email id, compressed payload length
+SEGMENT_RE = re.compile(r"^bodies-(\d{6})\.seg$")
+
+
+class ArchiveError(Exception):
+    """An archived body pointer does not lead to a valid record."""
+
+
+def archive_dir():
+    return Path(getattr(settings, "EMAIL_ARCHIVE_DIR", Path(settings.BASE_DIR) / "email_archive"))
+
+
+def encode_record(email_id, text_body, html_body):
+    payload = zlib.compress(json.dumps({"text_body": text_body, "html_body": html_body}).encode(), 9)
+    return HEADER.pack(MAGIC, email_id, len(payload)) + payload
+
+
+def _try_lock(f):
+    """Take a non-blocking exclusive lock on open file f; False if another process holds it."""
+    try:
+        import fcntl
+    except ImportError:  # Windows
+        import msvcrt
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            return False
+        return True
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+class SegmentWriter:
+    """
+    Appends records to the newest segment, rolling over to a new file at max_bytes.
+    Holds an exclusive lock on the archive directory while open, so only one writer runs.
+    """
+
+    def __init__(self, directory=None, max_bytes=None):
+        self.directory = Path(directory or archive_dir())
+        self.max_bytes = max_bytes or int(getattr(settings, "EMAIL_ARCHIVE_SEGMENT_BYTES", 64 * 1024 * 1024))
+        self._lock = None
+        self._file = None
+        self.name = None
+        self.bytes_written = 0
+
+    def __enter__(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = open(self.directory / ".lock", "w")
+        if not _try_lock(self._lock):
+            self._lock.close()
+            raise ArchiveError(f"Another archive run holds {self.directory / '.lock'}")
+        numbers = [int(m.group(1)) for m in map(SEGMENT_RE.match, os.listdir(self.directory)) if m]
+        self._open(max(numbers, default=1))
+        return self
+
+    def _open(self, number):
+        if self._file is not None:
+            self._file.close()
+        self.name = f"bodies-{number:06d}.seg"
+        self._file = open(self.directory / self.name, "ab")
+
+    def append(self, email_id, text_body, html_body):
+        """Append one email's bodies; returns (segment name, offset) for the row."""
+        record = encode_record(email_id, text_body, html_body)
+        offset = self._file.tell()
+        if offset and offset + len(record) > self.max_bytes:
+            self._open(int(SEGMENT_RE.match(self.name).group(1)) + 1)
+            offset = self._file.tell()
+        self._file.write(record)
+        self.bytes_written += len(record)
+        return self.name, offset
+
+    def sync(self):
+        """Flush and fsync, so records are durable before the rows point to them."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def __exit__(self, *exc):
+        try:
+            if self._file is not None:
+                self.sync()
+                self._file.close()
+        finally:
+            self._lock.close()
+        return False
+
+
+def read_bodies(email_id, segment, offset, directory=None):
+    """(text_body, html_body) of the record at segment/offset, checked against email_id."""
+    if not SEGMENT_RE.match(segment or ""):
+        raise ArchiveError(f"Invalid segment name {segment!r}")
+    path = Path(directory or archive_dir()) / segment
+    with open(path, "rb") as f:
+        f.seek(offset)
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ArchiveError(f"{segment}@{offset}: truncated record")
+        magic, record_id, length = HEADER.unpack(header)
+        if magic != MAGIC or record_id != email_id:
+            raise ArchiveError(f"{segment}@{offset}: expected email {email_id}, found {magic!r}/{record_id}")
+        payload = f.read(length)
+    if len(payload) < length:
+        raise ArchiveError(f"{segment}@{offset}: truncated record")
+    data = json.loads(zlib.decompress(payload))
+    return data.get("text_body", ""), data.get("html_body", "")
+
+
+def load_bodies(email):
+    """
+    Put an archived email's bodies back on the instance (in memory only) and return it.
+    No-op for emails that are not archived. On a missing or corrupt record the bodies
+    stay empty and the error is logged.
+    """
+    if not email.body_segment:
+        return email
+    try:
+        email.text_body, email.html_body = read_bodies(email.pk, email.body_segment, email.body_offset or 0)
+    except (OSError, ArchiveError, ValueError, zlib.error) as e:
+        logger.error("Archived body of email %s unreadable (%s@%s): %s",
+                     email.pk, email.body_segment, email.body_offset, e)
+    return email
@@ -0,0 +1,53 @@
+"""
+Per-connection SQLite tuning for several workers writing to one database file.
+
+Django 4.2 has no SQLite init command, so configure_sqlite runs the PRAGMAs from
+settings (SQLITE_JOURNAL_MODE, SQLITE_BUSY_TIMEOUT_MS, SQLITE_SYNCHRONOUS,
+SQLITE_MMAP_SIZE) on connection_created. Other database vendors are left alone.
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_MODES = ("delete", "truncate", "persist", "memory", "wal", "off")
+SYNCHRONOUS_LEVELS = ("off", "normal", "full", "extra")
+
+
+def sqlite_pragmas():
+    """PRAGMA statements for a new SQLite connection, built from settings."""
+    statements = []
+    journal_mode = getattr(settings, "SQLITE_JOURNAL_MODE", "")
+    if journal_mode:
+        if journal_mode not in JOURNAL_MODES:
+            raise ImproperlyConfigured(
+                f"SQLITE_JOURNAL_MODE must be one of {', '.join(JOURNAL_MODES)}, not {journal_mode!r}"
+            )
+        statements.append(f"PRAGMA journal_mode={journal_mode}")
+    statements.append(f"PRAGMA busy_timeout={int(getattr(settings, 'SQLITE_BUSY_TIMEOUT_MS', 5000))}")
+    synchronous = getattr(settings, "SQLITE_SYNCHRONOUS", "")
+    if synchronous:
+        if synchronous not in SYNCHRONOUS_LEVELS:
+            raise ImproperlyConfigured(
+                f"SQLITE_SYNCHRONOUS must be one of {', '.join(SYNCHRONOUS_LEVELS)}, not {synchronous!r}"
+            )
+        statements.append(f"PRAGMA synchronous={synchronous}")
+    statements.append(f"PRAGMA mmap_size={int(getattr(settings, 'SQLITE_MMAP_SIZE', 0))}")
+    return statements
+
+
+@receiver(connection_created, dispatch_uid="inbound.db.configure_sqlite")
+def configure_sqlite(sender, connection, **kwargs):
+    """Apply sqlite_pragmas() to each new SQLite connection."""
+    if connection.vendor != "sqlite":
+        return
+    statements = sqlite_pragmas()
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+    logger.debug("SQLite connection configured: %s", "; ".join(statements))
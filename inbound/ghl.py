@@ -6,25 +6,44 @@ Maps extracted lead fields to GHL contact:
 - Custom fields: listing_id, listing_name, ref_id, lead_source, purchase_timeframe, amount_to_invest, lead_message
 
 If a contact already exists (matched by listing_id and phone), we update it; otherwise we create via upsert.
+Updates are diffed against a per-contact snapshot of the last values pushed (GhlContactSnapshot),
+so only changed fields are sent and unchanged contacts cost no API call.
 All configuration (API key, location ID, custom field IDs) is read from settings, which loads from .env.
+Custom field IDs that are not set in .env are resolved by field name (see ghl_fields).
 """
 
 import json
 import logging
 import re
+import threading
+import time
 import urllib.request
 import urllib.error
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
 
-import requests
-
 from django.conf import settings
+from django.db import DatabaseError, transaction
+
+from . import metrics
+from .ghl_fields import custom_field_id
+from .lazy import lazy_import
+from .models import GhlContactSnapshot
+from .signals import contact_synced
 
 logger = logging.getLogger(__name__)
 
-# GHL API v2 (v1 rest.gohighlevel.com returns 404)
+# Only add_contact_tag uses requests; load it on first use (see inbound.lazy)
+requests = lazy_import("requests")
+
+# GHL API v2 (v1 rest.gohighlevel.com returns 404); settings.GHL_API_BASE overrides (e.g. local stub)
 GHL_API_BASE = "https://services.leadconnectorhq.com"
 
+# Seconds per GHL request (per socket operation); contact searches cap it at their deadline
+REQUEST_TIMEOUT = 15
+
 GHL_HEADERS = {
     "Content-Type": "application/json",
     "Accept": "application/json",
@@ -33,6 +52,10 @@ GHL_HEADERS = {
 }
 
 
+def api_base():
+    """Base URL for GHL API calls (settings.GHL_API_BASE, e.g. a local ghl_stub, or the real API)."""
+    return (getattr(settings, "GHL_API_BASE", None) or GHL_API_BASE).rstrip("/")
+
 
 def _split_name(full_name):
     """Split full name into first name and last name (GHL has separate fields)."""
@@ -60,39 +83,171 @@ def _normalize_phone(phone):
     return "+" + digits
 
 
-def _ghl_request(api_key, method, path, data=None):
+def _endpoint_template(path):
+    """Collapse IDs in an API path so metrics have bounded cardinality (/contacts/abc -> /contacts/{contactId})."""
+    path = path.split("?", 1)[0]
+    path = re.sub(r"^/contacts/(?!search(?:/|$))[^/]+", "/contacts/{contactId}", path)
+    path = re.sub(r"^/locations/[^/]+", "/locations/{locationId}", path)
+    return path
+
+
+def _status_class(status):
+    # 429 gets its own label so GHL rate limiting can be alerted on apart from other 4xx
+    if status == 429:
+        return "429"
+    return f"{status // 100}xx" if status and status > 0 else "error"
+
+
+def _retry_after_seconds(headers):
+    """Seconds from a Retry-After header (delay-seconds or HTTP date), or None when absent or invalid."""
+    value = (headers.get("Retry-After") or "").strip() if headers is not None else ""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def _send_instrumented(method, path, send):
+    """
+    Run send() (one HTTP attempt returning (status, data, response headers or None)) and
+    record its latency, status class and in-flight count, plus the Retry-After GHL asks
+    for on a 429. Returns (status, data). No retries: callers run inside web requests and
+    handle failures themselves.
+    """
+    endpoint = _endpoint_template(path)
+    metrics.GHL_IN_FLIGHT.inc()
+    started = time.monotonic()
+    try:
+        status, data, headers = send()
+    finally:
+        metrics.GHL_IN_FLIGHT.dec()
+    metrics.GHL_REQUEST_DURATION.observe(time.monotonic() - started, endpoint=endpoint, method=method)
+    metrics.GHL_REQUESTS.inc(endpoint=endpoint, method=method, status_class=_status_class(status))
+    if status == 429:
+        retry_after = _retry_after_seconds(headers)
+        metrics.GHL_RATE_LIMITED.inc(endpoint=endpoint, method=method)
+        if retry_after is not None:
+            metrics.GHL_RATE_LIMIT_RETRY_AFTER.inc(retry_after, endpoint=endpoint)
+        logger.warning("GHL rate limited %s %s (Retry-After: %s)", method, endpoint,
+                       "none" if retry_after is None else f"{retry_after:g}s")
+    return status, data
+
+
+def _ghl_request(api_key, method, path, data=None, timeout=REQUEST_TIMEOUT):
     """Make a request to GHL API; returns (status_code, response_dict or None)."""
-    url = f"{GHL_API_BASE}{path}"
+    url = f"{api_base()}{path}"
     headers = {**GHL_HEADERS, "Authorization": f"Bearer {api_key}"}
     body = json.dumps(data).encode("utf-8") if data is not None else None
-    req = urllib.request.Request(url, data=body, headers=headers, method=method)
-    try:
-        with urllib.request.urlopen(req, timeout=15) as resp:
-            raw = resp.read().decode()
-            return resp.status, (json.loads(raw) if raw.strip() else {})
-    except urllib.error.HTTPError as e:
-        raw = e.read().decode()
+
+    def _send():
+        req = urllib.request.Request(url, data=body, headers=headers, method=method)
         try:
-            return e.code, json.loads(raw) if raw.strip() else {}
-        except Exception:
-            return e.code, {}
-    except (OSError, ValueError) as e:
-        logger.debug("GHL request error: %s", e)
-        return -1, None
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                raw = resp.read().decode()
+                return resp.status, (json.loads(raw) if raw.strip() else {}), resp.headers
+        except urllib.error.HTTPError as e:
+            raw = e.read().decode()
+            try:
+                return e.code, (json.loads(raw) if raw.strip() else {}), e.headers
+            except Exception:
+                return e.code, {}, e.headers
+        except (OSError, ValueError) as e:
+            logger.debug("GHL request error: %s", e)
+            return -1, None, None
+
+    return _send_instrumented(method, path, _send)
+
+
+def _search_all_pages(api_key, body, deadline):
+    """
+    POST /contacts/search page by page until a short page, the reported total,
+    GHL_SEARCH_MAX_PAGES or the deadline. Returns the concatenated contacts list.
+    Each request's timeout is capped at the time left, so no page runs past the deadline.
+    """
+    page_limit = int(getattr(settings, "GHL_SEARCH_PAGE_LIMIT", 100) or 100)
+    max_pages = int(getattr(settings, "GHL_SEARCH_MAX_PAGES", 10) or 1)
+    out = []
+    for page in range(1, max_pages + 1):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            logger.warning("GHL contact search hit deadline after %s page(s); results may be incomplete", page - 1)
+            break
+        status, data = _ghl_request(
+            api_key, "POST", "/contacts/search", {**body, "page": page, "pageLimit": page_limit},
+            timeout=min(REQUEST_TIMEOUT, remaining),
+        )
+        if status != 200 or data is None:
+            break
+        contacts = data.get("contacts") or data.get("contact") or []
+        if isinstance(contacts, dict):
+            contacts = [contacts]
+        out.extend(contacts)
+        total = data.get("total")
+        if len(contacts) < page_limit or (isinstance(total, int) and len(out) >= total):
+            break
+    return out
+
+
+_search_pool = None
+_search_pool_lock = threading.Lock()
+
+
+def _get_search_pool():
+    global _search_pool
+    with _search_pool_lock:
+        if _search_pool is None:
+            workers = int(getattr(settings, "GHL_SEARCH_WORKERS", 8) or 2)
+            _search_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ghl-search")
+        return _search_pool
+
+
+def _run_concurrently(calls, deadline):
+    """
+    Run {name: (fn, kwargs)} on the shared search pool and collect {name: result}.
+    A call that has not finished by the deadline yields [] (treated like a failed search)
+    and its late result is discarded; it stops soon after, as _search_all_pages caps
+    each request at the deadline.
+    With GHL_SEARCH_CONCURRENT off, calls run one after the other (used for benchmarks).
+    """
+    if not getattr(settings, "GHL_SEARCH_CONCURRENT", True) or len(calls) < 2:
+        return {name: fn(**kwargs) for name, (fn, kwargs) in calls.items()}
+    pool = _get_search_pool()
+    futures = {name: pool.submit(fn, **kwargs) for name, (fn, kwargs) in calls.items()}
+    results = {}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FuturesTimeout:
+            # Drop it from the pool queue if it never started
+            future.cancel()
+            logger.warning("GHL contact search %r did not finish before the deadline", name)
+            results[name] = []
+    return results
 
 
 def _search_contact_by_phone_and_listing(api_key, location_id, phone, listing_id):
     """
     Search for an existing contact that matches BOTH phone AND listing_id.
-    Does two separate API searches (by phone, by listing_id), then returns a contact id
-    only if it appears in both result sets and has both fields matching. Otherwise None
-    so caller will create a new contact.
+    Does two separate API searches (by phone, by listing_id), issued concurrently and
+    paginated, then returns a contact id only if it appears in both result sets and has
+    both fields matching. Otherwise None so caller will create a new contact.
     """
     if not phone and not listing_id:
         return None
     query_phone = _normalize_phone(phone) if phone else ""
     listing_str = (listing_id or "").strip()[:100]
-    listing_field_id = getattr(settings, "GHL_CUSTOM_FIELD_LISTING_ID", None) or ""
+    listing_field_id = custom_field_id("GHL_CUSTOM_FIELD_LISTING_ID")
+
+    deadline = time.monotonic() + float(getattr(settings, "GHL_SEARCH_DEADLINE", 20) or 20)
 
     def _run_search(phone_only=False, query_only=None):
         body = {"locationId": location_id}
@@ -100,17 +255,18 @@ def _search_contact_by_phone_and_listing(api_key, location_id, phone, listing_id
             body["phone"] = query_phone
         if query_only is not None:
             body["query"] = query_only[:100]
-        status, data = _ghl_request(api_key, "POST", "/contacts/search", body)
-        if status != 200 or data is None:
-            return []
-        contacts = data.get("contacts") or data.get("contact") or []
-        if isinstance(contacts, dict):
-            contacts = [contacts]
-        return contacts
-
-    # Require both to match: get contacts that have this phone AND contacts that have this listing_id
-    by_phone = {c.get("id"): c for c in _run_search(phone_only=True) if c.get("id")} if query_phone else {}
-    by_listing = {c.get("id"): c for c in _run_search(query_only=listing_str) if c.get("id")} if listing_str else {}
+        return _search_all_pages(api_key, body, deadline)
+
+    # Require both to match: get contacts that have this phone AND contacts that have this listing_id.
+    # The two searches are independent, so run them concurrently under one deadline.
+    searches = {}
+    if query_phone:
+        searches["phone"] = (_run_search, {"phone_only": True})
+    if listing_str:
+        searches["listing"] = (_run_search, {"query_only": listing_str})
+    results = _run_concurrently(searches, deadline)
+    by_phone = {c.get("id"): c for c in results.get("phone", []) if c.get("id")}
+    by_listing = {c.get("id"): c for c in results.get("listing", []) if c.get("id")}
 
     # When we have both phone and listing_id: contact must be in BOTH result sets
     if query_phone and listing_str:
@@ -174,32 +330,39 @@ def _search_contact_by_phone_and_listing(api_key, location_id, phone, listing_id
 
 def _custom_fields(email, include_empty_ref_id=False):
     """Build customFields array for GHL from InboundEmail and settings.
-    When include_empty_ref_id is True, always include ref_id when env is set (so update overwrites it).
+    Field IDs come from GHL_CUSTOM_FIELD_* settings, or are resolved by field name.
+    When include_empty_ref_id is True, always include ref_id when the field exists (so update overwrites it).
     """
     out = []
-    cfg = settings
     # listing_id -> contact.listing_id
-    if getattr(cfg, "GHL_CUSTOM_FIELD_LISTING_ID", None) and email.listing_id:
-        out.append({"id": cfg.GHL_CUSTOM_FIELD_LISTING_ID, "value": email.listing_id})
+    field_id = custom_field_id("GHL_CUSTOM_FIELD_LISTING_ID")
+    if field_id and email.listing_id:
+        out.append({"id": field_id, "value": email.listing_id})
     # listing_name -> contact.listing_name
-    if getattr(cfg, "GHL_CUSTOM_FIELD_LISTING_NAME", None) and email.listing_name:
-        out.append({"id": cfg.GHL_CUSTOM_FIELD_LISTING_NAME, "value": email.listing_name})
-    # ref_id - always include when env set if include_empty_ref_id (for updates)
-    if getattr(cfg, "GHL_CUSTOM_FIELD_REF_ID", None):
+    field_id = custom_field_id("GHL_CUSTOM_FIELD_LISTING_NAME")
+    if field_id and email.listing_name:
+        out.append({"id": field_id, "value": email.listing_name})
+    # ref_id - always include when field exists if include_empty_ref_id (for updates)
+    field_id = custom_field_id("GHL_CUSTOM_FIELD_REF_ID")
+    if field_id:
         if email.ref_id or include_empty_ref_id:
-            out.append({"id": cfg.GHL_CUSTOM_FIELD_REF_ID, "value": (email.ref_id or "").strip()})
+            out.append({"id": field_id, "value": (email.ref_id or "").strip()})
     # lead_source
-    if getattr(cfg, "GHL_CUSTOM_FIELD_LEAD_SOURCE", None) and email.lead_source:
-        out.append({"id": cfg.GHL_CUSTOM_FIELD_LEAD_SOURCE, "value": email.lead_source})
+    field_id = custom_field_id("GHL_CUSTOM_FIELD_LEAD_SOURCE")
+    if field_id and email.lead_source:
+        out.append({"id": field_id, "value": email.lead_source})
     # purchase_timeframe
-    if getattr(cfg, "GHL_CUSTOM_FIELD_PURCHASE_TIMEFRAME", None) and email.purchase_timeframe:
-        out.append({"id": cfg.GHL_CUSTOM_FIELD_PURCHASE_TIMEFRAME, "value": email.purchase_timeframe})
+    field_id = custom_field_id("GHL_CUSTOM_FIELD_PURCHASE_TIMEFRAME")
+    if field_id and email.purchase_timeframe:
+        out.append({"id": field_id, "value": email.purchase_timeframe})
     # amount_to_invest
-    if getattr(cfg, "GHL_CUSTOM_FIELD_AMOUNT_TO_INVEST", None) and email.amount_to_invest:
-        out.append({"id": cfg.GHL_CUSTOM_FIELD_AMOUNT_TO_INVEST, "value": email.amount_to_invest})
+    field_id = custom_field_id("GHL_CUSTOM_FIELD_AMOUNT_TO_INVEST")
+    if field_id and email.amount_to_invest:
+        out.append({"id": field_id, "value": email.amount_to_invest})
     # lead_message (may be long; GHL text area supports up to 5000)
-    if getattr(cfg, "GHL_CUSTOM_FIELD_LEAD_MESSAGE", None) and email.lead_message:
-        out.append({"id": cfg.GHL_CUSTOM_FIELD_LEAD_MESSAGE, "value": (email.lead_message or "")[:5000]})
+    field_id = custom_field_id("GHL_CUSTOM_FIELD_LEAD_MESSAGE")
+    if field_id and email.lead_message:
+        out.append({"id": field_id, "value": (email.lead_message or "")[:5000]})
     return out
 
 
@@ -260,6 +423,16 @@ def sync_contact_to_ghl(email):
         contact_id = (data.get("contact") or {}).get("id") or data.get("id")
         if contact_id:
             logger.info("GHL contact created for inbound email id=%s, GHL contact id=%s", email.pk, contact_id)
+            record_contact_snapshot(
+                contact_id,
+                {k: payload[k] or "" for k in ("firstName", "lastName", "email", "phone")},
+                {cf["id"]: cf["value"] for cf in custom},
+            )
+            for receiver_fn, result in contact_synced.send_robust(
+                sender=email.__class__, contact_id=contact_id, email=email,
+            ):
+                if isinstance(result, Exception):
+                    logger.warning("contact_synced receiver %r failed: %s", receiver_fn, result)
             return contact_id
         logger.warning("GHL POST /contacts/ returned %s but no contact id in response: %s", status, data)
     else:
@@ -271,6 +444,93 @@ def sync_contact_to_ghl(email):
     return None
 
 
+def _standard_fields(email, answers=None):
+    """GHL standard contact fields from an InboundEmail and its NDA answers (address)."""
+    first_name, last_name = _split_name(email.name or "")
+    phone_raw = (email.phone or "").strip()
+    extra = answers or {}
+    return {
+        "firstName": first_name,
+        "lastName": last_name,
+        "email": (email.email or "").strip(),
+        "phone": _normalize_phone(phone_raw) or phone_raw,
+        "address1": str(extra.get("street_address") or "").strip(),
+        "city": str(extra.get("city") or "").strip(),
+        "state": str(extra.get("state") or "").strip(),
+        "postalCode": str(extra.get("zip") or "").strip(),
+    }
+
+
+def _changed_values(previous, current):
+    """Keys of current whose value differs from previous (a missing key counts as "")."""
+    return {k: v for k, v in current.items() if str(previous.get(k, "")) != v}
+
+
+def _update_payload(standard, custom):
+    payload = dict(standard)
+    if custom:
+        payload["customFields"] = [{"id": fid, "value": value} for fid, value in custom.items()]
+    return payload
+
+
+def record_contact_snapshot(contact_id, standard=None, custom=None):
+    """Merge values now known to be on the GHL contact into its snapshot."""
+    try:
+        with transaction.atomic():
+            # Write first: SQLite ignores FOR UPDATE and starts the transaction as a reader, so
+            # reading first fails at once ("database is locked") when another connection writes
+            # before our upgrade. An UPDATE takes the write lock up front (waiting busy_timeout).
+            GhlContactSnapshot.objects.filter(contact_id=contact_id).update(updated_at=datetime.now(timezone.utc))
+            snapshot, _ = GhlContactSnapshot.objects.select_for_update().get_or_create(contact_id=contact_id)
+            snapshot.standard_fields = {**(snapshot.standard_fields or {}), **(standard or {})}
+            snapshot.custom_fields = {**(snapshot.custom_fields or {}), **(custom or {})}
+            snapshot.save(update_fields=["standard_fields", "custom_fields", "updated_at"])
+    except DatabaseError as e:
+        logger.warning("Could not record GHL snapshot for contact %s: %s", contact_id, e)
+
+
+def update_contact_in_ghl(contact_id, location_id, standard=None, custom=None):
+    """
+    Push standard fields (firstName, city, ...) and custom fields ({field_id: value}) to a
+    GHL contact, sending only values that differ from its snapshot. Empty standard values
+    are never sent (NDA edits do not clear GHL fields). Skips the API call entirely when
+    nothing changed. Returns True when GHL is up to date, False on error.
+    """
+    api_key = getattr(settings, "GHL_API_KEY", None) or ""
+    if not api_key or not location_id:
+        logger.info("GHL contact update skipped: GHL_API_KEY or GHL_LOCATION_ID not set")
+        return False
+    standard = {k: str(v).strip() for k, v in (standard or {}).items() if v}
+    custom = {fid: "" if v is None else str(v) for fid, v in (custom or {}).items() if fid}
+
+    snapshot = GhlContactSnapshot.objects.filter(contact_id=contact_id).first()
+    changed_standard = _changed_values(snapshot.standard_fields if snapshot else {}, standard)
+    changed_custom = _changed_values(snapshot.custom_fields if snapshot else {}, custom)
+    full_size = len(json.dumps(_update_payload(standard, custom)))
+    unchanged = len(standard) + len(custom) - len(changed_standard) - len(changed_custom)
+    metrics.GHL_CONTACT_UPDATE_FIELDS.inc(unchanged, outcome="unchanged")
+
+    if not changed_standard and not changed_custom:
+        metrics.GHL_CONTACT_UPDATES.inc(result="skipped")
+        metrics.GHL_CONTACT_UPDATE_BYTES_AVOIDED.inc(full_size)
+        logger.info("GHL contact %s unchanged; update skipped", contact_id)
+        return True
+
+    payload = _update_payload(changed_standard, changed_custom)
+    status, data = _ghl_request(api_key, "PUT", f"/contacts/{contact_id}?locationId={location_id}", payload)
+    if status not in (200, 201):
+        metrics.GHL_CONTACT_UPDATES.inc(result="failed")
+        logger.warning("GHL contact update failed: status=%s body=%s", status, str(data)[:300] if data else "")
+        return False
+    metrics.GHL_CONTACT_UPDATES.inc(result="sent")
+    metrics.GHL_CONTACT_UPDATE_FIELDS.inc(len(changed_standard) + len(changed_custom), outcome="sent")
+    metrics.GHL_CONTACT_UPDATE_BYTES_AVOIDED.inc(max(0, full_size - len(json.dumps(payload))))
+    logger.info("GHL contact %s updated: fields=%s", contact_id,
+                sorted(changed_standard) + [f"custom:{fid}" for fid in changed_custom])
+    record_contact_snapshot(contact_id, changed_standard, changed_custom)
+    return True
+
+
 NDA_SIGNED_TAG = "NDA_Signed"
 
 
@@ -285,7 +545,7 @@ def add_contact_tag(contact_id, tag):
         logger.info("GHL add tag skipped: GHL_API_KEY not set")
         return False
 
-    url = f"{GHL_API_BASE}/contacts/{contact_id}/tags"
+    url = f"{api_base()}/contacts/{contact_id}/tags"
     headers = {
         "Authorization": f"Bearer {api_key}",
         "Version": "2021-07-28",
@@ -294,52 +554,67 @@ def add_contact_tag(contact_id, tag):
     }
     body = {"tags": [tag]}
 
-    try:
-        resp = requests.post(url, headers=headers, json=body, timeout=15)
-    except requests.RequestException as e:
-        logger.exception("GHL add tag request failed: %s", e)
+    def _send():
+        try:
+            resp = requests.post(url, headers=headers, json=body, timeout=REQUEST_TIMEOUT)
+        except requests.RequestException as e:
+            logger.exception("GHL add tag request failed: %s", e)
+            return -1, None, None
+        return resp.status_code, resp, resp.headers
+
+    status, resp = _send_instrumented("POST", f"/contacts/{contact_id}/tags", _send)
+    if resp is None:
         return False
 
-    if resp.status_code in (200, 201):
+    if status in (200, 201):
         logger.info("Added tag %r to GHL contact %s", tag, contact_id)
         return True
 
-    logger.warning("GHL add tag failed: status=%s body=%s", resp.status_code, resp.text[:300] if resp.text else "")
+    logger.warning("GHL add tag failed: status=%s body=%s", status, resp.text[:300] if resp.text else "")
     return False
 
 
-def set_nda_link_on_contact(filename, contact_id, location_id):
+def set_nda_link_on_contact(filename, contact_id, location_id, contact=None, answers=None):
     """
     Store the NDA link on the GHL contact's custom field.
     PDF is stored on platform (static/S3); we save the public URL to GHL.
+    When the local contact (InboundEmail) is given, fields edited on the NDA (name, email,
+    address from answers, ...) go out in the same update; only values that changed are sent.
     """
     logger.info("[NDA] set_nda_link_on_contact called: contact_id=%s file=%s", contact_id, filename)
     api_key = getattr(settings, "GHL_API_KEY", None) or ""
-    field_id = getattr(settings, "GHL_CUSTOM_FIELD_SIGNED_NDA", None) or ""
     base_url = getattr(settings, "NDA_PUBLIC_BASE_URL", "") or "http://50.16.97.238"
     base_url = str(base_url).rstrip("/")
     if not api_key or not location_id:
         logger.info("GHL NDA link skipped: GHL_API_KEY or GHL_LOCATION_ID not set")
         return False
+    field_id = custom_field_id("GHL_CUSTOM_FIELD_SIGNED_NDA")
     if not field_id:
         logger.info(
-            "GHL NDA link skipped: GHL_CUSTOM_FIELD_SIGNED_NDA not set "
+            "GHL NDA link skipped: GHL_CUSTOM_FIELD_SIGNED_NDA not set and no 'Signed NDA' custom field found "
             "(create custom field in GHL for Signed NDA link)"
         )
         return False
 
     # Public URL via Django view (works without static file serving)
     nda_url = f"{base_url}/inbound/nda/signed/{filename}"
-    payload = {"customFields": [{"id": field_id, "value": nda_url}]}
-    status, data = _ghl_request(api_key, "PUT", f"/contacts/{contact_id}?locationId={location_id}", payload)
-    if status in (200, 201):
+    standard, custom = {}, {}
+    if contact is not None:
+        standard = _standard_fields(contact, answers)
+        # lead_message is the lead's original inquiry; the NDA form never changes it
+        lead_message_field = custom_field_id("GHL_CUSTOM_FIELD_LEAD_MESSAGE")
+        custom = {
+            cf["id"]: cf["value"] for cf in _custom_fields(contact, include_empty_ref_id=True)
+            if cf["id"] != lead_message_field
+        }
+    custom[field_id] = nda_url
+    if update_contact_in_ghl(contact_id, location_id, standard, custom):
         logger.info("Set NDA link on GHL contact %s: %s", contact_id, nda_url)
         return True
-    logger.warning("GHL contact update failed: status=%s body=%s", status, str(data)[:300] if data else "")
     return False
 
 
-def on_nda_signed(contact_id, contact, filepath, filename):
+def on_nda_signed(contact_id, contact, filepath, filename, answers=None):
     """
     Called when a signed NDA is saved. Stores link to PDF on the contact and adds NDA_Signed tag.
     PDF is stored on platform (static/S3); we save the public URL to GHL custom field.
@@ -350,8 +625,8 @@ def on_nda_signed(contact_id, contact, filepath, filename):
         logger.warning("GHL_LOCATION_ID not set; skipping NDA post-sign actions")
         return
 
-    # 1. Set NDA link on contact's custom field (PDF stored on platform)
-    set_nda_link_on_contact(filename, contact_id, location_id)
+    # 1. Set NDA link on contact's custom field (PDF stored on platform), plus any changed NDA fields
+    set_nda_link_on_contact(filename, contact_id, location_id, contact=contact, answers=answers)
 
     # 2. Add tag NDA_Signed
     add_contact_tag(contact_id, NDA_SIGNED_TAG)
@@ -0,0 +1,233 @@
+"""
+Resolve GHL custom field IDs by field name.
+
+Fetches /locations/{id}/customFields once and maps normalized field names and keys
+(e.g. "Listing ID" or "contact.listing_id" -> "listing_id") to field IDs, so the
+GHL_CUSTOM_FIELD_* settings no longer have to be copied by hand. Those settings are
+still honoured and always win over the resolved value.
+
+The mapping is cached in memory and on disk (GHL_CUSTOM_FIELD_CACHE_PATH). Only the
+very first lookup in a fresh deployment (no disk cache yet) waits for GHL, and callers
+arriving during it wait for that same fetch; after that, stale entries are served
+immediately and refreshed in a background thread.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Setting name -> normalized GHL field names/keys that identify the field
+CUSTOM_FIELD_NAMES = {
+    # Not plain "listing": locations name their listing title or URL field that too
+    "GHL_CUSTOM_FIELD_LISTING_ID": ("listing_id", "listing_number"),
+    "GHL_CUSTOM_FIELD_LISTING_NAME": ("listing_name",),
+    "GHL_CUSTOM_FIELD_REF_ID": ("ref_id", "your_ref_id"),
+    "GHL_CUSTOM_FIELD_LEAD_SOURCE": ("lead_source",),
+    "GHL_CUSTOM_FIELD_PURCHASE_TIMEFRAME": ("purchase_timeframe",),
+    "GHL_CUSTOM_FIELD_AMOUNT_TO_INVEST": ("amount_to_invest",),
+    "GHL_CUSTOM_FIELD_LEAD_MESSAGE": ("lead_message",),
+    "GHL_CUSTOM_FIELD_SIGNED_NDA": ("signed_nda", "signed_nda_link", "nda_link"),
+}
+
+# After a failed fetch, wait this long before trying again in the background
+RETRY_AFTER_FAILURE = 60
+# Callers waiting on another thread's first warm-up give up after this long (GHL requests time out at 15 s)
+WARMUP_WAIT = 20
+
+_lock = threading.Lock()
+_state = {
+    "location_id": None,
+    "fields": None,  # normalized name -> field id
+    "fetched_at": 0.0,
+    "refreshing": False,
+    "warmup": None,  # threading.Event set when the running first warm-up finishes
+}
+
+
+def normalize_field_name(name):
+    """Normalize a GHL field name or key ("contact.listing_id", "Listing ID") to "listing_id"."""
+    if not name or not isinstance(name, str):
+        return ""
+    name = name.strip().lower()
+    if name.startswith("contact."):
+        name = name[len("contact."):]
+    name = name.replace("#", " number ")
+    return re.sub(r"[^a-z0-9]+", "_", name).strip("_")
+
+
+def _cache_path():
+    path = getattr(settings, "GHL_CUSTOM_FIELD_CACHE_PATH", "") or ""
+    return Path(path) if path else None
+
+
+def _ttl():
+    try:
+        return float(getattr(settings, "GHL_CUSTOM_FIELD_CACHE_TTL", 3600))
+    except (TypeError, ValueError):
+        return 3600.0
+
+
+def build_field_map(fields):
+    """Map normalized name and key of each custom field to its ID (first match wins)."""
+    out = {}
+    for f in fields:
+        if not isinstance(f, dict):
+            continue
+        fid = f.get("id") or f.get("field")
+        if not fid:
+            continue
+        for raw in (f.get("fieldKey"), f.get("key"), f.get("name")):
+            norm = normalize_field_name(raw)
+            if norm and norm not in out:
+                out[norm] = str(fid)
+    return out
+
+
+def fetch_custom_fields(api_key, location_id):
+    """GET the location's custom fields from GHL; returns a list of field dicts or None on error."""
+    from .ghl import _ghl_request
+
+    status, data = _ghl_request(api_key, "GET", f"/locations/{location_id}/customFields")
+    if status != 200 or data is None:
+        logger.warning("GHL custom field lookup failed: status=%s body=%s", status, str(data)[:300] if data else "")
+        return None
+    fields = data.get("customFields", data.get("customField", []))
+    if isinstance(fields, dict):
+        fields = list(fields.values()) if fields else []
+    if not isinstance(fields, list):
+        fields = [fields] if fields else []
+    return fields
+
+
+def _read_disk_cache(location_id):
+    path = _cache_path()
+    if path is None or not path.exists():
+        return None
+    try:
+        cached = json.loads(path.read_text())
+    except (OSError, ValueError) as e:
+        logger.debug("Ignoring unreadable GHL custom field cache %s: %s", path, e)
+        return None
+    if cached.get("location_id") != location_id or not isinstance(cached.get("fields"), dict):
+        return None
+    return cached
+
+
+def _write_disk_cache(location_id, fields, fetched_at):
+    path = _cache_path()
+    if path is None:
+        return
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_text(json.dumps({"location_id": location_id, "fetched_at": fetched_at, "fields": fields}))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning("Could not write GHL custom field cache %s: %s", path, e)
+
+
+def _refresh(api_key, location_id):
+    """Fetch from GHL and update memory + disk cache. Returns True on success."""
+    fields = fetch_custom_fields(api_key, location_id)
+    now = time.time()
+    with _lock:
+        _state["refreshing"] = False
+        if fields is None:
+            # Keep serving what we have; retry after RETRY_AFTER_FAILURE seconds
+            _state["fetched_at"] = max(_state["fetched_at"], now - _ttl() + RETRY_AFTER_FAILURE)
+            if _state["fields"] is None:
+                _state["fields"] = {}
+                _state["location_id"] = location_id
+            return False
+        mapping = build_field_map(fields)
+        _state.update(location_id=location_id, fields=mapping, fetched_at=now)
+    _write_disk_cache(location_id, mapping, now)
+    logger.info("Resolved %s GHL custom field names for location %s", len(mapping), location_id)
+    return True
+
+
+def _refresh_in_background(api_key, location_id):
+    """Start a refresh thread unless one is already running (caller holds _lock)."""
+    if _state["refreshing"]:
+        return
+    _state["refreshing"] = True
+    threading.Thread(
+        target=_refresh, args=(api_key, location_id), name="ghl-custom-fields", daemon=True,
+    ).start()
+
+
+def get_field_map():
+    """
+    Return the cached normalized-name -> field ID map for the configured location.
+    Blocks only for the first warm-up (no memory or disk cache); otherwise returns at once
+    and refreshes stale data in the background.
+    """
+    if not getattr(settings, "GHL_CUSTOM_FIELD_AUTO_RESOLVE", True):
+        return {}
+    api_key = getattr(settings, "GHL_API_KEY", None) or ""
+    location_id = getattr(settings, "GHL_LOCATION_ID", None) or ""
+    if not api_key or not location_id:
+        return {}
+
+    with _lock:
+        if _state["fields"] is None or _state["location_id"] != location_id:
+            cached = _read_disk_cache(location_id)
+            if cached is not None:
+                _state.update(location_id=location_id, fields=cached["fields"],
+                              fetched_at=float(cached.get("fetched_at") or 0))
+        warm = _state["fields"] is not None and _state["location_id"] == location_id
+        if warm:
+            if time.time() - _state["fetched_at"] > _ttl():
+                _refresh_in_background(api_key, location_id)
+            return _state["fields"]
+        warmup = _state["warmup"]
+        leader = warmup is None
+        if leader:
+            warmup = _state["warmup"] = threading.Event()
+            _state["refreshing"] = True
+
+    # First warm-up: nothing cached anywhere yet. One caller fetches, the others wait for it
+    if leader:
+        try:
+            _refresh(api_key, location_id)
+        finally:
+            with _lock:
+                _state["warmup"] = None
+            warmup.set()
+    elif not warmup.wait(WARMUP_WAIT):
+        logger.warning("Timed out waiting for the GHL custom field warm-up")
+    with _lock:
+        return (_state["fields"] if _state["location_id"] == location_id else None) or {}
+
+
+def custom_field_id(setting_name):
+    """
+    Return the GHL custom field ID for a GHL_CUSTOM_FIELD_* setting name.
+    The setting itself (from .env) overrides; otherwise the ID is resolved by field name.
+    Returns "" when the field cannot be found.
+    """
+    override = getattr(settings, setting_name, None) or ""
+    if override:
+        return override
+    names = CUSTOM_FIELD_NAMES.get(setting_name, ())
+    if not names:
+        return ""
+    mapping = get_field_map()
+    for name in names:
+        if mapping.get(name):
+            return mapping[name]
+    return ""
+
+
+def clear_cache():
+    """Forget the in-memory mapping (disk cache is re-read on next lookup)."""
+    with _lock:
+        _state.update(location_id=None, fields=None, fetched_at=0.0)
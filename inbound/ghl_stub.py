@@ -0,0 +1,292 @@
+"""
+Local GoHighLevel API stand-in for development and load testing.
+
+Implements the subset of GHL API v2 that ghl.py uses, with in-memory state:
+- POST /contacts/search             (phone / query filters, page + pageLimit)
+- POST /contacts/                  create
+- GET  /contacts/{id}              fetch
+- PUT  /contacts/{id}              update (standard fields + customFields merge)
+- POST /contacts/{id}/tags         add tags
+- GET  /locations/{id}/customFields
+
+Faults can be injected: fixed latency plus jitter, and a probability of answering
+429 (with Retry-After) or 5xx instead of handling the request. Every request is
+recorded (method, path, status, duration) and exposed at GET /_stub/requests;
+POST /_stub/reset clears contacts and recordings.
+
+Run: python manage.py run_ghl_stub --port 8765 --latency-ms 80 --rate-429 0.05
+Then set GHL_API_BASE=http://127.0.0.1:8765 (any GHL_API_KEY / GHL_LOCATION_ID work).
+"""
+
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import urlsplit
+
+# Custom fields the stub location has (names match ghl_fields.CUSTOM_FIELD_NAMES)
+DEFAULT_CUSTOM_FIELDS = [
+    {"id": "cf_listing_id", "name": "Listing ID", "fieldKey": "contact.listing_id", "dataType": "TEXT"},
+    {"id": "cf_listing_name", "name": "Listing Name", "fieldKey": "contact.listing_name", "dataType": "TEXT"},
+    {"id": "cf_ref_id", "name": "Ref ID", "fieldKey": "contact.ref_id", "dataType": "TEXT"},
+    {"id": "cf_lead_source", "name": "Lead Source", "fieldKey": "contact.lead_source", "dataType": "TEXT"},
+    {"id": "cf_purchase_timeframe", "name": "Purchase Timeframe", "fieldKey": "contact.purchase_timeframe",
+     "dataType": "TEXT"},
+    {"id": "cf_amount_to_invest", "name": "Amount To Invest", "fieldKey": "contact.amount_to_invest",
+     "dataType": "TEXT"},
+    {"id": "cf_lead_message", "name": "Lead Message", "fieldKey": "contact.lead_message", "dataType": "LARGE_TEXT"},
+    {"id": "cf_signed_nda", "name": "Signed NDA", "fieldKey": "contact.signed_nda", "dataType": "TEXT"},
+]
+
+STANDARD_FIELDS = ("firstName", "lastName", "name", "email", "phone", "source", "address1", "city", "state",
+                   "postalCode", "companyName")
+
+MAX_PAGE_LIMIT = 100
+
+
+@dataclass
+class StubConfig:
+    """Fault and latency injection settings (can be changed while the server runs)."""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    rate_429: float = 0.0
+    rate_5xx: float = 0.0
+    retry_after: int = 1
+    seed: Optional[int] = None
+
+
+def _digits(value):
+    return re.sub(r"\D", "", str(value or ""))
+
+
+class StubState:
+    """In-memory contacts, custom fields and request log, shared by all handler threads."""
+
+    def __init__(self, config=None, custom_fields=None):
+        self.config = config or StubConfig()
+        self.custom_fields = [dict(f) for f in (custom_fields or DEFAULT_CUSTOM_FIELDS)]
+        self.contacts = {}
+        self.requests = []
+        self.lock = threading.Lock()
+        self.random = random.Random(self.config.seed)
+
+    def reset(self):
+        with self.lock:
+            self.contacts.clear()
+            self.requests.clear()
+
+    def record(self, method, path, status, started):
+        with self.lock:
+            self.requests.append({
+                "method": method,
+                "path": path,
+                "status": status,
+                "duration_ms": round((time.monotonic() - started) * 1000, 3),
+                "at": time.time(),
+            })
+
+    def roll_fault(self):
+        """Return 429, 5xx or None according to the configured rates."""
+        with self.lock:
+            r = self.random.random()
+        cfg = self.config
+        if r < cfg.rate_429:
+            return 429
+        if r < cfg.rate_429 + cfg.rate_5xx:
+            return self.random.choice((500, 502, 503))
+        return None
+
+    def sleep(self):
+        cfg = self.config
+        delay = cfg.latency_ms
+        if cfg.jitter_ms:
+            with self.lock:
+                delay += self.random.uniform(-cfg.jitter_ms, cfg.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+    # --- contacts ---
+
+    def _matches(self, contact, phone, query):
+        if phone and _digits(contact.get("phone"))[-10:] != _digits(phone)[-10:]:
+            return False
+        if query:
+            q = query.lower()
+            haystack = [str(contact.get(k) or "") for k in STANDARD_FIELDS]
+            haystack += [str(cf.get("value") or "") for cf in contact.get("customFields") or []]
+            if not any(q in h.lower() for h in haystack):
+                return False
+        return True
+
+    def search(self, body):
+        phone = body.get("phone") or ""
+        query = (body.get("query") or "").strip()
+        try:
+            page = max(1, int(body.get("page") or 1))
+            limit = min(MAX_PAGE_LIMIT, max(1, int(body.get("pageLimit") or 20)))
+        except (TypeError, ValueError):
+            page, limit = 1, 20
+        with self.lock:
+            hits = [dict(c) for c in self.contacts.values() if self._matches(c, phone, query)]
+        start = (page - 1) * limit
+        return {"contacts": hits[start:start + limit], "total": len(hits)}
+
+    def create(self, body):
+        contact = {k: body.get(k) for k in STANDARD_FIELDS if body.get(k) is not None}
+        contact["id"] = uuid.uuid4().hex[:20]
+        contact["locationId"] = body.get("locationId") or ""
+        contact["customFields"] = [
+            {"id": cf.get("id"), "value": cf.get("value")}
+            for cf in body.get("customFields") or [] if isinstance(cf, dict)
+        ]
+        contact["tags"] = list(body.get("tags") or [])
+        with self.lock:
+            self.contacts[contact["id"]] = contact
+        return dict(contact)
+
+    def update(self, contact_id, body):
+        with self.lock:
+            contact = self.contacts.get(contact_id)
+            if contact is None:
+                return None
+            for k in STANDARD_FIELDS:
+                if k in body:
+                    contact[k] = body[k]
+            by_id = {cf["id"]: cf for cf in contact["customFields"]}
+            for cf in body.get("customFields") or []:
+                if isinstance(cf, dict) and cf.get("id"):
+                    by_id[cf["id"]] = {"id": cf["id"], "value": cf.get("value")}
+            contact["customFields"] = list(by_id.values())
+            return dict(contact)
+
+    def add_tags(self, contact_id, tags):
+        with self.lock:
+            contact = self.contacts.get(contact_id)
+            if contact is None:
+                return None
+            for t in tags or []:
+                if t not in contact["tags"]:
+                    contact["tags"].append(t)
+            return list(contact["tags"])
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Routes GHL-style requests to the server's StubState."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):  # noqa: A002 - signature from BaseHTTPRequestHandler
+        pass
+
+    @property
+    def state(self):
+        return self.server.stub_state
+
+    def _send(self, status, data=None, headers=None):
+        raw = json.dumps(data if data is not None else {}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, str(v))
+        self.end_headers()
+        self.wfile.write(raw)
+        return status
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length).decode("utf-8") or "{}")
+        except ValueError:
+            return None
+
+    def _handle(self, method):
+        started = time.monotonic()
+        path = urlsplit(self.path).path
+        body = self._body() if method in ("POST", "PUT") else {}
+        if path.startswith("/_stub/"):
+            self._control(method, path)
+            return
+        self.state.sleep()
+        fault = self.state.roll_fault()
+        if fault == 429:
+            status = self._send(429, {"message": "Too Many Requests"},
+                                {"Retry-After": self.state.config.retry_after})
+        elif fault:
+            status = self._send(fault, {"message": "Injected server error"})
+        elif not (self.headers.get("Authorization") or "").startswith("Bearer "):
+            status = self._send(401, {"message": "Missing bearer token"})
+        elif body is None:
+            status = self._send(422, {"message": "Invalid JSON"})
+        else:
+            status = self._route(method, path, body)
+        self.state.record(method, path, status, started)
+
+    def _route(self, method, path, body):
+        parts = [p for p in path.split("/") if p]
+        if method == "POST" and parts == ["contacts", "search"]:
+            return self._send(200, self.state.search(body))
+        if method == "POST" and parts == ["contacts"]:
+            return self._send(201, {"contact": self.state.create(body)})
+        if len(parts) == 2 and parts[0] == "contacts":
+            if method == "GET":
+                with self.state.lock:
+                    contact = self.state.contacts.get(parts[1])
+                return self._send(200, {"contact": contact}) if contact else self._send(404, {"message": "Not found"})
+            if method == "PUT":
+                contact = self.state.update(parts[1], body)
+                return self._send(200, {"contact": contact}) if contact else self._send(404, {"message": "Not found"})
+        if method == "POST" and len(parts) == 3 and parts[0] == "contacts" and parts[2] == "tags":
+            tags = self.state.add_tags(parts[1], body.get("tags"))
+            return self._send(201, {"tags": tags}) if tags is not None else self._send(404, {"message": "Not found"})
+        if method == "GET" and len(parts) == 3 and parts[0] == "locations" and parts[2] == "customFields":
+            return self._send(200, {"customFields": self.state.custom_fields})
+        return self._send(404, {"message": f"No stub route for {method} {path}"})
+
+    def _control(self, method, path):
+        if method == "GET" and path == "/_stub/requests":
+            with self.state.lock:
+                return self._send(200, {"requests": list(self.state.requests)})
+        if method == "GET" and path == "/_stub/contacts":
+            with self.state.lock:
+                return self._send(200, {"contacts": list(self.state.contacts.values())})
+        if method == "POST" and path == "/_stub/reset":
+            self.state.reset()
+            return self._send(200, {"ok": True})
+        return self._send(404, {"message": "Unknown stub control path"})
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, state):
+        super().__init__(address, StubHandler)
+        self.stub_state = state
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_stub_server(host="127.0.0.1", port=0, config=None):
+    """Start a stub server in a daemon thread; returns the server (use .base_url, .stub_state, .shutdown())."""
+    server = StubServer((host, port), StubState(config))
+    threading.Thread(target=server.serve_forever, name="ghl-stub", daemon=True).start()
+    return server
@@ -0,0 +1,86 @@
+"""
+Lazy imports for heavy optional-path dependencies (PyMuPDF, pypdf, requests, openai).
+
+lazy_import(name) returns a stand-in module that imports the real one on first
+attribute access, so a worker that only handles webhooks never pays for PDF
+libraries. Use the module through its attributes (pypdf.PdfReader, not
+"from pypdf import PdfReader", which would load it at once). The first access may
+come from several threads at once (request threads, the NDA pre-render executor,
+the GHL search pool), so it imports under a lock through the regular import system;
+importlib.util.LazyLoader is not thread-safe before Python 3.12.
+
+Deployments that prefer to load everything before forking (gunicorn --preload) list
+the modules in PRELOAD_HEAVY_MODULES; InboundConfig.ready() calls preload().
+"""
+
+import importlib
+import importlib.util
+import logging
+import sys
+import threading
+import time
+import types
+
+logger = logging.getLogger(__name__)
+
+# Modules worth deferring; PRELOAD_HEAVY_MODULES = "all" preloads these
+HEAVY_MODULES = ("fitz", "pypdf", "requests", "openai")
+
+# Reentrant: importing one lazy module may touch another on the same thread
+_lock = threading.RLock()
+
+
+class _LazyModule(types.ModuleType):
+    """Stand-in for a module that imports it on the first attribute access and then forwards to it."""
+
+    def __getattr__(self, attr):
+        module = self.__dict__.get("_lazy_target")
+        if module is None:
+            with _lock:
+                module = self.__dict__.get("_lazy_target")
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_target"] = module
+        return getattr(module, attr)
+
+
+def lazy_import(name):
+    """Return module name when already imported, else a stand-in that imports it when first used."""
+    with _lock:
+        module = sys.modules.get(name)
+        if module is not None:
+            return module
+        spec = importlib.util.find_spec(name)
+        if spec is None or spec.loader is None:
+            raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+        return _LazyModule(name)
+
+
+def is_loaded(name):
+    """True when name has actually been imported (a lazy_import stand-in alone does not count)."""
+    return name in sys.modules
+
+
+def preload(names):
+    """
+    Import each module now (e.g. before gunicorn forks workers). names is an iterable of
+    module names or "all" for HEAVY_MODULES. Missing modules are logged and skipped.
+    Returns {name: seconds taken}.
+    """
+    if isinstance(names, str):
+        names = HEAVY_MODULES if names.strip().lower() == "all" else [n.strip() for n in names.split(",")]
+    timings = {}
+    for name in names:
+        if not name:
+            continue
+        started = time.perf_counter()
+        try:
+            # dir() touches the module, so one registered by lazy_import is executed too
+            dir(importlib.import_module(name))
+        except ImportError as e:
+            logger.warning("Preload of %s skipped: %s", name, e)
+            continue
+        timings[name] = time.perf_counter() - started
+    if timings:
+        logger.info("Preloaded %s", ", ".join(f"{n} ({t * 1000:.0f} ms)" for n, t in timings.items()))
+    return timings
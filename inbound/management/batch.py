@@ -0,0 +1,169 @@
+"""
+Base class for chunked, resumable data-maintenance commands.
+
+BatchCommand walks a queryset in primary-key order (keyset chunks: pk > last pk, so
+every chunk costs the same and memory stays at one chunk), lets the subclass change
+each row in memory, and writes each chunk's changed rows with one bulk_update in its
+own transaction. After every committed chunk the last pk is written to a checkpoint
+file, so an interrupted run continues where it stopped with --resume. --dry-run
+reports how many rows would change per field without writing anything.
+
+Subclasses set model and update_fields and implement get_queryset() and process().
+process() must be idempotent: a chunk committed just before a crash (but not yet
+checkpointed) is processed again on resume, and its rows must then need no change.
+
+    class Command(BatchCommand):
+        model = InboundEmail
+        update_fields = ('received_at',)
+
+        def get_queryset(self, options):
+            return InboundEmail.objects.only('pk', 'received_at')
+
+        def process(self, email, options):
+            ...  # change email in place
+            return ('received_at',)  # fields changed, or () when the row is fine
+"""
+
+import json
+import os
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import router, transaction
+
+
+class BatchCommand(BaseCommand):
+    model = None
+    update_fields = ()
+    chunk_size = 1000
+    # Options that must match between a run and its --resume (e.g. a conversion mode)
+    checkpoint_options = ()
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Count what would change without writing anything.')
+        parser.add_argument('--chunk-size', type=int, default=self.chunk_size,
+                            help=f'Rows per chunk / transaction (default {self.chunk_size}).')
+        parser.add_argument('--resume', action='store_true',
+                            help='Continue after the last committed chunk of an interrupted run.')
+
+    def get_queryset(self, options):
+        """Rows to visit (ordering is replaced by pk order)."""
+        raise NotImplementedError
+
+    def process(self, obj, options):
+        """Change obj in place; return the names of the fields changed (empty when none)."""
+        raise NotImplementedError
+
+    def describe(self, obj):
+        """One line for a changed row, printed at --verbosity 2."""
+        return f"id={obj.pk}"
+
+    # Checkpoints
+
+    def checkpoint_path(self):
+        directory = Path(getattr(settings, 'BATCH_CHECKPOINT_DIR', Path(settings.BASE_DIR) / '.batch_checkpoints'))
+        return directory / f"{self.__class__.__module__.rsplit('.', 1)[-1]}.json"
+
+    def read_checkpoint(self, options):
+        path = self.checkpoint_path()
+        try:
+            state = json.loads(path.read_text())
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            raise CommandError(f"Checkpoint {path} is corrupt; delete it to start over.")
+        expected = {name: options[name] for name in self.checkpoint_options}
+        if state.get('options', {}) != expected:
+            raise CommandError(
+                f"Checkpoint {path} was written with {state.get('options')}, not {expected}; "
+                "rerun with the same options or delete it to start over."
+            )
+        return state
+
+    def write_checkpoint(self, state):
+        path = self.checkpoint_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.checkpoint_', suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+
+    def clear_checkpoint(self):
+        self.checkpoint_path().unlink(missing_ok=True)
+
+    # Run
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        size = max(1, options['chunk_size'])
+        state = {
+            'last_pk': None, 'scanned': 0, 'changed': 0,
+            'options': {name: options[name] for name in self.checkpoint_options},
+        }
+        if dry_run:
+            self.stdout.write("DRY RUN - no changes will be saved")
+        elif options['resume']:
+            saved = self.read_checkpoint(options)
+            if saved:
+                state.update(saved)
+                self.stdout.write(f"Resuming after id {state['last_pk']} "
+                                  f"({state['scanned']} scanned, {state['changed']} changed so far)")
+            else:
+                self.stdout.write("No checkpoint found; starting from the beginning.")
+        elif self.checkpoint_path().exists():
+            self.stdout.write(self.style.WARNING(
+                f"Ignoring the checkpoint of an unfinished run ({self.checkpoint_path()}); use --resume to continue it."
+            ))
+
+        queryset = self.get_queryset(options).order_by('pk')
+        using = router.db_for_write(self.model)
+        field_counts = Counter()
+        started = time.perf_counter()
+        scanned_before = state['scanned']
+
+        while True:
+            chunk_started = time.perf_counter()
+            rows = queryset if state['last_pk'] is None else queryset.filter(pk__gt=state['last_pk'])
+            rows = list(rows[:size])
+            if not rows:
+                break
+            changed = []
+            for obj in rows:
+                fields = self.process(obj, options)
+                if fields:
+                    changed.append(obj)
+                    field_counts.update(fields)
+                    if options['verbosity'] >= 2:
+                        self.stdout.write(f"  {'Would fix' if dry_run else 'Fixed'} {self.describe(obj)}")
+            if changed and not dry_run:
+                with transaction.atomic(using=using):
+                    self.model.objects.using(using).bulk_update(changed, self.update_fields)
+            state['last_pk'] = rows[-1].pk
+            state['scanned'] += len(rows)
+            state['changed'] += len(changed)
+            if not dry_run:
+                self.write_checkpoint(state)
+            elapsed = time.perf_counter() - chunk_started
+            self.stdout.write(
+                f"  through id {state['last_pk']}: {state['scanned']} scanned, {state['changed']} "
+                f"{'to change' if dry_run else 'changed'} ({len(rows) / elapsed if elapsed else 0:,.0f} rows/s)"
+            )
+
+        if not dry_run:
+            self.clear_checkpoint()
+        elapsed = time.perf_counter() - started
+        rate = (state['scanned'] - scanned_before) / elapsed if elapsed else 0
+        for field, count in sorted(field_counts.items()):
+            self.stdout.write(f"  {field}: {count} row(s) {'would change' if dry_run else 'changed'}")
+        if state['changed']:
+            self.stdout.write(self.style.SUCCESS(
+                f"{'Would update' if dry_run else 'Updated'} {state['changed']} of {state['scanned']} record(s) "
+                f"in {elapsed:.1f}s ({rate:,.0f} rows/s)."
+            ))
+        else:
+            self.stdout.write(f"No records needed updating ({state['scanned']} scanned in {elapsed:.1f}s).")
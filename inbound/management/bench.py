@@ -0,0 +1,74 @@
+"""
+Small helpers shared by the benchmark / load-test management commands.
+"""
+
+import time
+
+from django.db import connections
+
+# Representative NDA answers for PDF benchmarks and checks (fill_nda_pdf keyword arguments)
+SAMPLE_NDA_FIELDS = dict(
+    contact_id='bench-contact', listing_id='2344916', listing_name='$539,384 Profit; bench listing',
+    name='Bench Tester', email='bench@example.com', phone='+15551234567', street_address='1 Main St',
+    city='Springfield', state='IL', zip_code='62701', signature='Bench Tester', will_manage='1 day/wk',
+    liquid_assets='$150,001-$250,000', using='Own Cash', govt_affiliation='No',
+)
+
+
+def register_database(alias, engine, name, **overrides):
+    """
+    Add a scratch database alias at runtime (benchmarks never touch the configured one).
+    Starts from the configured default's settings, so every key Django expects is present,
+    and replaces the connection details. Remove it with unregister_database(alias).
+    """
+    settings_dict = {
+        **connections.databases['default'],
+        'ENGINE': engine, 'NAME': name, 'USER': '', 'PASSWORD': '', 'HOST': '', 'PORT': '', 'OPTIONS': {},
+        **overrides,
+    }
+    connections.databases[alias] = settings_dict
+    return settings_dict
+
+
+def unregister_database(alias):
+    """Close and forget a database alias added with register_database."""
+    connections[alias].close()
+    # Drop this thread's connection object too, so a later alias of the same name starts fresh
+    del connections[alias]
+    del connections.databases[alias]
+
+
+def percentile(values, pct):
+    """Return the pct-th percentile (0-100) of values using nearest-rank; 0.0 when empty."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def summarize_ms(seconds):
+    """Format a list of durations (seconds) as 'n=.. p50=..ms p95=..ms p99=..ms max=..ms'."""
+    if not seconds:
+        return "n=0"
+    ms = [s * 1000 for s in seconds]
+    return (
+        f"n={len(ms)} p50={percentile(ms, 50):.1f}ms p95={percentile(ms, 95):.1f}ms "
+        f"p99={percentile(ms, 99):.1f}ms max={max(ms):.1f}ms"
+    )
+
+
+class Timer:
+    """Context manager that appends the elapsed wall time (seconds) to a list."""
+
+    def __init__(self, sink):
+        self.sink = sink
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.started
+        self.sink.append(self.elapsed)
+        return False
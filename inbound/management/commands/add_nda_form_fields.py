@@ -3,6 +3,7 @@ Management command to add AcroForm fields to NDA_Template.pdf and overwrite it.
 
 Run after replacing NDA_Template.pdf with a new template:
   python manage.py add_nda_form_fields
+  python manage.py add_nda_form_fields --linearize   # fast web view (needs qpdf)
 """
 
 from django.core.management.base import BaseCommand
@@ -13,10 +14,18 @@ from inbound.pdf_nda import add_form_fields_to_template
 class Command(BaseCommand):
     help = "Add form fields to NDA_Template.pdf and overwrite the file."
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--linearize',
+            action='store_true',
+            default=None,
+            help='Write a linearized (fast web view) template with qpdf (default: NDA_TEMPLATE_LINEARIZE).',
+        )
+
     def handle(self, *args, **options):
         try:
-            add_form_fields_to_template()
+            add_form_fields_to_template(linearize=options['linearize'])
             self.stdout.write(self.style.SUCCESS("NDA_Template.pdf overwritten with form fields."))
-        except FileNotFoundError as e:
+        except (FileNotFoundError, RuntimeError) as e:
             self.stderr.write(self.style.ERROR(str(e)))
             raise SystemExit(1)
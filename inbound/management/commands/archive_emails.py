@@ -0,0 +1,95 @@
+"""
+Move text_body/html_body of emails older than --days into compressed segment files
+(inbound.archive) and keep a pointer on the row. email_detail and the admin read them
+back transparently.
+
+Safe on a live system: rows are read in chunks by id, each chunk's records are
+appended and fsynced first, then its rows are updated in one short transaction
+(only rows not yet archived whose bodies still match what was read, so a concurrent
+or repeated run never double-archives and an edit made meanwhile is never lost).
+Stopping at any point leaves every row either fully in the database or fully archived.
+
+Archived bodies drop out of full-text search (other columns stay searchable). The
+database file only shrinks after VACUUM (--vacuum, SQLite).
+
+Run: python manage.py archive_emails --days 180
+     python manage.py archive_emails --days 90 --chunk 1000 --dry-run
+"""
+
+import time
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from inbound.archive import ArchiveError, SegmentWriter, encode_record
+from inbound.models import InboundEmail
+
+
+class Command(BaseCommand):
+    help = "Archive bodies of emails older than --days into append-only compressed segment files."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=180,
+                            help='Archive emails received more than this many days ago')
+        parser.add_argument('--chunk', type=int, default=500, help='Rows per transaction')
+        parser.add_argument('--limit', type=int, default=0, help='Archive at most this many emails')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be archived')
+        parser.add_argument('--vacuum', action='store_true', help='VACUUM the SQLite database afterwards')
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError("--days must be at least 1")
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        # exclude(a, b) drops rows where both bodies are empty
+        candidates = (
+            InboundEmail.objects.filter(received_at__lt=cutoff, body_segment='')
+            .exclude(text_body='', html_body='')
+            .order_by('pk')
+        )
+        chunk = max(1, options['chunk'])
+        started = time.perf_counter()
+        archived = raw_bytes = stored_bytes = 0
+        try:
+            with (nullcontext() if options['dry_run'] else SegmentWriter()) as writer:
+                last_pk = 0
+                while not options['limit'] or archived < options['limit']:
+                    size = min(chunk, options['limit'] - archived) if options['limit'] else chunk
+                    rows = list(candidates.filter(pk__gt=last_pk).values_list('pk', 'text_body', 'html_body')[:size])
+                    if not rows:
+                        break
+                    last_pk = rows[-1][0]
+                    raw_bytes += sum(len(text.encode()) + len(html.encode()) for _, text, html in rows)
+                    if writer is None:
+                        stored_bytes += sum(len(encode_record(*row)) for row in rows)
+                        archived += len(rows)
+                        continue
+                    pointers = [(row, *writer.append(*row)) for row in rows]
+                    # Records must be on disk before any row points at them
+                    writer.sync()
+                    with transaction.atomic():
+                        for (pk, text, html), segment, offset in pointers:
+                            # A row whose bodies changed since they were read stays as it is
+                            # (its record is never pointed to); the next run archives it
+                            archived += InboundEmail.objects.filter(
+                                pk=pk, body_segment='', text_body=text, html_body=html,
+                            ).update(
+                                text_body='', html_body='', body_segment=segment, body_offset=offset,
+                            )
+                    stored_bytes = writer.bytes_written
+                    self.stdout.write(f"  archived through id {last_pk} ({archived} so far)")
+        except ArchiveError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Would archive' if options['dry_run'] else 'Archived'} {archived} email(s): "
+            f"{raw_bytes / 1024 / 1024:.1f} MiB of body text -> {stored_bytes / 1024 / 1024:.1f} MiB compressed, "
+            f"in {time.perf_counter() - started:.1f}s"
+        ))
+
+        if options['vacuum'] and not options['dry_run'] and connection.vendor == 'sqlite':
+            vacuum_started = time.perf_counter()
+            with connection.cursor() as cursor:
+                cursor.execute('VACUUM')
+            self.stdout.write(f"VACUUM took {time.perf_counter() - vacuum_started:.1f}s")
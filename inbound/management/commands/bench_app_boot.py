@@ -0,0 +1,96 @@
+"""
+Measure Django app boot cost: import time (python -X importtime) and peak RSS of a fresh
+process that runs django.setup(), builds the WSGI app and loads the URLconf and views,
+as a gunicorn worker does, with lazy heavy modules and with PRELOAD_HEAVY_MODULES=all.
+
+Run: python manage.py bench_app_boot
+     python manage.py bench_app_boot --repeat 5 --top 15
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+BOOT_SCRIPT = """
+import json, os, resource, time
+started = time.perf_counter()
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ghl_automation.settings')
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+import inbound.views
+boot = time.perf_counter() - started
+from inbound.lazy import HEAVY_MODULES, is_loaded
+print(json.dumps({
+    'boot_s': boot,
+    'maxrss_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'loaded': [m for m in HEAVY_MODULES if is_loaded(m)],
+}))
+"""
+
+
+def parse_importtime(stderr):
+    """Return (total self time in us, {top-level module: cumulative us}) from -X importtime output."""
+    total = 0
+    top_level = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+            self_us, cumulative_us = int(self_us), int(cumulative_us)
+        except ValueError:
+            continue
+        total += self_us
+        if not name.startswith('  '):
+            # Leading spaces mark nested imports; keep first-level imports only
+            top_level[name.strip()] = top_level.get(name.strip(), 0) + cumulative_us
+    return total, top_level
+
+
+class Command(BaseCommand):
+    help = "Benchmark app boot import time and RSS with lazy vs preloaded heavy modules."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=3, help='Boots per variant (median is reported)')
+        parser.add_argument('--top', type=int, default=10, help='Slowest top-level imports to list')
+
+    def _boot(self, preload):
+        env = dict(os.environ, PRELOAD_HEAVY_MODULES=preload, PYTHONDONTWRITEBYTECODE='1')
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT],
+            cwd=str(settings.BASE_DIR), env=env, capture_output=True, text=True, timeout=120,
+        )
+        if proc.returncode != 0:
+            raise CommandError(f"Boot failed (PRELOAD_HEAVY_MODULES={preload!r}):\n{proc.stderr[-2000:]}")
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        result['import_us'], result['top_level'] = parse_importtime(proc.stderr)
+        return result
+
+    def handle(self, *args, **options):
+        repeat = max(1, options['repeat'])
+        summary = {}
+        for label, preload in (('lazy', ''), ('preload all', 'all')):
+            runs = [self._boot(preload) for _ in range(repeat)]
+            boot_ms = statistics.median(r['boot_s'] for r in runs) * 1000
+            import_ms = statistics.median(r['import_us'] for r in runs) / 1000
+            rss_mib = statistics.median(r['maxrss_kib'] for r in runs) / 1024
+            summary[label] = (boot_ms, rss_mib)
+            self.stdout.write(
+                f"{label:<12} boot {boot_ms:7.1f} ms  imports {import_ms:7.1f} ms  peak RSS {rss_mib:6.1f} MiB  "
+                f"heavy modules loaded: {', '.join(runs[-1]['loaded']) or 'none'}"
+            )
+            slowest = sorted(runs[-1]['top_level'].items(), key=lambda kv: kv[1], reverse=True)[:options['top']]
+            for name, us in slowest:
+                self.stdout.write(f"    {us / 1000:8.1f} ms  {name}")
+
+        lazy, preloaded = summary['lazy'], summary['preload all']
+        self.stdout.write(self.style.SUCCESS(
+            f"Lazy boot saves {preloaded[0] - lazy[0]:.1f} ms and {preloaded[1] - lazy[1]:.1f} MiB per worker"
+        ))
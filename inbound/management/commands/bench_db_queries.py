@@ -0,0 +1,233 @@
+"""
+Benchmark the InboundEmail query patterns of the NDA and list views on a large synthetic
+table, without and with the indexes declared on the model (migration 0007).
+
+Seeds a temporary SQLite database (never the configured one) with --rows synthetic emails,
+drops the model's indexes, times each query and prints its EXPLAIN QUERY PLAN, then
+creates the indexes and the FTS5 search index (inbound.search), runs ANALYZE and repeats.
+Email search runs as LIKE scans in the first phase and as an FTS5 MATCH in the second.
+
+Run: python manage.py bench_db_queries
+     python manage.py bench_db_queries --rows 200000 --iterations 500
+"""
+
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db import connections, models, transaction
+
+from inbound.management.bench import Timer, register_database, summarize_ms, unregister_database
+from inbound.models import LEAD_SOURCES, InboundEmail
+from inbound.nda import nda_contact_emails
+from inbound.pagination import encode_cursor, keyset_page, keyset_queryset
+from inbound.search import create_search_index, search_emails
+from inbound.views import EMAIL_LIST_COLUMNS
+
+ALIAS = 'bench_db_queries'
+# LIKE scans over the text columns take seconds per query at 1M rows; cap their runs
+SLOW_QUERY_ITERATIONS = 10
+# Without indexes the deduplicated NDA contact queries run one correlated scan per row
+# (O(rows^2): ~6 s at 5,000 rows), so above this many rows that phase skips them
+UNINDEXED_QUADRATIC_MAX_ROWS = 5_000
+UNINDEXED_QUADRATIC = ('NDA contacts deduped p1', 'NDA contacts deduped mid')
+
+
+def synthetic_rows(n, seed=42):
+    """Yield n INSERT tuples for InboundEmail (columns from column_names()), oldest first."""
+    rng = random.Random(seed)
+    start = datetime(2023, 1, 1)
+    step = timedelta(days=3 * 365) / max(1, n)
+    columns = column_names()
+    contacts = max(1, n // 3)
+    listings = max(1, n // 200)
+    for i in range(n):
+        contact = rng.randrange(contacts)
+        synced = rng.random() < 0.6
+        values = {
+            'from_address': f'leads{i % 50}@example.com',
+            'subject': f'New lead {i}',
+            'text_body': 'Lead details ' * 40,
+            'html_body': '<p>Lead details</p>' * 40,
+            'envelope': '{}',
+            'attachment_info': '[]',
+            'received_at': (start + step * i).strftime('%Y-%m-%d %H:%M:%S.%f'),  # Django's SQLite format (UTC)
+            'lead_source': LEAD_SOURCES[i % len(LEAD_SOURCES)],
+            'listing_id': str(1000000 + rng.randrange(listings)) if rng.random() < 0.9 else '',
+            'listing_name': f'Listing {i % 997}',
+            'name': f'Lead {contact}',
+            'email': f'lead{contact}@example.com',
+            'phone': f'+1555{contact:07d}' if rng.random() < 0.95 else '',
+            'raw_parsed': '{}',
+            'ghl_contact_id': f'c{contact:012d}' if synced else '',
+        }
+        yield tuple(values.get(c, '') if not nullable else values.get(c) for c, nullable in columns)
+
+
+def column_names():
+    """(column, nullable) for every InboundEmail column except the primary key."""
+    return [
+        (f.column, f.null) for f in InboundEmail._meta.concrete_fields if not isinstance(f, models.AutoField)
+    ]
+
+
+def bench_queries():
+    """
+    Query name -> (callable(rng) running the query once as the views do, queryset for EXPLAIN
+    or a callable returning one[, iteration cap]).
+    """
+    qs = InboundEmail.objects.using(ALIAS)
+    with connections[ALIAS].cursor() as cursor:
+        cursor.execute(
+            f"SELECT ghl_contact_id, listing_id, phone FROM {InboundEmail._meta.db_table} "
+            "WHERE ghl_contact_id != '' AND listing_id != '' AND phone != '' LIMIT 1000"
+        )
+        samples = cursor.fetchall()
+
+    deduped = nda_contact_emails().using(ALIAS).only('id', 'ghl_contact_id', 'listing_id', 'received_at')
+    middle = qs.order_by('-received_at', '-pk').only('id', 'received_at')[qs.count() // 2]
+    deep_cursor = encode_cursor(middle)
+    email_list = qs.only(*EMAIL_LIST_COLUMNS)
+    email_filtered = email_list.filter(lead_source=LEAD_SOURCES[0]).exclude(ghl_contact_id='')
+
+    def listing_phone(rng):
+        _, listing_id, phone = rng.choice(samples)
+        return list(qs.filter(listing_id=listing_id, phone=phone).values_list('id'))
+
+    return {
+        'latest email for contact': (
+            lambda rng: qs.filter(ghl_contact_id=rng.choice(samples)[0]).order_by('-received_at').first(),
+            qs.filter(ghl_contact_id=samples[0][0]).order_by('-received_at')[:1],
+        ),
+        'listing + phone lookup': (
+            listing_phone,
+            qs.filter(listing_id=samples[0][1], phone=samples[0][2]).values_list('id'),
+        ),
+        'NDA contacts page (100)': (
+            lambda rng: list(qs.filter(ghl_contact_id__gt='', listing_id__gt='', phone__gt='')
+                             .order_by('-received_at').values_list('ghl_contact_id', 'listing_id')[:100]),
+            qs.filter(ghl_contact_id__gt='', listing_id__gt='', phone__gt='')
+              .order_by('-received_at').values_list('ghl_contact_id', 'listing_id')[:100],
+        ),
+        'NDA contacts deduped p1': (
+            lambda rng: keyset_page(deduped, None, 100),
+            keyset_queryset(deduped, None, 100),
+        ),
+        'NDA contacts deduped mid': (
+            lambda rng: keyset_page(deduped, deep_cursor, 100),
+            keyset_queryset(deduped, deep_cursor, 100),
+        ),
+        'email list p1': (
+            lambda rng: keyset_page(email_list, None, 100),
+            keyset_queryset(email_list, None, 100),
+        ),
+        'email list mid': (
+            lambda rng: keyset_page(email_list, deep_cursor, 100),
+            keyset_queryset(email_list, deep_cursor, 100),
+        ),
+        'email list mid, filtered': (
+            lambda rng: keyset_page(email_filtered, deep_cursor, 100),
+            keyset_queryset(email_filtered, deep_cursor, 100),
+        ),
+        'email search p1': (
+            lambda rng: keyset_page(search_emails(email_list, rng.choice(samples)[1]), None, 100),
+            lambda: keyset_queryset(search_emails(email_list, samples[0][1]), None, 100),
+            SLOW_QUERY_ITERATIONS,
+        ),
+    }
+
+
+class Command(BaseCommand):
+    help = "Seed a temporary SQLite DB with synthetic emails and compare query latency/plans without and with indexes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000)
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--keep', action='store_true', help='Keep the temporary database file')
+
+    def handle(self, *args, **options):
+        tmp_dir = Path(tempfile.mkdtemp(prefix='bench_db_'))
+        db_path = tmp_dir / 'bench.sqlite3'
+        register_database(ALIAS, 'django.db.backends.sqlite3', str(db_path))
+        try:
+            self._run(options)
+        finally:
+            unregister_database(ALIAS)
+            if options['keep']:
+                self.stdout.write(f"Database kept at {db_path}")
+            else:
+                db_path.unlink(missing_ok=True)
+                tmp_dir.rmdir()
+
+    def _run(self, options):
+        conn = connections[ALIAS]
+        indexes = list(InboundEmail._meta.indexes)
+        with conn.schema_editor() as editor:
+            editor.create_model(InboundEmail)
+        # Separate block: create_model's indexes are only created when its editor exits
+        with conn.schema_editor() as editor:
+            for index in indexes:
+                editor.remove_index(InboundEmail, index)
+
+        n = max(1, options['rows'])
+        self.stdout.write(f"Seeding {n} rows into {conn.settings_dict['NAME']} ...")
+        columns = column_names()
+        sql = (
+            f"INSERT INTO {InboundEmail._meta.db_table} ({', '.join(c for c, _ in columns)}) "
+            f"VALUES ({', '.join('%s' for _ in columns)})"
+        )
+        started = time.perf_counter()
+        rows = synthetic_rows(n)
+        with transaction.atomic(using=ALIAS), conn.cursor() as cursor:
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= 10_000:
+                    cursor.executemany(sql, batch)
+                    batch = []
+            if batch:
+                cursor.executemany(sql, batch)
+        self.stdout.write(f"Seeded in {time.perf_counter() - started:.1f}s")
+
+        queries = bench_queries()
+        results = {}
+        for phase in ('without indexes', 'with indexes'):
+            if phase == 'with indexes':
+                started = time.perf_counter()
+                with conn.schema_editor() as editor:
+                    for index in indexes:
+                        editor.add_index(InboundEmail, index)
+                fts = create_search_index(conn)
+                with conn.cursor() as cursor:
+                    cursor.execute('ANALYZE')
+                self.stdout.write(f"\nCreated {len(indexes)} indexes{' and the FTS5 index' if fts else ''} "
+                                  f"in {time.perf_counter() - started:.1f}s")
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{phase}"))
+            for name, (run, explain_qs, *cap) in queries.items():
+                if phase == 'without indexes' and name in UNINDEXED_QUADRATIC and n > UNINDEXED_QUADRATIC_MAX_ROWS:
+                    results.setdefault(name, []).append(None)
+                    self.stdout.write(f"  {name:<26} skipped: O(rows^2) without indexes "
+                                      f"(runs at --rows {UNINDEXED_QUADRATIC_MAX_ROWS} or fewer)")
+                    continue
+                rng = random.Random(7)
+                timings = []
+                for _ in range(max(1, min([options['iterations']] + cap))):
+                    with Timer(timings):
+                        run(rng)
+                results.setdefault(name, []).append(sorted(timings)[len(timings) // 2])
+                self.stdout.write(f"  {name:<26} {summarize_ms(timings)}")
+                if callable(explain_qs):
+                    explain_qs = explain_qs()
+                for line in explain_qs.explain().splitlines():
+                    self.stdout.write(f"      {line}")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("\nMedian speed-up"))
+        for name, (before, after) in results.items():
+            if before is None:
+                self.stdout.write(f"  {name:<26} {'skipped':>11} -> {after * 1000:7.2f}ms")
+                continue
+            self.stdout.write(f"  {name:<26} {before * 1000:9.2f}ms -> {after * 1000:7.2f}ms  "
+                              f"({before / after if after else float('inf'):.0f}x)")
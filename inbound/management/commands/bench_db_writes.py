@@ -0,0 +1,142 @@
+"""
+Benchmark concurrent InboundEmail writes (webhook-style: insert, then save parsed fields)
+from 1, 4 and 16 worker processes against each database setup:
+
+  sqlite default  a fresh SQLite file with SQLite's defaults (rollback journal, synchronous=FULL)
+  sqlite tuned    a fresh SQLite file with the settings PRAGMAs (inbound.db: WAL, busy_timeout, ...)
+  postgresql      only with --postgres-db: a scratch database on the POSTGRES_* server
+
+Reports writes per second, latency and "database is locked" style failures per setup and
+worker count. Never touches the configured database; the PostgreSQL table is dropped after.
+
+Run: python manage.py bench_db_writes
+     python manage.py bench_db_writes --workers 1,4,16 --seconds 10
+     python manage.py bench_db_writes --postgres-db inbound_bench
+"""
+
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections
+from django.test import override_settings
+
+from inbound.management.bench import register_database, summarize_ms, unregister_database
+from inbound.models import InboundEmail
+
+ALIAS = 'bench_db_writes'
+# SQLite's own defaults: no PRAGMAs beyond Python's 5 s busy handler
+SQLITE_DEFAULTS = dict(SQLITE_JOURNAL_MODE='', SQLITE_SYNCHRONOUS='', SQLITE_MMAP_SIZE=0)
+
+
+def _write_worker(pragma_settings, start_at, seconds, worker):
+    """Runs in a forked process: write until the deadline, return (writes, failures, timings)."""
+    with override_settings(**pragma_settings):
+        connections[ALIAS].close()
+        time.sleep(max(0.0, start_at - time.time()))
+        deadline = start_at + seconds
+        writes, failures, timings = 0, 0, []
+        i = 0
+        while time.time() < deadline:
+            i += 1
+            started = time.perf_counter()
+            try:
+                email = InboundEmail.objects.using(ALIAS).create(
+                    from_address=f'leads{worker}@example.com', subject=f'Bench lead {worker}-{i}',
+                    text_body='Lead details ' * 40, html_body='<p>Lead details</p>' * 40,
+                )
+                InboundEmail.objects.using(ALIAS).filter(pk=email.pk).update(
+                    lead_source='BizBuySell', name=f'Lead {worker}-{i}', ghl_contact_id=f'c{worker}-{i}',
+                )
+            except OperationalError:
+                failures += 1
+                continue
+            timings.append(time.perf_counter() - started)
+            writes += 1
+        connections[ALIAS].close()
+    return writes, failures, timings
+
+
+@contextmanager
+def bench_database(vendor, postgres_db, pragma_settings):
+    """Register ALIAS on a fresh SQLite file (or the scratch PostgreSQL DB) with the InboundEmail table."""
+    tmp_dir = None
+    if vendor == 'sqlite':
+        tmp_dir = Path(tempfile.mkdtemp(prefix='bench_writes_'))
+        db = register_database(ALIAS, 'django.db.backends.sqlite3', str(tmp_dir / 'bench.sqlite3'))
+    else:
+        db = register_database(
+            ALIAS, 'django.db.backends.postgresql', postgres_db,
+            USER=os.environ.get('POSTGRES_USER', ''),
+            PASSWORD=os.environ.get('POSTGRES_PASSWORD', ''),
+            HOST=os.environ.get('POSTGRES_HOST', 'localhost'),
+            PORT=os.environ.get('POSTGRES_PORT', '5432'),
+            CONN_MAX_AGE=0,
+        )
+    try:
+        with override_settings(**pragma_settings), connections[ALIAS].schema_editor() as editor:
+            editor.create_model(InboundEmail)
+        yield db['NAME']
+    finally:
+        try:
+            if vendor != 'sqlite':
+                with connections[ALIAS].schema_editor() as editor:
+                    editor.delete_model(InboundEmail)
+        finally:
+            unregister_database(ALIAS)
+            if tmp_dir is not None:
+                for path in tmp_dir.iterdir():
+                    path.unlink()
+                tmp_dir.rmdir()
+
+
+class Command(BaseCommand):
+    help = "Benchmark concurrent writes per second on SQLite (default vs tuned PRAGMAs) and optionally PostgreSQL."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', default='1,4,16', help='Comma-separated worker process counts')
+        parser.add_argument('--seconds', type=float, default=5.0, help='Write duration per run')
+        parser.add_argument('--postgres-db', default='',
+                            help='Scratch PostgreSQL database (POSTGRES_HOST/USER/PASSWORD/PORT) to include')
+
+    def handle(self, *args, **options):
+        try:
+            worker_counts = [max(1, int(n)) for n in options['workers'].split(',') if n.strip()]
+        except ValueError:
+            raise CommandError("--workers must be a comma-separated list of integers, e.g. 1,4,16")
+
+        setups = [('sqlite default', 'sqlite', SQLITE_DEFAULTS), ('sqlite tuned', 'sqlite', {})]
+        if options['postgres_db']:
+            setups.append(('postgresql', 'postgresql', {}))
+
+        results = {}
+        for label, vendor, pragma_settings in setups:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{label}"))
+            for workers in worker_counts:
+                with bench_database(vendor, options['postgres_db'], pragma_settings) as db_name:
+                    rate, line = self._run(workers, options['seconds'], pragma_settings)
+                results[(label, workers)] = rate
+                self.stdout.write(f"  workers={workers:<3} {line}  ({db_name})")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("\nWrites per second"))
+        self.stdout.write("  " + f"{'':<16}" + "".join(f"{f'{n} workers':>14}" for n in worker_counts))
+        for label, _, _ in setups:
+            self.stdout.write("  " + f"{label:<16}" + "".join(f"{results[(label, n)]:14.0f}" for n in worker_counts))
+
+    def _run(self, workers, seconds, pragma_settings):
+        # Close the parent's connection so no forked child inherits an open handle
+        connections[ALIAS].close()
+        start_at = time.time() + 1.0
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork')) as pool:
+            futures = [pool.submit(_write_worker, pragma_settings, start_at, seconds, w) for w in range(workers)]
+            results = [f.result() for f in futures]
+        writes = sum(r[0] for r in results)
+        failures = sum(r[1] for r in results)
+        timings = [t for r in results for t in r[2]]
+        rate = writes / seconds
+        return rate, f"{rate:9.0f} writes/s  failures={failures:<5} {summarize_ms(timings)}"
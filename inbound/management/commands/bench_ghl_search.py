@@ -0,0 +1,70 @@
+"""
+Benchmark _search_contact_by_phone_and_listing: sequential vs concurrent searches.
+
+Starts the local GHL stand-in with fixed latency, seeds contacts (enough sharing the
+listing ID that the listing search spans several pages), then times the same lookups
+with GHL_SEARCH_CONCURRENT off and on.
+
+Run: python manage.py bench_ghl_search
+     python manage.py bench_ghl_search --latency-ms 150 --iterations 30 --listing-contacts 250
+"""
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from inbound import ghl
+from inbound.ghl_stub import StubConfig, start_stub_server
+from inbound.management.bench import Timer, percentile, summarize_ms
+
+LISTING_ID = '2344916'
+
+
+class Command(BaseCommand):
+    help = "Compare sequential vs concurrent GHL contact search latency against a stubbed GHL."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--latency-ms', type=float, default=100.0)
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--listing-contacts', type=int, default=150,
+                            help='Contacts sharing the listing ID (forces pagination past 100).')
+
+    def handle(self, *args, **options):
+        server = start_stub_server(config=StubConfig(latency_ms=options['latency_ms']))
+        state = server.stub_state
+        for i in range(options['listing_contacts']):
+            state.create({
+                'firstName': f'Other{i}',
+                'phone': f'+1555{i:07d}',
+                'customFields': [{'id': 'cf_listing_id', 'value': LISTING_ID}],
+            })
+        target = state.create({
+            'firstName': 'Target',
+            'phone': '+15559990000',
+            'customFields': [{'id': 'cf_listing_id', 'value': LISTING_ID}],
+        })
+
+        results = {}
+        try:
+            for concurrent in (False, True):
+                timings = []
+                found = set()
+                with override_settings(GHL_API_BASE=server.base_url, GHL_SEARCH_CONCURRENT=concurrent,
+                                       GHL_CUSTOM_FIELD_LISTING_ID='cf_listing_id'):
+                    for _ in range(options['iterations']):
+                        with Timer(timings):
+                            found.add(ghl._search_contact_by_phone_and_listing(
+                                'stub-key', 'stub-location', '555-999-0000', LISTING_ID))
+                label = 'concurrent' if concurrent else 'sequential'
+                results[label] = timings
+                ok = found == {target['id']}
+                self.stdout.write(f"{label:<11} {summarize_ms(timings)}  match={'ok' if ok else found}")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        before = percentile(results['sequential'], 50)
+        after = percentile(results['concurrent'], 50)
+        if before:
+            self.stdout.write(self.style.SUCCESS(
+                f"p50 {before * 1000:.1f}ms -> {after * 1000:.1f}ms ({(1 - after / before) * 100:.0f}% lower)"
+            ))
@@ -0,0 +1,169 @@
+"""
+Compare NDA PDF fill backends (pdf_nda.FILL_BACKENDS): latency p50/p99, peak memory
+and output size, then check that every backend renders the form fields the same way.
+
+Each backend runs in its own forked process so peak RSS (which covers PyMuPDF's C
+allocations, unlike tracemalloc) is measured per backend. The rendering check bakes
+each output's widgets into the page with MuPDF and compares the text visible in every
+field's rectangle (and the stored field value) against the pypdf full-rewrite output.
+Pixels are not compared: each backend has its own appearance generator (font size,
+padding, anti-aliasing), so correct fills differ by 5-30% of a field's pixels. With
+--out-dir the full-page pixel diffs are still written for a visual look.
+
+Run: python manage.py bench_nda_backends
+     python manage.py bench_nda_backends --fills 200 --out-dir /tmp/nda_diff
+"""
+
+import multiprocessing
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import fitz
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from inbound import pdf_nda
+from inbound.management.bench import SAMPLE_NDA_FIELDS, Timer, percentile
+
+# (label, NDA_PDF_BACKEND, NDA_PDF_FILL_MODE); the first one is the visual reference
+VARIANTS = (
+    ('pypdf', 'pypdf', 'full'),
+    ('pypdf-incremental', 'pypdf', 'incremental'),
+    ('pymupdf', 'pymupdf', 'full'),
+)
+
+
+def _current_rss_kib():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * resource.getpagesize() // 1024
+
+
+def _run_variant(backend, fill_mode, fills):
+    """Runs in a child process: time the fills and report peak RSS growth and output."""
+    value_map = pdf_nda.build_value_map(**SAMPLE_NDA_FIELDS)
+    with override_settings(NDA_TEMPLATE_CACHE=True, NDA_PDF_BACKEND=backend, NDA_PDF_FILL_MODE=fill_mode):
+        rss_before = _current_rss_kib()
+        render = pdf_nda.get_fill_backend()
+        output = b"".join(render(value_map))  # warm-up (template preparation)
+        timings = []
+        started = time.perf_counter()
+        for _ in range(fills):
+            with Timer(timings):
+                render(value_map)
+        elapsed = time.perf_counter() - started
+    peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+    return {'timings': timings, 'elapsed': elapsed, 'peak_kib': max(0, peak_kib), 'output': output}
+
+
+def _pixel_diff(pix_a, pix_b, threshold):
+    """Share of pixels whose channels differ by more than threshold, and a diff pixmap."""
+    if (pix_a.width, pix_a.height, pix_a.n) != (pix_b.width, pix_b.height, pix_b.n):
+        return 1.0, None
+    n = pix_a.n
+    a, b = pix_a.samples, pix_b.samples
+    diff = bytearray(len(a))
+    differing = 0
+    for i in range(0, len(a), n):
+        delta = max(abs(a[i + c] - b[i + c]) for c in range(n))
+        if delta > threshold:
+            differing += 1
+            diff[i:i + n] = bytes((255,) + (0,) * (n - 1))
+    total = max(1, pix_a.width * pix_a.height)
+    diff_pix = fitz.Pixmap(pix_a.colorspace, pix_a.width, pix_a.height, bytes(diff), False)
+    return differing / total, diff_pix
+
+
+def visible_field_text(data):
+    """
+    {field name: (stored value, text shown in its rectangle)} for page 1 of a PDF. Widgets
+    are baked into the page first, so the text is what their appearance actually draws.
+    """
+    doc = fitz.open(stream=data, filetype='pdf')
+    try:
+        page = doc[0]
+        widgets = {w.field_name: (w.field_value or '', fitz.Rect(w.rect)) for w in page.widgets()}
+        doc.bake(annots=False, widgets=True)
+        page = doc[0]
+        return {
+            name: (value, ' '.join(page.get_text('text', clip=rect).split()))
+            for name, (value, rect) in widgets.items()
+        }
+    finally:
+        doc.close()
+
+
+def field_diffs(reference, candidate):
+    """[(field name, what reference has, what candidate has)] for fields whose value or visible text differ."""
+    ref_fields = visible_field_text(reference)
+    cand_fields = visible_field_text(candidate)
+    missing = (None, '')
+    return [
+        (name, ref, cand_fields.get(name, missing))
+        for name, ref in ref_fields.items()
+        if cand_fields.get(name, missing) != ref
+    ]
+
+
+def write_page_diff(reference, candidate, path, dpi=96, threshold=64):
+    """Save the full-page diff (red = differing pixels) of two PDFs as a PNG."""
+    ref_doc = fitz.open(stream=reference, filetype='pdf')
+    cand_doc = fitz.open(stream=candidate, filetype='pdf')
+    try:
+        _, diff_pix = _pixel_diff(ref_doc[0].get_pixmap(dpi=dpi), cand_doc[0].get_pixmap(dpi=dpi), threshold)
+        if diff_pix is not None:
+            diff_pix.save(str(path))
+    finally:
+        ref_doc.close()
+        cand_doc.close()
+
+
+class Command(BaseCommand):
+    help = "Benchmark NDA fill backends (p50/p99, peak memory, output size) and compare their field rendering."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fills', type=int, default=100)
+        parser.add_argument('--out-dir', default='', help='Write each backend output and page diff PNGs here')
+
+    def handle(self, *args, **options):
+        fills = max(1, options['fills'])
+        out_dir = Path(options['out_dir']) if options['out_dir'] else None
+        if out_dir:
+            out_dir.mkdir(parents=True, exist_ok=True)
+
+        outputs = {}
+        self.stdout.write(f"{'backend':<18} {'fills/s':>8} {'p50':>8} {'p99':>8} {'peak RSS':>10} {'size':>10}")
+        for label, backend, fill_mode in VARIANTS:
+            # Fresh process per backend so ru_maxrss is not shared between them
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('fork')) as pool:
+                result = pool.submit(_run_variant, backend, fill_mode, fills).result()
+            ms = [t * 1000 for t in result['timings']]
+            outputs[label] = result['output']
+            self.stdout.write(
+                f"{label:<18} {fills / result['elapsed']:8.1f} {percentile(ms, 50):6.1f}ms "
+                f"{percentile(ms, 99):6.1f}ms {result['peak_kib'] / 1024:7.1f}MiB "
+                f"{len(result['output']) / 1024:7.1f}KiB"
+            )
+            if out_dir:
+                (out_dir / f"{label}.pdf").write_bytes(result['output'])
+
+        reference_label = VARIANTS[0][0]
+        reference = outputs[reference_label]
+        failures = []
+        for label, output in outputs.items():
+            if label == reference_label:
+                continue
+            for name, (ref_value, ref_text), (value, text) in field_diffs(reference, output):
+                if value != ref_value:
+                    failures.append(f"{label}: {name} value {value!r} != {ref_value!r}")
+                else:
+                    failures.append(f"{label}: {name} shows {text!r}, {reference_label} shows {ref_text!r}")
+            if out_dir:
+                write_page_diff(reference, output, out_dir / f"diff_{reference_label}_vs_{label}.png")
+
+        if failures:
+            for f in failures:
+                self.stderr.write(self.style.ERROR(f"  {f}"))
+            raise CommandError(f"{len(failures)} field(s) render differently from {reference_label}")
+        self.stdout.write(self.style.SUCCESS(f"All backends fill and show the form fields like {reference_label}."))
@@ -0,0 +1,54 @@
+"""
+Benchmark NDA PDF fills per second: uncached template, prepared-template cache with a
+full rewrite, incremental update (template bytes + appended changed fields), and a
+rendered-PDF cache hit (hash of the values + lookup, as on a repeat viewer load).
+
+Run: python manage.py bench_nda_fill
+     python manage.py bench_nda_fill --fills 200
+"""
+
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from inbound import pdf_cache, pdf_nda
+from inbound.management.bench import SAMPLE_NDA_FIELDS, Timer, summarize_ms
+
+
+class Command(BaseCommand):
+    help = "Measure fill_nda_pdf throughput: uncached vs cached full rewrite vs incremental update vs cache hit."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fills', type=int, default=100)
+
+    @override_settings(NDA_TEMPLATE_CACHE=True, NDA_PDF_CACHE='memory')
+    def handle(self, *args, **options):
+        value_map = pdf_nda.build_value_map(**SAMPLE_NDA_FIELDS)
+        n = max(1, options['fills'])
+        rates = {}
+        modes = (
+            ('uncached', pdf_nda._render_uncached),
+            ('cached', pdf_nda.render_full),
+            ('incremental', pdf_nda.render_incremental),
+            ('cache hit', pdf_cache.get_or_render),
+        )
+        for label, render in modes:
+            render(value_map)  # warm-up (imports, first template preparation)
+            timings = []
+            started = time.perf_counter()
+            for _ in range(n):
+                with Timer(timings):
+                    render(value_map)
+            elapsed = time.perf_counter() - started
+            rates[label] = n / elapsed
+            tracemalloc.start()
+            render(value_map)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            self.stdout.write(
+                f"{label:<11} {rates[label]:8.1f} fills/s  peak alloc {peak / 1024:8.1f} KiB  {summarize_ms(timings)}"
+            )
+        for label in ('cached', 'incremental', 'cache hit'):
+            self.stdout.write(self.style.SUCCESS(f"{label} speed-up: {rates[label] / rates['uncached']:.2f}x"))
@@ -0,0 +1,368 @@
+"""
+Measure NDA viewer time-to-first-page on a throttled connection, with and without
+Range requests and linearization.
+
+The real nda_pdf_stream view is served by a local WSGI server behind ThrottledLink, a
+TCP proxy that delays every byte by half the RTT in each direction and sends responses
+through one shared downlink of --bandwidth-kbps. Each variant is timed from the first
+request until the bytes page 1 needs have arrived, the way PDF.js loads a document:
+- full:       one GET, page 1 is parsed once the whole body has arrived
+- range:      the initial GET is dropped after its headers, then the tail (xref and
+              trailer), then the 64 KiB chunks holding the objects page 1 needs, one
+              batch of parallel Range requests per level of the object graph
+              (catalog -> pages -> page -> ...)
+- linearized: as range, but the first batch is the first-page section (/E of the
+              linearization dictionary) instead of the tail
+Which chunks each batch asks for comes from parsing the PDF beforehand; the transfers
+are real. Parse and paint time in the browser is not included.
+
+Defaults match Chrome's "Fast 3G" profile (1.6 Mbit/s, 563 ms RTT). nda_pdf_stream
+only advertises Accept-Ranges (which switches PDF.js to range loading) for linearized
+copies; the command checks that and reports which variant the headers select.
+
+--linearize stores the linearized copy the way the pre-render does
+(pdf_cache.linearize_into_cache, needs qpdf) before fetching it through the view.
+
+Run: python manage.py bench_nda_first_page
+     python manage.py bench_nda_first_page --bandwidth-kbps 400 --rtt-ms 2000 --linearize
+"""
+
+import bisect
+import http.client
+import queue
+import re
+import socket
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from socketserver import ThreadingMixIn
+from urllib.parse import urlencode
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.test import Client, override_settings
+from django.urls import reverse
+from pypdf import PdfReader
+from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject
+
+from inbound import pdf_cache
+from inbound.management.bench import SAMPLE_NDA_FIELDS
+from inbound.nda import nda_value_map
+from inbound.ranges import CHUNK_SIZE
+
+# Keys PDF.js does not follow to render a page
+SKIP_KEYS = {'/Parent', '/P', '/StructTreeRoot', '/ParentTree', '/Metadata', '/Outlines', '/Threads', '/Names'}
+# Parallel requests per host, as in browsers
+MAX_PARALLEL_REQUESTS = 6
+
+
+def _refs(obj, out):
+    if isinstance(obj, IndirectObject):
+        out.add(obj.idnum)
+    elif isinstance(obj, DictionaryObject):
+        for key, value in obj.items():
+            if key not in SKIP_KEYS:
+                _refs(value, out)
+    elif isinstance(obj, ArrayObject):
+        for value in obj:
+            _refs(value, out)
+
+
+def object_spans(reader, data):
+    """Object number -> (start, end) byte span in data (objects in object streams map to their stream)."""
+    offsets = {}
+    for generation, table in reader.xref.items():
+        for idnum, offset in table.items():
+            offsets[idnum] = (offset, generation)
+    ordered = sorted(offset for offset, _ in offsets.values())
+    match = re.search(rb"startxref\s+(\d+)", data[-1024:])
+    tail = int(match.group(1)) if match else len(data)
+    spans = {}
+    for idnum, (offset, _) in offsets.items():
+        i = bisect.bisect_right(ordered, offset)
+        spans[idnum] = (offset, min(ordered[i] if i < len(ordered) else tail, len(data)))
+    for idnum, (stream_num, _) in getattr(reader, 'xref_objStm', {}).items():
+        if stream_num in spans:
+            spans[idnum] = spans[stream_num]
+    return spans, {idnum: gen for idnum, (_, gen) in offsets.items()}
+
+
+def first_page_levels(reader, generations):
+    """Object numbers needed to render page 1, grouped by discovery depth from the trailer."""
+    levels = []
+    seen = set()
+    frontier = set()
+    _refs(reader.trailer.raw_get('/Root'), frontier)
+    while frontier:
+        frontier -= seen
+        if not frontier:
+            break
+        levels.append(frontier)
+        seen |= frontier
+        found = set()
+        for idnum in frontier:
+            try:
+                obj = IndirectObject(idnum, generations.get(idnum, 0), reader).get_object()
+            except Exception:
+                continue
+            _refs(obj, found)
+        frontier = found
+    return levels
+
+
+def _chunks(start, end):
+    return set(range(start // CHUNK_SIZE, (max(end, start + 1) - 1) // CHUNK_SIZE + 1))
+
+
+def first_section_end(data):
+    """/E of the linearization dictionary (end of the first-page section), or None when data is not linearized."""
+    lin = re.search(rb"/Linearized\b.*?>>", data[:2048], re.S)
+    if not lin:
+        return None
+    length = re.search(rb"/L\s+(\d+)", lin.group(0))
+    end = re.search(rb"/E\s+(\d+)", lin.group(0))
+    if length and end and int(length.group(1)) == len(data):
+        return int(end.group(1))
+    return None
+
+
+def range_plan(data, linearized=False):
+    """
+    Chunk batches (sets of chunk indexes) a range-loading viewer requests for page 1, in
+    order: the first-page section when linearized, else the tail (xref and trailer), then
+    the chunks of each level of page 1's object graph not loaded yet.
+    """
+    size = len(data)
+    end = first_section_end(data) if linearized else None
+    first = _chunks(0, end) if end else _chunks(max(0, size - CHUNK_SIZE), size)
+    batches = [first]
+    loaded = set(first)
+    reader = PdfReader(BytesIO(data))
+    spans, generations = object_spans(reader, data)
+    for level in first_page_levels(reader, generations):
+        needed = set()
+        for idnum in level:
+            if idnum in spans:
+                needed |= _chunks(*spans[idnum])
+        needed -= loaded
+        if needed:
+            batches.append(needed)
+            loaded |= needed
+    return batches
+
+
+def _spans(chunk_indexes, size):
+    """Contiguous runs of chunk indexes as inclusive byte ranges (one Range request each)."""
+    runs = []
+    for index in sorted(chunk_indexes):
+        if runs and runs[-1][1] == index - 1:
+            runs[-1][1] = index
+        else:
+            runs.append([index, index])
+    return [(first * CHUNK_SIZE, min(size, (last + 1) * CHUNK_SIZE) - 1) for first, last in runs]
+
+
+class ThrottledLink:
+    """
+    TCP proxy to target (host, port) that behaves like a slow link: bytes arrive rtt / 2
+    late in each direction, and all responses share one downlink of bandwidth_bps.
+    Connections a client drops stop using the downlink after the piece in flight.
+    """
+    PIECE = 8 * 1024
+
+    def __init__(self, target, bandwidth_bps, rtt):
+        self.target = target
+        self.bandwidth_bps = bandwidth_bps
+        self.delay = rtt / 2
+        self._lock = threading.Lock()
+        self._link_free = 0.0
+        self._listener = socket.create_server(('127.0.0.1', 0))
+        self.address = self._listener.getsockname()
+        threading.Thread(target=self._accept, name='throttle-accept', daemon=True).start()
+
+    def close(self):
+        self._listener.close()
+
+    def _accept(self):
+        while True:
+            try:
+                client, _ = self._listener.accept()
+            except OSError:
+                return
+            upstream = socket.create_connection(self.target)
+            closed = threading.Event()
+            deliveries = queue.Queue()
+            threading.Thread(target=self._uplink, args=(client, upstream), daemon=True).start()
+            threading.Thread(target=self._downlink, args=(upstream, deliveries, closed), daemon=True).start()
+            threading.Thread(target=self._deliver, args=(client, upstream, deliveries, closed), daemon=True).start()
+
+    def _uplink(self, client, upstream):
+        # Requests are a few hundred bytes: only the delay matters
+        try:
+            while data := client.recv(self.PIECE):
+                time.sleep(self.delay)
+                upstream.sendall(data)
+        except OSError:
+            pass
+
+    def _downlink(self, upstream, deliveries, closed):
+        try:
+            while not closed.is_set() and (data := upstream.recv(self.PIECE)):
+                with self._lock:
+                    start = max(time.perf_counter(), self._link_free)
+                    self._link_free = start + len(data) * 8 / self.bandwidth_bps
+                    sent = self._link_free
+                # Hold the next read until this piece is on the wire (one piece queued per connection)
+                time.sleep(max(0.0, sent - time.perf_counter()))
+                deliveries.put((sent + self.delay, data))
+        except OSError:
+            pass
+        deliveries.put((time.perf_counter() + self.delay, None))
+
+    def _deliver(self, client, upstream, deliveries, closed):
+        try:
+            while True:
+                arrives, data = deliveries.get()
+                time.sleep(max(0.0, arrives - time.perf_counter()))
+                if data is None:
+                    break
+                client.sendall(data)
+        except OSError:
+            pass
+        finally:
+            closed.set()
+            for sock in (client, upstream):
+                try:
+                    sock.close()
+                except OSError:
+                    pass
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+def _get(address, path, byte_range=None, headers_only=False):
+    """GET path through address; returns (response, body). headers_only drops the connection after the headers."""
+    conn = http.client.HTTPConnection(*address, timeout=300)
+    try:
+        conn.request('GET', path, headers={'Range': 'bytes=%d-%d' % byte_range} if byte_range else {})
+        resp = conn.getresponse()
+        return resp, (b'' if headers_only else resp.read())
+    finally:
+        conn.close()
+
+
+def measure_full(address, path, data):
+    started = time.perf_counter()
+    resp, body = _get(address, path)
+    elapsed = time.perf_counter() - started
+    if resp.status != 200 or body != data:
+        raise CommandError(f"Full download returned {resp.status} / {len(body)} bytes")
+    return elapsed
+
+
+def measure_ranges(address, path, data, batches):
+    """Initial GET dropped after its headers, then each batch as parallel Range requests."""
+    started = time.perf_counter()
+    _get(address, path, headers_only=True)
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_REQUESTS) as pool:
+        for batch in batches:
+            spans = _spans(batch, len(data))
+            for (start, end), (resp, body) in zip(spans, pool.map(lambda s: _get(address, path, s), spans)):
+                if resp.status != 206 or body != data[start:end + 1]:
+                    raise CommandError(f"Range bytes={start}-{end} returned {resp.status} / wrong bytes")
+    return time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = "Measure NDA viewer time-to-first-page on a throttled link (full download vs Range vs linearized)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bandwidth-kbps', type=float, default=1600)
+        parser.add_argument('--rtt-ms', type=float, default=563)
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per variant (the median is reported)')
+        parser.add_argument('--linearize', action='store_true', help='Also measure with NDA_PDF_LINEARIZE (needs qpdf)')
+
+    def _fetch(self, client, url):
+        """Body of url through the test client; checks Range responses. Returns (data, advertises ranges)."""
+        full = client.get(url)
+        if full.status_code != 200:
+            raise CommandError(f"GET {url} returned {full.status_code}")
+        data = b"".join(full.streaming_content)
+        size = len(data)
+        probes = [(0, 1023), (size // 2, size // 2 + 4095), (size - 100, size - 1)]
+        for start, end in probes:
+            part = client.get(url, HTTP_RANGE=f"bytes={start}-{end}")
+            body = b"".join(part.streaming_content)
+            if part.status_code != 206 or body != data[start:end + 1]:
+                raise CommandError(f"Range bytes={start}-{end} returned {part.status_code} / wrong bytes")
+        return data, full.get('Accept-Ranges') == 'bytes'
+
+    def handle(self, *args, **options):
+        bandwidth = options['bandwidth_kbps'] * 1000
+        rtt = options['rtt_ms'] / 1000.0
+        repeat = max(1, options['repeat'])
+        contact_id = 'bench-first-page'
+        params = {k: SAMPLE_NDA_FIELDS[k] for k in ('listing_id', 'listing_name', 'name', 'email', 'phone')}
+        url = reverse('inbound:nda_pdf', kwargs={'contact_id': contact_id}) + '?' + urlencode(params)
+        variants = [('as configured', {})]
+        if options['linearize']:
+            variants.append(('linearized', {'NDA_PDF_LINEARIZE': True, 'NDA_PDF_CACHE': 'memory'}))
+
+        server = make_server('127.0.0.1', 0, get_wsgi_application(),
+                             server_class=_ThreadingWSGIServer, handler_class=_QuietHandler)
+        threading.Thread(target=server.serve_forever, name='bench-wsgi', daemon=True).start()
+        link = ThrottledLink(server.server_address[:2], bandwidth, rtt)
+        self.stdout.write(f"Link: {options['bandwidth_kbps']:.0f} kbit/s, RTT {options['rtt_ms']:.0f} ms, "
+                          f"{CHUNK_SIZE // 1024} KiB range chunks, median of {repeat}")
+        try:
+            for label, overrides in variants:
+                with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver', '127.0.0.1'],
+                                       **overrides):
+                    pdf_cache.clear_cache()
+                    if overrides.get('NDA_PDF_LINEARIZE'):
+                        # The viewer only serves linearized copies the background job has cached
+                        if pdf_cache.linearize_into_cache(nda_value_map(contact_id, None, params)) is None:
+                            raise CommandError("Could not linearize the NDA; is qpdf installed (NDA_QPDF_PATH)?")
+                    data, advertises_ranges = self._fetch(Client(), url)
+                    linearized = first_section_end(data) is not None
+                    batches = range_plan(data, linearized)
+                    full = statistics.median(measure_full(link.address, url, data) for _ in range(repeat))
+                    ranged = statistics.median(
+                        measure_ranges(link.address, url, data, batches) for _ in range(repeat)
+                    )
+                self._report(label, data, linearized, advertises_ranges, batches, full, ranged)
+        finally:
+            link.close()
+            server.shutdown()
+            server.server_close()
+
+    def _report(self, label, data, linearized, advertises_ranges, batches, full, ranged):
+        requests = sum(len(_spans(batch, len(data))) for batch in batches)
+        self.stdout.write(f"{label}: {len(data) / 1024:.1f} KiB{', linearized' if linearized else ''}, "
+                          f"Accept-Ranges {'bytes' if advertises_ranges else 'not sent'}")
+        self.stdout.write(f"  full download  {full * 1000:8.0f} ms")
+        self.stdout.write(f"  range          {ranged * 1000:8.0f} ms  "
+                          f"({len(batches)} round trips, {requests} Range requests after the initial GET)")
+        chosen, chosen_label = (ranged, 'range') if advertises_ranges else (full, 'full download')
+        self.stdout.write(self.style.SUCCESS(f"  time-to-first-page {chosen * 1000:.0f} ms "
+                                             f"({chosen_label}, selected by the response headers)"))
+        if linearized != advertises_ranges:
+            self.stdout.write(self.style.WARNING(
+                "  Accept-Ranges should be sent for linearized copies only"
+            ))
+        best, best_label = min((full, 'full download'), (ranged, 'range'))
+        if best < chosen:
+            self.stdout.write(self.style.WARNING(
+                f"  {best_label} would be {chosen / best:.2f}x faster on this link"
+            ))
@@ -0,0 +1,65 @@
+"""
+Rewrite signed NDAs already on disk in the archival format (see pdf_nda.finalize_signed_pdf):
+form fields flattened into the page, unused objects removed, streams deflated.
+
+Files that no longer contain form fields (already finalized) are skipped. Each file is
+replaced atomically, so links saved to GHL keep working.
+
+Run: python manage.py finalize_signed_ndas
+     python manage.py finalize_signed_ndas --dry-run
+"""
+
+import os
+from pathlib import Path
+
+import fitz
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from inbound.pdf_nda import finalize_signed_pdf
+
+
+class Command(BaseCommand):
+    help = "Flatten and compress signed NDA PDFs in inbound/static/inbound/nda_signed/."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report the size reduction without replacing files.',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        if dry_run:
+            self.stdout.write("DRY RUN - no files will be replaced")
+
+        save_dir = Path(settings.BASE_DIR) / "inbound" / "static" / "inbound" / "nda_signed"
+        before_total = after_total = finalized = skipped = 0
+        for path in sorted(save_dir.glob("nda_signed*.pdf")):
+            data = path.read_bytes()
+            with fitz.open(stream=data, filetype="pdf") as doc:
+                has_fields = bool(doc.is_form_pdf)
+            if not has_fields:
+                skipped += 1
+                continue
+            try:
+                final = finalize_signed_pdf(data)
+            except Exception as e:
+                self.stderr.write(self.style.ERROR(f"{path.name}: {e}"))
+                continue
+            before_total += len(data)
+            after_total += len(final)
+            finalized += 1
+            self.stdout.write(f"{path.name}: {len(data)} -> {len(final)} bytes")
+            if not dry_run:
+                tmp_path = path.with_suffix(".pdf.tmp")
+                tmp_path.write_bytes(final)
+                os.replace(tmp_path, path)
+
+        saved = before_total - after_total
+        pct = 100.0 * saved / before_total if before_total else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Would finalize' if dry_run else 'Finalized'} {finalized} file(s), skipped {skipped} already final; "
+            f"{before_total} -> {after_total} bytes ({pct:.0f}% smaller)"
+        ))
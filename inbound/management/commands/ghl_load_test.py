@@ -0,0 +1,142 @@
+"""
+Load-test the GHL sync pipeline against the local GHL stand-in and report throughput.
+
+Each synthetic lead runs the same calls as production: sync_contact_to_ghl (create),
+_search_contact_by_phone_and_listing, set_nda_link_on_contact and add_contact_tag.
+Leads are processed by --concurrency worker threads. The run uses a throwaway test
+database (the GhlContactSnapshot rows sync writes for stub contacts never reach the
+configured one) and NDA_PRERENDER is off, so no NDAs are rendered for them.
+
+Run: python manage.py ghl_load_test
+     python manage.py ghl_load_test --leads 500 --concurrency 16 --latency-ms 120 --rate-429 0.02
+     python manage.py ghl_load_test --base-url http://127.0.0.1:8765   # stub started separately
+"""
+
+import shutil
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+
+from inbound import ghl, ghl_fields
+from inbound.ghl_stub import StubConfig, start_stub_server
+from inbound.management.bench import Timer, summarize_ms
+from inbound.models import InboundEmail
+
+CUSTOM_FIELD_SETTINGS = {name: '' for name in ghl_fields.CUSTOM_FIELD_NAMES}
+
+
+class Command(BaseCommand):
+    help = "Measure GHL contact sync throughput against a local GHL stand-in."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--leads', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--base-url', default='', help='Use a running stub instead of starting one.')
+        parser.add_argument('--latency-ms', type=float, default=50.0)
+        parser.add_argument('--jitter-ms', type=float, default=10.0)
+        parser.add_argument('--rate-429', type=float, default=0.0)
+        parser.add_argument('--rate-5xx', type=float, default=0.0)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        server = None
+        base_url = options['base_url'].rstrip('/')
+        if not base_url:
+            server = start_stub_server(config=StubConfig(
+                latency_ms=options['latency_ms'],
+                jitter_ms=options['jitter_ms'],
+                rate_429=options['rate_429'],
+                rate_5xx=options['rate_5xx'],
+                seed=options['seed'],
+            ))
+            base_url = server.base_url
+        self.stdout.write(f"GHL stand-in: {base_url}")
+
+        overrides = dict(
+            CUSTOM_FIELD_SETTINGS,
+            GHL_API_BASE=base_url,
+            GHL_API_KEY='stub-key',
+            GHL_LOCATION_ID='stub-location',
+            GHL_CUSTOM_FIELD_CACHE_PATH='',
+            NDA_PRERENDER=False,
+        )
+        timings = {'lead': [], 'create': [], 'search': [], 'nda_link': [], 'tag': []}
+        outcomes = Counter()
+        tmp_dir, old_test_name, old_name = self._create_scratch_db()
+        try:
+            with override_settings(**overrides):
+                ghl_fields.clear_cache()
+                ghl_fields.get_field_map()  # warm-up outside the measured window
+                started = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=max(1, options['concurrency'])) as pool:
+                    for ok in pool.map(lambda i: self._run_lead(i, timings), range(options['leads'])):
+                        outcomes['ok' if ok else 'failed'] += 1
+                elapsed = time.perf_counter() - started
+        finally:
+            ghl_fields.clear_cache()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            connection.settings_dict['TEST']['NAME'] = old_test_name
+            if tmp_dir is not None:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+            if server is not None:
+                statuses = Counter(r['status'] for r in server.stub_state.requests)
+                server.shutdown()
+                server.server_close()
+            else:
+                statuses = Counter()
+
+        self.stdout.write(
+            f"\n{options['leads']} leads, concurrency={options['concurrency']}: "
+            f"{elapsed:.2f}s, {options['leads'] / elapsed:.1f} leads/s "
+            f"(ok={outcomes['ok']} failed={outcomes['failed']})"
+        )
+        for name, values in timings.items():
+            self.stdout.write(f"  {name:<9} {summarize_ms(values)}")
+        if statuses:
+            self.stdout.write("  stub responses: " + ", ".join(f"{k}={v}" for k, v in sorted(statuses.items())))
+
+    def _create_scratch_db(self):
+        """
+        Switch the default alias to a fresh, migrated test database (a temporary file on
+        SQLite, so the worker threads share it). Returns (tmp_dir, old TEST NAME, old NAME).
+        """
+        tmp_dir = None
+        old_test_name = connection.settings_dict['TEST'].get('NAME')
+        if connection.vendor == 'sqlite':
+            tmp_dir = Path(tempfile.mkdtemp(prefix='ghl_load_test_'))
+            connection.settings_dict['TEST']['NAME'] = str(tmp_dir / 'load_test.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        self.stdout.write(f"Scratch database: {connection.settings_dict['NAME']}")
+        return tmp_dir, old_test_name, old_name
+
+    def _run_lead(self, i, timings):
+        email = InboundEmail(
+            listing_id=str(100000 + i % 50),
+            listing_name=f"Load test listing {i % 50}",
+            name=f"Lead {i} Tester",
+            email=f"lead{i}@example.com",
+            phone=f"555{i:07d}",
+            lead_source='BizBuySell',
+            purchase_timeframe='3 to 6 Months',
+            amount_to_invest='$250k',
+            lead_message='Load test lead',
+            ref_id=f"lt{i}",
+        )
+        with Timer(timings['lead']):
+            with Timer(timings['create']):
+                contact_id = ghl.sync_contact_to_ghl(email)
+            if not contact_id:
+                return False
+            with Timer(timings['search']):
+                ghl._search_contact_by_phone_and_listing('stub-key', 'stub-location', email.phone, email.listing_id)
+            with Timer(timings['nda_link']):
+                linked = ghl.set_nda_link_on_contact(f"nda_signed_{i}.pdf", contact_id, 'stub-location')
+            with Timer(timings['tag']):
+                tagged = ghl.add_contact_tag(contact_id, ghl.NDA_SIGNED_TAG)
+        return bool(linked and tagged)
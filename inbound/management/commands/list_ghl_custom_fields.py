@@ -5,14 +5,15 @@ Run: python manage.py list_ghl_custom_fields
 
 Shows all custom fields including their IDs. Use this to verify
 GHL_CUSTOM_FIELD_SIGNED_NDA matches a File Upload field for Contacts.
+Also shows which ID each GHL_CUSTOM_FIELD_* setting resolves to (from .env or by field name).
 """
 
 import requests
 from django.core.management.base import BaseCommand
 from django.conf import settings
 
-
-GHL_API_BASE = "https://services.leadconnectorhq.com"
+from inbound.ghl import api_base
+from inbound.ghl_fields import CUSTOM_FIELD_NAMES, build_field_map, custom_field_id
 
 
 class Command(BaseCommand):
@@ -27,7 +28,7 @@ class Command(BaseCommand):
             self.stderr.write(self.style.ERROR("GHL_API_KEY and GHL_LOCATION_ID required"))
             return
 
-        url = f"{GHL_API_BASE}/locations/{location_id}/customFields"
+        url = f"{api_base()}/locations/{location_id}/customFields"
         headers = {
             "Authorization": f"Bearer {api_key}",
             "Version": "2021-07-28",
@@ -82,3 +83,15 @@ class Command(BaseCommand):
                         f"GHL_CUSTOM_FIELD_SIGNED_NDA ({signed_nda_id}) does not match any field above."
                     )
                 )
+
+        self.stdout.write("\nResolved field IDs (.env overrides name lookup):")
+        by_name = build_field_map(fields)
+        for setting_name, names in CUSTOM_FIELD_NAMES.items():
+            fid = custom_field_id(setting_name)
+            if getattr(settings, setting_name, None):
+                source = ".env"
+            elif fid and any(by_name.get(n) == fid for n in names):
+                source = "by name"
+            else:
+                source = "not found" if not fid else "cache"
+            self.stdout.write(f"  {setting_name} = {fid or '-'}  ({source})")
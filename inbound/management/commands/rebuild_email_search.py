@@ -0,0 +1,42 @@
+"""
+Rebuild the FTS5 email search index (inbound.search) from inbound_inboundemail.
+
+Triggers keep the index in sync, so this is only needed after restoring a database
+copy made without the index, bulk edits with triggers disabled, or to compact it.
+Creates the table and triggers if they are missing, re-indexes every row and merges
+the index segments (FTS5 'optimize').
+
+Run: python manage.py rebuild_email_search
+     python manage.py rebuild_email_search --database default
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from inbound.models import InboundEmail
+from inbound.search import FTS_TABLE, create_search_index
+
+
+class Command(BaseCommand):
+    help = "Create (if needed) and rebuild the SQLite FTS5 index used for email search."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='Database alias (must be SQLite)')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'sqlite':
+            raise CommandError(f"Email search index needs SQLite; {options['database']!r} is {connection.vendor}.")
+        started = time.perf_counter()
+        # create_search_index also runs the FTS5 'rebuild' command over all rows
+        if not create_search_index(connection):
+            raise CommandError("This SQLite build has no FTS5 module.")
+        rebuilt = time.perf_counter() - started
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+        rows = InboundEmail.objects.using(options['database']).count()
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {rows} email(s) in {rebuilt:.1f}s (optimized in {time.perf_counter() - started - rebuilt:.1f}s)"
+        ))
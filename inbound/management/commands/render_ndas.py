@@ -0,0 +1,123 @@
+"""
+Render the NDA for every contact listed on the NDA contacts page, in parallel.
+
+Use after the template changes. Contacts are selected exactly as nda_contacts_list does
+(nda.nda_contact_emails) and their values resolved as the viewer does (nda.nda_value_map).
+Renders run in a process pool (one process per core by default; PDF filling is CPU
+bound, so threads would serialize on the GIL). Each PDF is written to a temporary file
+and renamed into place, so readers never see a partial file.
+
+Reports renders per second and per core; --scaling repeats the run with 1, 2, 4, ...
+workers up to --workers to check that throughput grows near-linearly.
+
+Run: python manage.py render_ndas
+     python manage.py render_ndas --workers 4 --out-dir /srv/nda_rendered
+     python manage.py render_ndas --scaling --limit 200
+"""
+
+import os
+import re
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from inbound.models import NdaSubmission
+from inbound.nda import CONTACT_CACHE_FIELDS, nda_contact_emails, nda_value_map
+
+
+def _init_worker():
+    # Needed when the platform spawns workers instead of forking; a no-op otherwise
+    import django
+    django.setup()
+    from inbound.pdf_nda import get_prepared_template
+    get_prepared_template()
+
+
+def _render_one(job):
+    """Render one value map and write it atomically to path. Runs in a worker process."""
+    from inbound.pdf_nda import render_value_map
+
+    value_map, path = job
+    data = render_value_map(value_map)
+    if path is None:
+        return len(data)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.render_', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return len(data)
+
+
+def _filename(contact_id, listing_id):
+    safe_id = re.sub(r'[^\w\-]', '_', str(contact_id))[:80]
+    listing = re.sub(r'[^\w\-]', '_', str(listing_id))[:50]
+    return f"nda_{listing}_{safe_id}.pdf"
+
+
+class Command(BaseCommand):
+    help = "Render NDAs for all NDA contacts across a process pool and write them atomically."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Worker processes (default: number of cores)')
+        parser.add_argument('--out-dir', default=str(Path(settings.BASE_DIR) / 'nda_rendered'))
+        parser.add_argument('--limit', type=int, default=0, help='Render at most this many contacts')
+        parser.add_argument('--dry-run', action='store_true', help='Render but do not write files')
+        parser.add_argument('--scaling', action='store_true',
+                            help='Repeat with 1, 2, 4, ... workers and report per-core efficiency')
+
+    def _run(self, jobs, workers):
+        chunksize = max(1, len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            # Start the workers (and prepare the template in each) before timing
+            list(pool.map(int, range(workers)))
+            started = time.perf_counter()
+            total_bytes = sum(pool.map(_render_one, jobs, chunksize=chunksize))
+            elapsed = time.perf_counter() - started
+        return elapsed, total_bytes
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        out_dir = None if options['dry_run'] else Path(options['out_dir'])
+        if out_dir is not None:
+            out_dir.mkdir(parents=True, exist_ok=True)
+
+        # All saved NDA answers in one query instead of one per contact
+        answers = {(s.contact_id, s.listing_id): s.answers() for s in NdaSubmission.objects.all()}
+        # Only the columns nda_value_map reads (no bodies or JSON), streamed instead of cached
+        contacts = nda_contact_emails().only(*CONTACT_CACHE_FIELDS)
+        if options['limit']:
+            contacts = contacts[:options['limit']]
+        jobs = []
+        for e in contacts.iterator():
+            path = str(out_dir / _filename(e.ghl_contact_id, e.listing_id)) if out_dir else None
+            contact_answers = answers.get((e.ghl_contact_id, e.listing_id or ''), {})
+            jobs.append((nda_value_map(e.ghl_contact_id, e, answers=contact_answers), path))
+        if not jobs:
+            raise CommandError("No NDA contacts found (need ghl_contact_id, listing_id and phone).")
+        self.stdout.write(f"{len(jobs)} NDA(s) to render" + (f" into {out_dir}" if out_dir else " (dry run)"))
+
+        counts = [workers]
+        if options['scaling']:
+            counts = sorted({min(workers, 2 ** i) for i in range(workers.bit_length() + 1)} | {workers})
+        baseline = None
+        for n in counts:
+            elapsed, total_bytes = self._run(jobs, n)
+            rate = len(jobs) / elapsed
+            baseline = baseline or rate / n
+            self.stdout.write(
+                f"workers={n:<3} {rate:8.1f} renders/s  {rate / n:7.1f} per core  "
+                f"efficiency {rate / n / baseline:5.0%}  {elapsed:.2f}s  {total_bytes / 1024 / 1024:.1f} MiB"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Rendered {len(jobs)} NDA(s)."))
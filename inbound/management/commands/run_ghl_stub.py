@@ -0,0 +1,46 @@
+"""
+Run the local GoHighLevel API stand-in (see inbound/ghl_stub.py).
+
+Run: python manage.py run_ghl_stub
+     python manage.py run_ghl_stub --port 8765 --latency-ms 80 --jitter-ms 20 --rate-429 0.05 --rate-5xx 0.02
+
+Point the app at it with GHL_API_BASE=http://127.0.0.1:8765 in .env.
+"""
+
+from django.core.management.base import BaseCommand
+
+from inbound.ghl_stub import StubConfig, StubServer, StubState
+
+
+class Command(BaseCommand):
+    help = "Run a local GHL API stand-in with in-memory state and fault/latency injection."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--latency-ms', type=float, default=0.0, help='Added latency per request.')
+        parser.add_argument('--jitter-ms', type=float, default=0.0, help='Random +/- jitter on the latency.')
+        parser.add_argument('--rate-429', type=float, default=0.0, help='Probability of answering 429.')
+        parser.add_argument('--rate-5xx', type=float, default=0.0, help='Probability of answering 500/502/503.')
+        parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with 429.')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible faults.')
+
+    def handle(self, *args, **options):
+        config = StubConfig(
+            latency_ms=options['latency_ms'],
+            jitter_ms=options['jitter_ms'],
+            rate_429=options['rate_429'],
+            rate_5xx=options['rate_5xx'],
+            retry_after=options['retry_after'],
+            seed=options['seed'],
+        )
+        server = StubServer((options['host'], options['port']), StubState(config))
+        self.stdout.write(self.style.SUCCESS(f"GHL stub listening on {server.base_url}"))
+        self.stdout.write(f"Set GHL_API_BASE={server.base_url} to use it. Ctrl+C to stop.")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"Handled {len(server.stub_state.requests)} request(s).")
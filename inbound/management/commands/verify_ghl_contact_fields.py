@@ -13,8 +13,7 @@ import requests
 from django.core.management.base import BaseCommand
 from django.conf import settings
 
-
-GHL_API_BASE = "https://services.leadconnectorhq.com"
+from inbound.ghl import api_base
 
 
 class Command(BaseCommand):
@@ -38,7 +37,7 @@ class Command(BaseCommand):
             self.stderr.write(self.style.ERROR("GHL_API_KEY not set"))
             return
 
-        url = f"{GHL_API_BASE}/contacts/{contact_id}"
+        url = f"{api_base()}/contacts/{contact_id}"
         headers = {
             "Authorization": f"Bearer {api_key}",
             "Version": "2021-07-28",
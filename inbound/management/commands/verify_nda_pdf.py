@@ -0,0 +1,119 @@
+"""
+Check that incremental-update NDA fills re-open cleanly and carry the right values.
+
+Renders sample answers with render_incremental and verifies that:
+- the output is the template bytes followed by the appended update;
+- every xref entry of every section in the /Prev chain points at its "N G obj" header;
+- pypdf (strict mode) follows the /Prev xref chain and reads every filled value;
+- MuPDF opens it without repairing the file and its widgets show the same values;
+- the values match a full rewrite (render_full).
+
+Browser viewers and Acrobat cannot run here. What an appended update can break for
+them is the xref chain: PDF.js then rebuilds the xref by scanning the file, and
+Acrobat repairs it and asks to save on close. The offset check, pypdf strict mode and
+MuPDF's repair flag catch those cases; the offset check is needed because pypdf,
+even in strict mode, only logs a warning for a wrong offset and reads on.
+
+Run: python manage.py verify_nda_pdf
+"""
+
+import re
+from io import BytesIO
+
+import fitz
+from django.core.management.base import BaseCommand, CommandError
+from pypdf import PdfReader
+
+from inbound import pdf_nda
+from inbound.management.bench import SAMPLE_NDA_FIELDS
+
+
+XREF_SUBSECTION = re.compile(rb"\s*(\d+)[ \t]+(\d+)[ \t]*\r?\n")
+XREF_ENTRY = re.compile(rb"(\d{10})[ \t](\d{5})[ \t]([nf])[ \t]*\r?\n?")
+
+
+def xref_offset_errors(data):
+    """
+    Walk the classic xref tables from startxref along /Prev and return every in-use entry
+    whose offset is not at its "N G obj" header (pypdf, even strict, quietly repairs such
+    entries). Sections stored as xref streams are skipped.
+    """
+    errors = []
+    match = re.search(rb"startxref\s+(\d+)\s+%%EOF\s*$", data[-1024:])
+    offset = int(match.group(1)) if match else None
+    if offset is None:
+        return ["no startxref at the end of the file"]
+    seen = set()
+    while offset is not None and offset not in seen:
+        seen.add(offset)
+        if not data.startswith(b"xref", offset):
+            if not re.match(rb"\d+\s+\d+\s+obj\b", data[offset:offset + 32]):
+                errors.append(f"xref offset {offset} points at neither an xref table nor an xref stream")
+            break
+        pos = offset + len(b"xref")
+        while (subsection := XREF_SUBSECTION.match(data, pos)) is not None:
+            first, count = int(subsection.group(1)), int(subsection.group(2))
+            pos = subsection.end()
+            for idnum in range(first, first + count):
+                entry = XREF_ENTRY.match(data, pos)
+                if entry is None:
+                    errors.append(f"malformed xref entry for object {idnum} at byte {pos}")
+                    return errors
+                pos = entry.end()
+                target, generation = int(entry.group(1)), int(entry.group(2))
+                if entry.group(3) == b"n" and not re.match(
+                    rb"%d\s+%d\s+obj\b" % (idnum, generation), data[target:target + 32]
+                ):
+                    errors.append(f"xref entry {idnum} {generation} -> offset {target} is not its object header")
+        trailer_end = data.find(b"startxref", pos)
+        prev = re.search(rb"/Prev\s+(\d+)", data[pos:trailer_end if trailer_end != -1 else len(data)])
+        offset = int(prev.group(1)) if prev else None
+    return errors
+
+
+class Command(BaseCommand):
+    help = "Verify incremental-update NDA PDFs with pypdf and MuPDF."
+
+    def handle(self, *args, **options):
+        value_map = pdf_nda.build_value_map(**SAMPLE_NDA_FIELDS)
+        template = pdf_nda.get_prepared_template()
+        parts = pdf_nda.render_incremental(value_map)
+        if parts is None:
+            raise CommandError("Template cannot be filled incrementally (fields without their own /T).")
+        data = b"".join(parts)
+        expected = {k: v for k, v in value_map.items() if k in template.fields}
+        failures = []
+
+        if not data.startswith(template.data):
+            failures.append("output does not start with the unchanged template bytes")
+
+        reader = PdfReader(BytesIO(data), strict=True)
+        failures += xref_offset_errors(data)
+        pypdf_values = {k: str(v.get('/V', '')) for k, v in (reader.get_fields() or {}).items()}
+        full_values = {
+            k: str(v.get('/V', ''))
+            for k, v in (PdfReader(BytesIO(pdf_nda.render_full(value_map))).get_fields() or {}).items()
+        }
+        doc = fitz.open(stream=data, filetype='pdf')
+        try:
+            mupdf_values = {w.field_name: w.field_value or '' for w in doc[0].widgets()}
+            # MuPDF loads objects lazily: the flag is only meaningful after reading them.
+            if doc.is_repaired:
+                failures.append("MuPDF had to repair the file (broken xref chain)")
+        finally:
+            doc.close()
+
+        for name, value in expected.items():
+            for label, values in (('pypdf', pypdf_values), ('MuPDF', mupdf_values), ('full rewrite', full_values)):
+                if values.get(name, '') != value:
+                    failures.append(f"{label}: {name}={values.get(name)!r}, expected {value!r}")
+
+        self.stdout.write(
+            f"template {len(template.data)} bytes + update {len(data) - len(template.data)} bytes; "
+            f"{len(expected)} fields checked"
+        )
+        if failures:
+            for f in failures:
+                self.stderr.write(self.style.ERROR(f"  {f}"))
+            raise CommandError(f"{len(failures)} check(s) failed")
+        self.stdout.write(self.style.SUCCESS("Incremental NDA PDF opens cleanly with pypdf and MuPDF."))
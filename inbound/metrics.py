@@ -0,0 +1,237 @@
+"""
+In-process metrics exported in Prometheus text format (served at /metrics).
+
+A deliberately small registry (counters, gauges, histograms with labels) so the app
+needs no extra dependency. Values are per process: under gunicorn each worker keeps
+its own counters, and a scrape through a load-balanced address returns whichever
+worker answered. Run a single worker, scrape each worker separately, or aggregate
+across processes (e.g. prometheus_client multiprocess mode) for whole-app totals.
+"""
+
+import threading
+
+# Default latency buckets (seconds) sized for HTTP calls to GHL
+DEFAULT_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0, 30.0)
+
+_registry = []
+_registry_lock = threading.Lock()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames, labelvalues, extra=None):
+    pairs = list(zip(labelnames, labelvalues))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        with _registry_lock:
+            _registry.append(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+    def collect(self):
+        lines = self._header()
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+    def value(self, **labels):
+        """Current value for a label set (0 when never touched); mostly for tests and debugging."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][i] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    def collect(self):
+        lines = self._header()
+        with self._lock:
+            items = sorted((k, {"counts": list(v["counts"]), "sum": v["sum"], "count": v["count"]})
+                           for k, v in self._values.items())
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state["counts"]):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state['sum'])}")
+            lines.append(f"{self.name}_count{labels} {state['count']}")
+        return lines
+
+    def value(self, **labels):
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state["count"] if state else 0
+
+
+def render_prometheus():
+    """Return all registered metrics in Prometheus text exposition format (version 0.0.4)."""
+    with _registry_lock:
+        metrics = list(_registry)
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.collect())
+    return "\n".join(lines) + "\n"
+
+
+# --- GHL API calls (recorded by ghl.py) ---
+
+GHL_REQUESTS = Counter(
+    "ghl_requests_total",
+    "GHL API responses by endpoint template, method and status class (2xx/4xx/429/5xx/error).",
+    ("endpoint", "method", "status_class"),
+)
+GHL_RATE_LIMITED = Counter(
+    "ghl_rate_limited_total",
+    "GHL API responses with status 429 (rate limited), by endpoint template and method.",
+    ("endpoint", "method"),
+)
+GHL_RATE_LIMIT_RETRY_AFTER = Counter(
+    "ghl_rate_limit_retry_after_seconds_total",
+    "Sum of the Retry-After seconds GHL sent with 429 responses (calls are not retried).",
+    ("endpoint",),
+)
+GHL_REQUEST_DURATION = Histogram(
+    "ghl_request_duration_seconds",
+    "Latency of individual GHL API attempts.",
+    ("endpoint", "method"),
+)
+GHL_IN_FLIGHT = Gauge(
+    "ghl_requests_in_flight",
+    "GHL API requests currently in progress in this process.",
+)
+
+# --- Diff-based contact updates (ghl.update_contact_in_ghl) ---
+
+GHL_CONTACT_UPDATES = Counter(
+    "ghl_contact_updates_total",
+    "GHL contact update attempts by result (sent/skipped/failed); skipped = nothing changed, no API call.",
+    ("result",),
+)
+GHL_CONTACT_UPDATE_FIELDS = Counter(
+    "ghl_contact_update_fields_total",
+    "Contact fields considered for update, by outcome (sent/unchanged).",
+    ("outcome",),
+)
+GHL_CONTACT_UPDATE_BYTES_AVOIDED = Counter(
+    "ghl_contact_update_bytes_avoided_total",
+    "Request body bytes not sent to GHL compared to resending every field.",
+)
+
+# --- Rendered NDA PDF cache (pdf_cache / views.nda_pdf_stream) ---
+
+NDA_PDF_CACHE_REQUESTS = Counter(
+    "nda_pdf_cache_requests_total",
+    "NDA PDF requests by result (not_modified = 304 from ETag, hit = served from cache, miss = rendered).",
+    ("result",),
+)
+NDA_PRERENDERS = Counter(
+    "nda_prerenders_total",
+    "Background NDA renders after a GHL contact is created, by result (rendered/cached/failed).",
+    ("result",),
+)
+NDA_PDF_CACHE_EVICTIONS = Counter(
+    "nda_pdf_cache_evictions_total",
+    "Rendered NDA PDFs evicted from the cache to stay under NDA_PDF_CACHE_MAX_BYTES.",
+)
+NDA_PDF_LINEARIZATIONS = Counter(
+    "nda_pdf_linearizations_total",
+    "Background qpdf linearizations of rendered NDAs (NDA_PDF_LINEARIZE), by result (linearized/failed).",
+    ("result",),
+)
+
+# --- Per-contact NDA lookup cache (nda.nda_contact) ---
+
+NDA_CONTACT_CACHE_REQUESTS = Counter(
+    "nda_contact_cache_requests_total",
+    "Per-contact NDA lookups (contact fields, answers, form context) by result (hit/miss).",
+    ("result",),
+)
+NDA_CONTACT_CACHE_INVALIDATIONS = Counter(
+    "nda_contact_cache_invalidations_total",
+    "Per-contact NDA cache entries dropped because the contact or its NDA answers were saved.",
+)
+
+# --- Signed NDA archival copies (pdf_nda.finalize_signed_pdf) ---
+
+NDA_SIGNED_PDF_BYTES = Counter(
+    "nda_signed_pdf_bytes_total",
+    "Size of signed NDA PDFs before (filled) and after (finalized: flattened, deflated) finalizing.",
+    ("stage",),
+)
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.28 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inbound', '0005_add_ghl_contact_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GhlContactSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('contact_id', models.CharField(max_length=64, unique=True)),
+                ('standard_fields', models.JSONField(blank=True, default=dict)),
+                ('custom_fields', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'GHL Contact Snapshot',
+                'verbose_name_plural': 'GHL Contact Snapshots',
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.28 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inbound', '0006_ghlcontactsnapshot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inboundemail',
+            index=models.Index(fields=['ghl_contact_id', '-received_at'], name='inbound_contact_received_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inboundemail',
+            index=models.Index(fields=['listing_id', 'phone'], name='inbound_listing_phone_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inboundemail',
+            index=models.Index(fields=['received_at'], name='inbound_received_at_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.28 on 2026-10-18 14:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inbound', '0007_inboundemail_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NdaSubmission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('contact_id', models.CharField(max_length=64)),
+                ('listing_id', models.CharField(blank=True, max_length=255)),
+                ('signature', models.TextField(blank=True)),
+                ('street_address', models.TextField(blank=True)),
+                ('city', models.TextField(blank=True)),
+                ('state', models.TextField(blank=True)),
+                ('zip', models.TextField(blank=True)),
+                ('will_manage', models.TextField(blank=True)),
+                ('other_deciders', models.TextField(blank=True)),
+                ('industry_experience', models.TextField(blank=True)),
+                ('govt_affiliation', models.TextField(blank=True)),
+                ('govt_explain', models.TextField(blank=True)),
+                ('liquid_assets', models.TextField(blank=True)),
+                ('real_estate', models.TextField(blank=True)),
+                ('retirement_401k', models.TextField(blank=True)),
+                ('funds_for_business', models.TextField(blank=True)),
+                ('using', models.TextField(blank=True)),
+                ('partner_name', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'NDA Submission',
+                'verbose_name_plural': 'NDA Submissions',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='ndasubmission',
+            constraint=models.UniqueConstraint(
+                fields=('contact_id', 'listing_id'), name='inbound_nda_contact_listing_uniq',
+            ),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.28 on 2026-10-18 14:05
+
+from django.db import migrations
+
+# Keys nda_save used to store in InboundEmail.raw_parsed (inbound.models.NDA_ANSWER_FIELDS
+# minus partner_name, which overwrote lead_message and cannot be told apart from it)
+NDA_KEYS = (
+    'signature', 'street_address', 'city', 'state', 'zip',
+    'will_manage', 'other_deciders', 'industry_experience', 'govt_affiliation', 'govt_explain',
+    'liquid_assets', 'real_estate', 'retirement_401k', 'funds_for_business', 'using',
+)
+
+
+def copy_answers(apps, schema_editor):
+    """One NdaSubmission per (contact, listing) from the newest email holding NDA answers."""
+    InboundEmail = apps.get_model('inbound', 'InboundEmail')
+    NdaSubmission = apps.get_model('inbound', 'NdaSubmission')
+    seen = set()
+    emails = (
+        InboundEmail.objects.exclude(ghl_contact_id='')
+        .order_by('-received_at', '-pk')
+        .only('ghl_contact_id', 'listing_id', 'raw_parsed')
+    )
+    for email in emails.iterator(chunk_size=500):
+        extra = email.raw_parsed if isinstance(email.raw_parsed, dict) else {}
+        answers = {k: str(extra[k]) for k in NDA_KEYS if extra.get(k)}
+        key = (email.ghl_contact_id, email.listing_id or '')
+        if not answers or key in seen:
+            continue
+        seen.add(key)
+        NdaSubmission.objects.update_or_create(contact_id=key[0], listing_id=key[1], defaults=answers)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inbound', '0008_ndasubmission'),
+    ]
+
+    operations = [
+        # raw_parsed is left as is, so reversing only drops the copied rows (0008 reverse)
+        migrations.RunPython(copy_answers, migrations.RunPython.noop),
+    ]
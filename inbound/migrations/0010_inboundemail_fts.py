@@ -0,0 +1,77 @@
+# Generated by Django 4.2.28 on 2026-10-18 15:00
+
+import logging
+
+from django.db import OperationalError, migrations
+
+logger = logging.getLogger(__name__)
+
+# The index as of this migration (inbound.search may change later; a schema change to
+# the index belongs in a new migration, not in edits to these statements)
+FTS_TABLE = 'inbound_inboundemail_fts'
+COLUMNS = (
+    'subject, text_body, html_body, name, email, from_address, to_address, '
+    'listing_id, listing_name, ref_id, original_email_message_id'
+)
+NEW = (
+    'new.subject, new.text_body, new.html_body, new.name, new.email, new.from_address, new.to_address, '
+    'new.listing_id, new.listing_name, new.ref_id, new.original_email_message_id'
+)
+OLD = (
+    'old.subject, old.text_body, old.html_body, old.name, old.email, old.from_address, old.to_address, '
+    'old.listing_id, old.listing_name, old.ref_id, old.original_email_message_id'
+)
+
+CREATE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5({COLUMNS}, content='inbound_inboundemail', "
+    f"content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON inbound_inboundemail BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, {COLUMNS}) VALUES (new.id, {NEW}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON inbound_inboundemail BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF {COLUMNS} ON inbound_inboundemail BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD}); "
+    f"INSERT INTO {FTS_TABLE}(rowid, {COLUMNS}) VALUES (new.id, {NEW}); END",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+)
+DROP_SQL = (
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+)
+
+
+def create_fts(apps, schema_editor):
+    """SQLite only; without FTS5 the app falls back to LIKE scans, so skip with a warning."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(CREATE_SQL[0])
+    except OperationalError as e:
+        if 'fts5' not in str(e):
+            raise
+        logger.warning("SQLite has no FTS5; email search will use LIKE scans: %s", e)
+        return
+    for statement in CREATE_SQL[1:]:
+        schema_editor.execute(statement)
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inbound', '0009_ndasubmission_from_raw_parsed'),
+    ]
+
+    operations = [
+        # SQLite only: FTS5 index + sync triggers over the searchable InboundEmail columns
+        migrations.RunPython(create_fts, drop_fts),
+    ]
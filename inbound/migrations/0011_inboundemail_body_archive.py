@@ -0,0 +1,42 @@
+# Generated by Django 4.2.28 on 2026-10-18 16:00
+
+import importlib
+
+from django.db import migrations, models
+
+fts = importlib.import_module('inbound.migrations.0010_inboundemail_fts')
+
+
+def recreate_fts_triggers(apps, schema_editor):
+    """
+    Adding the NOT NULL body_segment makes SQLite rebuild inbound_inboundemail, which
+    drops the triggers on it (0010); put them back if the FTS5 table exists.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite' or fts.FTS_TABLE not in connection.introspection.table_names():
+        return
+    for statement in fts.CREATE_SQL[1:4]:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inbound', '0010_inboundemail_fts'),
+    ]
+
+    operations = [
+        # Reverse runs last: removing the fields rebuilds the table again
+        migrations.RunPython(migrations.RunPython.noop, recreate_fts_triggers),
+        migrations.AddField(
+            model_name='inboundemail',
+            name='body_segment',
+            field=models.CharField(blank=True, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='inboundemail',
+            name='body_offset',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(recreate_fts_triggers, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,8 @@
 from django.db import models
 
+# Lead sources the parser extracts (InboundEmail.lead_source); used for list filters
+LEAD_SOURCES = ('BizBuySell', 'TangentBrokerage.com', 'BusinessesforSale.com')
+
 
 class InboundEmail(models.Model):
     """Stores emails received via SendGrid Inbound Parse webhook."""
@@ -36,10 +39,86 @@ class InboundEmail(models.Model):
     # GHL integration
     ghl_contact_id = models.CharField(max_length=64, blank=True)
 
+    # Bodies moved to a segment file by archive_emails (empty = bodies are in this row); see inbound.archive
+    body_segment = models.CharField(max_length=32, blank=True)
+    body_offset = models.BigIntegerField(null=True, blank=True)
+
     class Meta:
         ordering = ['-received_at']
         verbose_name = 'Inbound Email'
         verbose_name_plural = 'Inbound Emails'
+        indexes = [
+            # NDA views: latest email for a contact (filter ghl_contact_id, order by -received_at)
+            models.Index(fields=['ghl_contact_id', '-received_at'], name='inbound_contact_received_idx'),
+            # NDA contacts list (non-empty listing_id and phone) and listing + phone lookups
+            models.Index(fields=['listing_id', 'phone'], name='inbound_listing_phone_idx'),
+            # Default ordering (email list, newest first)
+            models.Index(fields=['received_at'], name='inbound_received_at_idx'),
+        ]
 
     def __str__(self):
         return self.subject or '(no subject)'
+
+
+class GhlContactSnapshot(models.Model):
+    """Last values pushed to a GHL contact, so updates can send only what changed."""
+    contact_id = models.CharField(max_length=64, unique=True)
+    standard_fields = models.JSONField(default=dict, blank=True)  # e.g. firstName, email, city
+    custom_fields = models.JSONField(default=dict, blank=True)  # custom field id -> value
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'GHL Contact Snapshot'
+        verbose_name_plural = 'GHL Contact Snapshots'
+
+    def __str__(self):
+        return self.contact_id
+
+
+# NDA form answers kept on NdaSubmission (form field name == model field name)
+NDA_ANSWER_FIELDS = (
+    'signature', 'street_address', 'city', 'state', 'zip',
+    'will_manage', 'other_deciders', 'industry_experience', 'govt_affiliation', 'govt_explain',
+    'liquid_assets', 'real_estate', 'retirement_401k', 'funds_for_business', 'using', 'partner_name',
+)
+
+
+class NdaSubmission(models.Model):
+    """NDA answers for one contact and listing; nda_save updates only the columns it receives."""
+    contact_id = models.CharField(max_length=64)  # GHL contact id
+    listing_id = models.CharField(max_length=255, blank=True)
+
+    # Free-form answers (TextField so long input is never rejected)
+    signature = models.TextField(blank=True)
+    street_address = models.TextField(blank=True)
+    city = models.TextField(blank=True)
+    state = models.TextField(blank=True)
+    zip = models.TextField(blank=True)
+    will_manage = models.TextField(blank=True)
+    other_deciders = models.TextField(blank=True)
+    industry_experience = models.TextField(blank=True)
+    govt_affiliation = models.TextField(blank=True)
+    govt_explain = models.TextField(blank=True)
+    liquid_assets = models.TextField(blank=True)
+    real_estate = models.TextField(blank=True)
+    retirement_401k = models.TextField(blank=True)
+    funds_for_business = models.TextField(blank=True)
+    using = models.TextField(blank=True)
+    partner_name = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'NDA Submission'
+        verbose_name_plural = 'NDA Submissions'
+        constraints = [
+            models.UniqueConstraint(fields=['contact_id', 'listing_id'], name='inbound_nda_contact_listing_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.contact_id} / {self.listing_id or "-"}'
+
+    def answers(self):
+        """{field: value} for NDA_ANSWER_FIELDS."""
+        return {field: getattr(self, field) for field in NDA_ANSWER_FIELDS}
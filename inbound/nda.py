@@ -0,0 +1,347 @@
+"""
+NDA contacts, their field values, and background pre-rendering of their PDFs.
+
+nda_value_map is the single place that maps an InboundEmail and its NdaSubmission
+answers (plus optional query parameters from the viewer URL) to the form values
+written into the NDA, so the viewer and the pre-render produce the same value map
+and hit the same cache entry. save_nda_answers writes only the answer columns a save
+received, never the (large) email row.
+
+When sync_contact_to_ghl creates a contact it sends signals.contact_synced; the
+receiver here renders that contact's NDA in a background thread and stores it in
+pdf_cache, so the lead's first viewer load is served from cache. Use
+NDA_PDF_CACHE=disk when running several workers so every worker sees the render.
+With NDA_PDF_LINEARIZE the same background job also stores the linearized copy, and
+queue_linearize lets the viewer request one for PDFs that were not pre-rendered.
+
+nda_contact resolves what the viewer needs for a contact (latest InboundEmail, its
+answers and the form context) through the NDA_CONTACT_CACHE Django cache. Entries are
+dropped after the write commits whenever an InboundEmail with that ghl_contact_id or
+its NdaSubmission is saved or deleted through the ORM (nda_save, the webhook
+ingestion, the admin) and by save_nda_answers; other writes are picked up after
+NDA_CONTACT_CACHE_TTL.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+from django.dispatch import receiver
+
+from . import metrics
+from .models import NDA_ANSWER_FIELDS, InboundEmail, NdaSubmission
+from .pdf_cache import cache_key, get_cache, get_or_render, linearize_enabled, linearize_into_cache
+from .pdf_nda import build_value_map
+from .signals import contact_synced
+
+logger = logging.getLogger(__name__)
+
+CONTACT_CACHE_ALIAS = "nda_contacts"
+# Bump when the cached entry's shape changes, so old entries are never read back
+CONTACT_CACHE_VERSION = 1
+# InboundEmail columns the viewer, the PDF value map and the form context read
+CONTACT_CACHE_FIELDS = (
+    "id", "ghl_contact_id", "listing_id", "listing_name", "name", "email", "phone", "ref_id",
+    "purchase_timeframe", "amount_to_invest",
+)
+
+_executor = None
+_executor_lock = threading.Lock()
+# Linearized cache keys with a queued or running linearize job
+_linearize_pending = set()
+# After a failed linearize (e.g. qpdf missing) the viewer queues no new jobs for this long
+LINEARIZE_RETRY_AFTER = 300  # seconds
+_linearize_failed_at = None
+
+
+def nda_contact_emails():
+    """
+    Contacts that have an NDA page: emails with ghl_contact_id, listing_id and phone,
+    one per (contact_id, listing_id) - the most recent - newest first. Deduplicated in
+    SQL (NOT EXISTS a newer matching email, one seek on inbound_contact_received_idx per
+    row), so callers can paginate and pick columns. Used by nda_contacts_list and
+    render_ndas.
+    """
+    candidates = InboundEmail.objects.filter(ghl_contact_id__gt='', listing_id__gt='', phone__gt='')
+    # received_at__gte is implied by the OR; it lets the index seek past the contact's older emails
+    newer = candidates.filter(received_at__gte=OuterRef('received_at')).filter(
+        Q(received_at__gt=OuterRef('received_at')) | Q(received_at=OuterRef('received_at'), pk__gt=OuterRef('pk')),
+        ghl_contact_id=OuterRef('ghl_contact_id'),
+        listing_id=OuterRef('listing_id'),
+    )
+    return candidates.filter(~Exists(newer)).order_by('-received_at', '-pk')
+
+
+def nda_answers(contact_id, listing_id):
+    """Saved NDA answers ({field: value}) for a contact and listing; {} when none."""
+    submission = NdaSubmission.objects.filter(contact_id=contact_id, listing_id=listing_id or '').first()
+    return submission.answers() if submission else {}
+
+
+def save_nda_answers(contact_id, listing_id, answers):
+    """
+    Store answers ({field: value}, fields from NDA_ANSWER_FIELDS) for a contact and
+    listing with one UPDATE of just those columns, inserting the row on first save.
+    Returns all saved answers.
+    """
+    answers = {k: v for k, v in answers.items() if k in NDA_ANSWER_FIELDS}
+    rows = NdaSubmission.objects.filter(contact_id=contact_id, listing_id=listing_id or '')
+    if not rows.update(**answers, updated_at=timezone.now()):
+        try:
+            with transaction.atomic():
+                NdaSubmission.objects.create(contact_id=contact_id, listing_id=listing_id or '', **answers)
+        except IntegrityError:
+            # Another save created the row first
+            rows.update(**answers, updated_at=timezone.now())
+    transaction.on_commit(partial(invalidate_nda_contact, contact_id))
+    return nda_answers(contact_id, listing_id)
+
+
+def nda_value_map(contact_id, contact=None, params=None, answers=None):
+    """
+    NDA form values for contact_id: values stored on the contact (latest InboundEmail)
+    and its NDA answers win, query parameters (e.g. request.GET) fill the gaps.
+    answers defaults to the saved NdaSubmission for the contact's listing.
+    """
+    def _get(key):
+        return (params.get(key) if params is not None else '') or ''
+    if answers is None:
+        answers = nda_answers(contact_id, contact.listing_id) if contact else {}
+    return build_value_map(
+        contact_id=contact_id,
+        listing_id=(contact.listing_id if contact else '') or _get('listing_id'),
+        listing_name=(contact.listing_name if contact else '') or _get('listing_name'),
+        name=(contact.name if contact else '') or _get('name'),
+        email=(contact.email if contact else '') or _get('email'),
+        phone=(contact.phone if contact else '') or _get('phone'),
+        ref_id=(contact.ref_id if contact else '') or _get('ref_id'),
+        street_address=answers.get('street_address', '') or _get('street_address'),
+        city=answers.get('city', '') or _get('city'),
+        state=answers.get('state', '') or _get('state'),
+        zip_code=answers.get('zip', '') or _get('zip_code'),
+        signature=answers.get('signature', '') or _get('signature'),
+        will_manage=answers.get('will_manage', '') or _get('will_manage'),
+        other_deciders=answers.get('other_deciders', '') or _get('other_deciders'),
+        industry_experience=answers.get('industry_experience', '') or _get('industry_experience'),
+        timeframe=(contact.purchase_timeframe if contact else '') or _get('purchase_timeframe'),
+        liquid_assets=answers.get('liquid_assets', '') or _get('liquid_assets'),
+        real_estate=answers.get('real_estate', '') or _get('real_estate'),
+        retirement_401k=answers.get('retirement_401k', '') or _get('retirement_401k'),
+        funds_for_business=(contact.amount_to_invest if contact else '') or _get('funds_for_business'),
+        partner_name=answers.get('partner_name', '') or _get('partner_name'),
+        using=answers.get('using', '') or _get('using'),
+        govt_affiliation=answers.get('govt_affiliation', '') or _get('govt_affiliation'),
+        govt_explain=answers.get('govt_explain', '') or _get('govt_explain'),
+    )
+
+
+# Required NDA fields for "Requirements left" count (empty = 1 requirement)
+NDA_REQUIRED_FIELDS = ('name', 'email', 'phone', 'ref_id', 'listing_id', 'listing_name', 'signature')
+
+
+def nda_form_context(contact_id, contact, answers=None):
+    """Build context for NDA form page from contact and its NDA answers (or empty)."""
+    if not contact:
+        return {
+            'contact_id': contact_id,
+            'contact': None,
+            'ref_id': '',
+            'listing_id': '',
+            'listing_name': '',
+            'name': '',
+            'email': '',
+            'phone': '',
+            'signature': '',
+            'street_address': '',
+            'city': '',
+            'state': '',
+            'zip': '',
+            'purchase_timeframe': '',
+            'amount_to_invest': '',
+            'partner_name': '',
+            'will_manage': '',
+            'other_deciders': '',
+            'industry_experience': '',
+            'govt_affiliation': '',
+            'govt_explain': '',
+            'requirements_count': len(NDA_REQUIRED_FIELDS),
+        }
+    extra = answers or {}
+    data = {
+        'contact_id': contact_id,
+        'contact': contact,
+        'ref_id': contact.ref_id or '',
+        'listing_id': contact.listing_id or '',
+        'listing_name': contact.listing_name or '',
+        'name': contact.name or '',
+        'email': contact.email or '',
+        'phone': contact.phone or '',
+        'signature': extra.get('signature', ''),
+        'street_address': extra.get('street_address', ''),
+        'city': extra.get('city', ''),
+        'state': extra.get('state', ''),
+        'zip': extra.get('zip', ''),
+        'purchase_timeframe': contact.purchase_timeframe or '',
+        'amount_to_invest': contact.amount_to_invest or '',
+        'partner_name': extra.get('partner_name', ''),
+        'will_manage': extra.get('will_manage', ''),
+        'other_deciders': extra.get('other_deciders', ''),
+        'industry_experience': extra.get('industry_experience', ''),
+        'govt_affiliation': extra.get('govt_affiliation', ''),
+        'govt_explain': extra.get('govt_explain', ''),
+    }
+    # Count how many required fields are still empty
+    count = 0
+    for key in NDA_REQUIRED_FIELDS:
+        if not (data.get(key) or '').strip():
+            count += 1
+    data['requirements_count'] = count
+    return data
+
+
+def get_contact_cache():
+    """The Django cache behind NDA_CONTACT_CACHE, or None when it is off."""
+    if CONTACT_CACHE_ALIAS not in settings.CACHES:
+        return None
+    return caches[CONTACT_CACHE_ALIAS]
+
+
+def _contact_cache_key(contact_id):
+    # Contact ids come from the URL: hash them so any value is a valid cache key
+    return f"nda-contact:{hashlib.sha1(str(contact_id).encode('utf-8')).hexdigest()}"
+
+
+def nda_contact(contact_id):
+    """
+    (contact, answers, form_context) for the NDA viewer: the latest InboundEmail for
+    contact_id (only CONTACT_CACHE_FIELDS loaded) or None, its NDA answers, and
+    nda_form_context() of the two. Read through the NDA_CONTACT_CACHE cache; on a hit
+    contact is an unsaved InboundEmail rebuilt from the cached fields.
+    """
+    cache = get_contact_cache()
+    key = _contact_cache_key(contact_id)
+    entry = cache.get(key, version=CONTACT_CACHE_VERSION) if cache is not None else None
+    if entry is not None:
+        metrics.NDA_CONTACT_CACHE_REQUESTS.inc(result="hit")
+        contact = InboundEmail(**entry["contact"]) if entry["contact"] else None
+        return contact, entry["answers"], dict(entry["form"], contact=contact)
+
+    contact = (
+        InboundEmail.objects.filter(ghl_contact_id=contact_id)
+        .order_by("-received_at").only(*CONTACT_CACHE_FIELDS).first()
+    )
+    answers = nda_answers(contact_id, contact.listing_id) if contact else {}
+    form = nda_form_context(contact_id, contact, answers)
+    if cache is not None:
+        metrics.NDA_CONTACT_CACHE_REQUESTS.inc(result="miss")
+        cache.set(key, {
+            "contact": {name: getattr(contact, name) for name in CONTACT_CACHE_FIELDS} if contact else None,
+            "answers": answers,
+            "form": {k: v for k, v in form.items() if k != "contact"},
+        }, version=CONTACT_CACHE_VERSION)
+    return contact, answers, form
+
+
+def invalidate_nda_contact(contact_id):
+    """Drop contact_id's cached NDA lookup (no-op when the cache is off)."""
+    cache = get_contact_cache()
+    if cache is None or not contact_id:
+        return
+    cache.delete(_contact_cache_key(contact_id), version=CONTACT_CACHE_VERSION)
+    metrics.NDA_CONTACT_CACHE_INVALIDATIONS.inc()
+
+
+@receiver(post_save, sender=InboundEmail, dispatch_uid="inbound.nda.invalidate_contact_on_email_save")
+@receiver(post_delete, sender=InboundEmail, dispatch_uid="inbound.nda.invalidate_contact_on_email_delete")
+@receiver(post_save, sender=NdaSubmission, dispatch_uid="inbound.nda.invalidate_contact_on_answers_save")
+@receiver(post_delete, sender=NdaSubmission, dispatch_uid="inbound.nda.invalidate_contact_on_answers_delete")
+def invalidate_contact_on_write(sender, instance, using, **kwargs):
+    """
+    Drop the cached lookup of the contact a saved/deleted row belongs to once the write
+    has committed (dropping it earlier would let a viewer re-cache the old row before then).
+    """
+    contact_id = instance.contact_id if sender is NdaSubmission else instance.ghl_contact_id
+    if contact_id and get_contact_cache() is not None:
+        transaction.on_commit(partial(invalidate_nda_contact, contact_id), using=using)
+
+
+def prerender_nda(contact_id, contact):
+    """Render contact's NDA into pdf_cache unless it is already there. Returns the cache key."""
+    value_map = nda_value_map(contact_id, contact)
+    key = cache_key(value_map)
+    cache = get_cache()
+    if cache is None:
+        return None
+    if cache.get(key) is not None:
+        metrics.NDA_PRERENDERS.inc(result="cached")
+    else:
+        get_or_render(value_map, key)
+        metrics.NDA_PRERENDERS.inc(result="rendered")
+    if linearize_enabled():
+        linearize_into_cache(value_map)
+    return key
+
+
+def _prerender_safely(contact_id, contact):
+    try:
+        prerender_nda(contact_id, contact)
+        logger.info("[NDA] Pre-rendered NDA for contact %s", contact_id)
+    except Exception as e:
+        metrics.NDA_PRERENDERS.inc(result="failed")
+        logger.warning("[NDA] Pre-render failed for contact %s: %s", contact_id, e)
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, int(getattr(settings, "NDA_PRERENDER_WORKERS", 1))),
+                thread_name_prefix="nda-prerender",
+            )
+        return _executor
+
+
+def _linearize_safely(value_map, key):
+    global _linearize_failed_at
+    try:
+        ok = linearize_into_cache(value_map) is not None
+    except Exception as e:
+        metrics.NDA_PDF_LINEARIZATIONS.inc(result="failed")
+        logger.warning("[NDA] Linearize failed for %s: %s", key, e)
+        ok = False
+    with _executor_lock:
+        _linearize_pending.discard(key)
+        _linearize_failed_at = None if ok else time.monotonic()
+
+
+def queue_linearize(value_map, key):
+    """
+    Linearize value_map's PDF into pdf_cache (under its linearized key) in the background,
+    unless a job for key is already queued or a linearize failed in the last
+    LINEARIZE_RETRY_AFTER seconds. The viewer serves it from the next load on.
+    """
+    with _executor_lock:
+        if key in _linearize_pending:
+            return
+        if _linearize_failed_at is not None and time.monotonic() - _linearize_failed_at < LINEARIZE_RETRY_AFTER:
+            return
+        _linearize_pending.add(key)
+    _get_executor().submit(_linearize_safely, value_map, key)
+
+
+@receiver(contact_synced, dispatch_uid="inbound.nda.prerender")
+def prerender_on_contact_synced(sender, contact_id, email, **kwargs):
+    """Queue a background NDA render for a newly synced contact (NDA_PRERENDER)."""
+    if not getattr(settings, "NDA_PRERENDER", True) or get_cache() is None:
+        return
+    _get_executor().submit(_prerender_safely, contact_id, email)
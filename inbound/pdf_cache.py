@@ -0,0 +1,249 @@
+"""
+Cache of rendered NDA PDFs, keyed by content hash.
+
+The key is a sha256 of the resolved value map (pdf_nda.build_value_map), the template
+version (sha256 of the template file) and the settings that affect the output (KEY_SETTINGS),
+so a PDF is re-rendered only when what would be written into it changes. The same key doubles as the ETag for
+conditional GETs on nda_pdf_stream.
+
+With NDA_PDF_LINEARIZE, a linearized copy is stored under its own key (linearized=True),
+written by linearize_into_cache outside the request path (pre-render or a background job
+queued by the viewer). Each key always maps to the same bytes, so ETags and If-Range stay
+valid; viewers get the plain PDF until the linearized one is cached, and keep getting it
+when qpdf is missing or fails.
+
+Backends (NDA_PDF_CACHE):
+- "memory": per-process LRU bounded by NDA_PDF_CACHE_MAX_BYTES (default)
+- "disk":   files in NDA_PDF_CACHE_DIR, shared by all workers, oldest evicted past the same bound
+- "off":    always render
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from django.conf import settings
+
+from . import metrics
+from .pdf_nda import get_prepared_template, linearize_pdf, render_value_map_parts
+
+logger = logging.getLogger(__name__)
+
+# Settings that change the rendered bytes, and so are part of the cache key
+KEY_SETTINGS = (
+    ("NDA_PDF_BACKEND", "pypdf"),
+    ("NDA_PDF_FILL_MODE", "full"),
+)
+
+
+def _backend():
+    return (getattr(settings, "NDA_PDF_CACHE", "memory") or "off").lower()
+
+
+def _max_bytes():
+    return int(getattr(settings, "NDA_PDF_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+
+def cache_key(value_map, template=None, linearized=False):
+    """Content hash for a value map rendered against the current template and fill settings."""
+    template = template or get_prepared_template()
+    h = hashlib.sha256()
+    h.update(template.version.encode("ascii"))
+    h.update(b"\0")
+    if linearized:
+        h.update(b"linearized\0")
+    for name, default in KEY_SETTINGS:
+        h.update(str(getattr(settings, name, default)).encode("utf-8"))
+        h.update(b"\0")
+    h.update(json.dumps(value_map, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    return h.hexdigest()
+
+
+class MemoryCache:
+    """Thread-safe LRU of rendered chunk lists, bounded by the bytes each entry owns."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (parts, size)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, parts, shared=None):
+        # Chunks that are the shared template bytes (incremental mode) are not counted
+        size = sum(len(p) for p in parts if p is not shared)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+            self._entries[key] = (parts, size)
+            self._size += size
+            while self._size > self.max_bytes and self._entries:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= evicted
+                metrics.NDA_PDF_CACHE_EVICTIONS.inc()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+class DiskCache:
+    """Rendered PDFs as <key>.pdf files; mtime is the LRU clock (touched on every hit)."""
+
+    def __init__(self, directory, max_bytes):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return self.directory / f"{key}.pdf"
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            return None
+        return [data]
+
+    def set(self, key, parts, shared=None):
+        data = b"".join(parts)
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Could not write NDA PDF cache file %s: %s", path, e)
+            return
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        total = 0
+        for path in self.directory.glob("*.pdf"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, path))
+            total += st.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            metrics.NDA_PDF_CACHE_EVICTIONS.inc()
+
+    def clear(self):
+        for path in self.directory.glob("*.pdf"):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache():
+    """Return the configured cache backend (None when NDA_PDF_CACHE is off)."""
+    backend = _backend()
+    if backend not in ("memory", "disk"):
+        return None
+    with _caches_lock:
+        cache = _caches.get(backend)
+        if cache is None:
+            if backend == "disk":
+                cache = DiskCache(settings.NDA_PDF_CACHE_DIR, _max_bytes())
+            else:
+                cache = MemoryCache(_max_bytes())
+            _caches[backend] = cache
+        return cache
+
+
+def get_or_render(value_map, key=None):
+    """
+    Return (key, parts) for a value map: the cached chunks when present, otherwise
+    render with pdf_nda.render_value_map_parts and store the result.
+    """
+    template = get_prepared_template()
+    key = key or cache_key(value_map, template)
+    cache = get_cache()
+    if cache is not None:
+        parts = cache.get(key)
+        if parts is not None:
+            metrics.NDA_PDF_CACHE_REQUESTS.inc(result="hit")
+            return key, parts
+    metrics.NDA_PDF_CACHE_REQUESTS.inc(result="miss")
+    parts = render_value_map_parts(value_map)
+    if cache is not None:
+        cache.set(key, parts, shared=template.data)
+    return key, parts
+
+
+def clear_cache():
+    """Drop all cached renders (the template version in the key already covers template edits)."""
+    with _caches_lock:
+        caches = list(_caches.values())
+        _caches.clear()
+    for cache in caches:
+        cache.clear()
+
+
+def linearize_enabled():
+    """True when linearized copies are made and served (NDA_PDF_LINEARIZE with a cache to keep them)."""
+    return bool(getattr(settings, "NDA_PDF_LINEARIZE", False)) and get_cache() is not None
+
+
+def linearize_into_cache(value_map):
+    """
+    Store value_map's linearized PDF under its linearized key: the plain render (cached or
+    rendered now) run through qpdf. Slow (a subprocess), so call it off the request path.
+    Returns the key, or None when the cache is off or qpdf failed (logged; viewers keep
+    getting the plain PDF).
+    """
+    cache = get_cache()
+    if cache is None:
+        return None
+    template = get_prepared_template()
+    key = cache_key(value_map, template, linearized=True)
+    if cache.get(key) is not None:
+        return key
+    plain_key = cache_key(value_map, template)
+    parts = cache.get(plain_key)
+    if parts is None:
+        parts = render_value_map_parts(value_map)
+        cache.set(plain_key, parts, shared=template.data)
+    try:
+        data = linearize_pdf(b"".join(parts))
+    except RuntimeError as e:
+        metrics.NDA_PDF_LINEARIZATIONS.inc(result="failed")
+        logger.warning("Could not linearize NDA PDF; serving it unlinearized: %s", e)
+        return None
+    cache.set(key, [data])
+    metrics.NDA_PDF_LINEARIZATIONS.inc(result="linearized")
+    return key
@@ -11,16 +11,47 @@ Template: inbound/static/inbound/NDA_Template.pdf is the fillable PDF (saved as
 
 Render: fill_nda_pdf(...) uses pypdf to fill form field values only, so the rest of the
 PDF (body text, fonts, layout) is preserved and not re-encoded (avoids garbled text).
+The template is read, reattached, cleaned and parsed once per process
+(get_prepared_template, invalidated when the file changes); each fill clones that
+parsed copy and sets values.
+With NDA_PDF_FILL_MODE = "incremental", a fill instead appends a PDF incremental update
+(changed field dictionaries + xref) to the unchanged template bytes.
+
+Fill backends (NDA_PDF_BACKEND, see FILL_BACKENDS): "pypdf" (default, as described above)
+or "pymupdf", which sets widget values with PyMuPDF and regenerates each changed
+field's appearance stream. Both take a value map and return a list of byte chunks.
+
+linearize_pdf rewrites a PDF as linearized ("fast web view", via qpdf) so PDF.js can show
+page 1 from the first ranges it fetches. Fills are never linearized inline: with
+NDA_PDF_LINEARIZE, pdf_cache.linearize_into_cache does it in the background and the
+viewer serves the linearized copy once it is cached. add_form_fields_to_template can
+linearize the template as well (NDA_TEMPLATE_LINEARIZE / add_nda_form_fields --linearize).
+
+Signed copies saved to disk go through finalize_signed_pdf: field appearances are baked
+into the page content (no longer editable), unused objects dropped and streams deflated.
 """
 
+import dataclasses
+import hashlib
 import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+from dataclasses import dataclass
 from io import BytesIO
 from pathlib import Path
 
-import fitz  # PyMuPDF (for add_form_fields only)
-from pypdf import PdfReader, PdfWriter
-from pypdf.constants import FieldDictionaryAttributes as FA
-from pypdf.generic import NameObject, NumberObject
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from . import metrics
+from .lazy import lazy_import
+
+# Loaded on first use (see inbound.lazy): most workers never fill a PDF
+fitz = lazy_import("fitz")  # PyMuPDF (add_form_fields and the pymupdf fill backend)
+pypdf = lazy_import("pypdf")
 
 # Path to the template (static: inbound/static/inbound/NDA_Template.pdf)
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -222,16 +253,18 @@ def _redact_choose_an_item_text(page: "fitz.Page") -> None:
         page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_NONE, graphics=fitz.PDF_REDACT_LINE_ART_NONE)
 
 
-def add_form_fields_to_template():
+def add_form_fields_to_template(linearize=None):
     """
     Open NDA_Template.pdf, remove any existing form widgets, add widgets at exact
     positions (wrap for exact location), save and overwrite.
     Uses ORIGINAL_NDA_TEMPLATE_PATH (project root) as source if present, so layout
     matches the original (e.g. "Explain:" is preserved).
+    linearize (default NDA_TEMPLATE_LINEARIZE) writes the template linearized via qpdf.
     """
+    if linearize is None:
+        linearize = getattr(settings, "NDA_TEMPLATE_LINEARIZE", False)
     # Start from original template if provided at project root
     if ORIGINAL_NDA_TEMPLATE_PATH.exists():
-        import shutil
         NDA_TEMPLATE_PATH.parent.mkdir(parents=True, exist_ok=True)
         shutil.copy2(ORIGINAL_NDA_TEMPLATE_PATH, NDA_TEMPLATE_PATH)
     if not NDA_TEMPLATE_PATH.exists():
@@ -284,22 +317,19 @@ def add_form_fields_to_template():
     # Preserve existing content: avoid clean=True to reduce re-encoding of body text/fonts
     doc.save(tmp_path, clean=False, deflate=False, garbage=0)
     doc.close()
+    if linearize:
+        tmp_path.write_bytes(linearize_pdf(tmp_path.read_bytes()))
     os.replace(tmp_path, NDA_TEMPLATE_PATH)
+    clear_template_cache()
     return True
 
 
-def fill_nda_pdf(contact_id=None, listing_id="", listing_name="", name="", email="", phone="",
-                 ref_id="", street_address="", city="", state="", zip_code="", signature="",
-                 will_manage="", other_deciders="", industry_experience="", timeframe="",
-                 liquid_assets="", real_estate="", retirement_401k="", funds_for_business="",
-                 partner_name="", using="", govt_affiliation="", govt_explain="", **kwargs):
-    """
-    Load fillable NDA_Template.pdf, set form field values with pypdf (preserves all other
-    PDF content so body text and fonts are not corrupted), return PDF bytes.
-    """
-    if not NDA_TEMPLATE_PATH.exists():
-        raise FileNotFoundError(f"Template not found: {NDA_TEMPLATE_PATH}")
-
+def build_value_map(contact_id=None, listing_id="", listing_name="", name="", email="", phone="",
+                    ref_id="", street_address="", city="", state="", zip_code="", signature="",
+                    will_manage="", other_deciders="", industry_experience="", timeframe="",
+                    liquid_assets="", real_estate="", retirement_401k="", funds_for_business="",
+                    partner_name="", using="", govt_affiliation="", govt_explain="", **kwargs):
+    """Map fill_nda_pdf arguments to {form field name: value} exactly as written into the PDF."""
     # Choice fields: when empty, use "Choose an item" so it shows as label until user selects.
     _default_choice = "Choose an item"
     value_map = {
@@ -332,9 +362,190 @@ def fill_nda_pdf(contact_id=None, listing_id="", listing_name="", name="", email
     # Truncate long values so they fit in typical field width
     for k in value_map:
         value_map[k] = str(value_map[k])[:255]
+    return value_map
+
+
+def fill_nda_pdf(contact_id=None, **kwargs):
+    """
+    Load fillable NDA_Template.pdf, set form field values with pypdf (preserves all other
+    PDF content so body text and fonts are not corrupted), return PDF bytes.
+    Accepts the field keyword arguments of build_value_map.
+    """
+    return render_value_map(build_value_map(contact_id=contact_id, **kwargs))
+
+
+def fill_nda_pdf_parts(contact_id=None, **kwargs):
+    """Like fill_nda_pdf, but return the PDF as a list of byte chunks (see render_value_map_parts)."""
+    return render_value_map_parts(build_value_map(contact_id=contact_id, **kwargs))
+
+
+def render_value_map(value_map):
+    """Fill the template with a value map from build_value_map and return PDF bytes."""
+    parts = render_value_map_parts(value_map)
+    return parts[0] if len(parts) == 1 else b"".join(parts)
+
+
+def render_value_map_parts(value_map, backend=None):
+    """
+    Fill the template and return the PDF as a list of byte chunks, ready to be streamed.
+    backend defaults to NDA_PDF_BACKEND (see FILL_BACKENDS). Never linearized (qpdf is
+    too slow for the request path; see pdf_cache.linearize_into_cache).
+    """
+    return get_fill_backend(backend)(value_map)
+
+
+def linearize_pdf(data):
+    """
+    Return data linearized ("fast web view": page 1 objects and hint tables first) using
+    the qpdf command line tool (NDA_QPDF_PATH, default "qpdf" on PATH). PyMuPDF no longer
+    writes linearized files. Raises RuntimeError when qpdf is missing, fails or times out.
+    """
+    qpdf = shutil.which(getattr(settings, "NDA_QPDF_PATH", "") or "qpdf")
+    if not qpdf:
+        raise RuntimeError("qpdf not found; install qpdf or set NDA_QPDF_PATH to linearize PDFs")
+    with tempfile.TemporaryDirectory(prefix="nda_linearize_") as tmp:
+        src = Path(tmp) / "in.pdf"
+        dst = Path(tmp) / "out.pdf"
+        src.write_bytes(data)
+        try:
+            result = subprocess.run([qpdf, "--linearize", str(src), str(dst)], capture_output=True, timeout=60)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise RuntimeError(f"qpdf --linearize could not run: {e}") from e
+        # Exit status 3 means success with warnings
+        if result.returncode not in (0, 3):
+            stderr = result.stderr.decode(errors="replace")[:500]
+            raise RuntimeError(f"qpdf --linearize failed ({result.returncode}): {stderr}")
+        return dst.read_bytes()
+
+
+def render_pypdf_parts(value_map):
+    """
+    pypdf backend. With NDA_PDF_FILL_MODE = "incremental" this is [cached template bytes,
+    incremental update]: the first chunk is the shared prepared template object itself
+    (no copy per request). Otherwise it is a single fully rewritten document.
+    """
+    if not getattr(settings, "NDA_TEMPLATE_CACHE", True):
+        return [_render_uncached(value_map)]
+    if getattr(settings, "NDA_PDF_FILL_MODE", "full") == "incremental":
+        parts = render_incremental(value_map)
+        if parts is not None:
+            return parts
+    return [render_full(value_map)]
+
+
+def render_pymupdf_parts(value_map):
+    """
+    PyMuPDF backend: open the template (the prepared copy when NDA_TEMPLATE_CACHE is on),
+    set each changed widget's value, regenerate its appearance stream and save.
+    """
+    if getattr(settings, "NDA_TEMPLATE_CACHE", True):
+        source = get_prepared_template().data
+    elif NDA_TEMPLATE_PATH.exists():
+        source = NDA_TEMPLATE_PATH.read_bytes()
+    else:
+        raise FileNotFoundError(f"Template not found: {NDA_TEMPLATE_PATH}")
+    doc = fitz.open(stream=source, filetype="pdf")
+    try:
+        for page in doc:
+            for widget in page.widgets():
+                value = value_map.get(widget.field_name)
+                if value is None or (widget.field_value or "") == value:
+                    continue
+                widget.field_value = value
+                widget.update()
+        return [doc.tobytes(garbage=0, deflate=False)]
+    finally:
+        doc.close()
+
+
+# NDA_PDF_BACKEND name -> callable(value_map) returning a list of PDF byte chunks
+FILL_BACKENDS = {
+    "pypdf": render_pypdf_parts,
+    "pymupdf": render_pymupdf_parts,
+}
+
+
+def get_fill_backend(name=None):
+    """Return the fill callable for name (default NDA_PDF_BACKEND)."""
+    name = name or getattr(settings, "NDA_PDF_BACKEND", "pypdf")
+    try:
+        return FILL_BACKENDS[name]
+    except KeyError:
+        raise ImproperlyConfigured(
+            f"Unknown NDA_PDF_BACKEND {name!r}; expected one of {', '.join(sorted(FILL_BACKENDS))}"
+        ) from None
+
 
-    reader = PdfReader(NDA_TEMPLATE_PATH)
-    writer = PdfWriter()
+def render_full(value_map):
+    """
+    Clone the prepared template's already parsed reader (no re-parse of the bytes), set
+    field values and rewrite the whole document.
+    """
+    template = get_prepared_template()
+    # The reader is shared by all threads; cloning only reads its cached objects
+    with template.reader_lock:
+        writer = pypdf.PdfWriter(clone_from=template.reader)
+    fields = {k: v for k, v in value_map.items() if k in template.fields} if template.fields else value_map
+    writer.update_page_form_field_values(writer.pages[0], fields, auto_regenerate=False)
+    buffer = BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def render_incremental(value_map):
+    """
+    Fill by PDF incremental update: return [template bytes, update], where the update
+    appends only the field dictionaries whose value differs from the template, a new
+    xref section for them and a trailer chaining to the template's xref (/Prev).
+    Changed fields drop their stale /AP; the template sets NeedAppearances so viewers
+    render the new values. Returns None when a field cannot be updated this way
+    (e.g. value stored on a parent field), so the caller falls back to render_full.
+    """
+    template = get_prepared_template()
+    if template.startxref is None:
+        return None
+    base_len = len(template.data)
+    body = BytesIO()
+    body.write(b"\n")
+    offsets = {}
+    for name, value in value_map.items():
+        if name not in template.fields:
+            continue
+        field = template.field_objects.get(name)
+        if field is None:
+            return None
+        if str(field.get("/V", "")) == value:
+            continue
+        idnum, generation = template.fields[name]
+        updated = pypdf.generic.DictionaryObject(field)
+        updated[pypdf.generic.NameObject("/V")] = pypdf.generic.TextStringObject(value)
+        for stale in ("/AP", "/I"):
+            updated.pop(pypdf.generic.NameObject(stale), None)
+        offsets[idnum] = (base_len + body.tell(), generation)
+        body.write(f"{idnum} {generation} obj\n".encode("ascii"))
+        updated.write_to_stream(body)
+        body.write(b"\nendobj\n")
+    if not offsets:
+        return [template.data]
+
+    xref_offset = base_len + body.tell()
+    body.write(b"xref\n")
+    for idnum in sorted(offsets):
+        offset, generation = offsets[idnum]
+        # Each xref entry is exactly 20 bytes including the two-byte EOL
+        body.write(f"{idnum} 1\n{offset:010d} {generation:05d} n\r\n".encode("ascii"))
+    body.write(b"trailer\n<< ")
+    body.write(template.trailer_entries)
+    body.write(f" /Prev {template.startxref} >>\nstartxref\n{xref_offset}\n%%EOF\n".encode("ascii"))
+    return [template.data, body.getvalue()]
+
+
+def _render_uncached(value_map):
+    """Fill straight from the template file (no cache): read, append, reattach, fill, write."""
+    if not NDA_TEMPLATE_PATH.exists():
+        raise FileNotFoundError(f"Template not found: {NDA_TEMPLATE_PATH}")
+    reader = pypdf.PdfReader(NDA_TEMPLATE_PATH)
+    writer = pypdf.PdfWriter()
     # Append only (no clone_reader_document_root) to avoid duplicating pages
     writer.append(reader)
     # PyMuPDF-created forms may have fields only in page /Annots; reattach builds /Fields
@@ -348,8 +559,144 @@ def fill_nda_pdf(contact_id=None, listing_id="", listing_name="", name="", email
     return buffer.getvalue()
 
 
-def _clear_readonly_fields(writer: PdfWriter) -> None:
+def finalize_signed_pdf(pdf_bytes):
+    """
+    Turn a filled NDA into its archival form: regenerate every field appearance, bake
+    widgets into the page content (flattened, non-editable), garbage-collect unused
+    objects and deflate streams. Records the before/after sizes in metrics.
+    """
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        for page in doc:
+            for widget in page.widgets():
+                widget.update()
+        doc.bake(annots=True, widgets=True)
+        final = doc.tobytes(garbage=4, deflate=True, deflate_images=True, deflate_fonts=True, use_objstms=1)
+    finally:
+        doc.close()
+    metrics.NDA_SIGNED_PDF_BYTES.inc(len(pdf_bytes), stage="filled")
+    metrics.NDA_SIGNED_PDF_BYTES.inc(len(final), stage="finalized")
+    return final
+
+
+@dataclass(frozen=True)
+class PreparedTemplate:
+    """NDA template after the fill-independent steps, ready to be cloned per fill."""
+    data: bytes  # reattached fields, NeedAppearances set, ReadOnly cleared
+    fields: dict  # form field name -> (object number, generation) of its widget dict in data
+    field_objects: dict  # form field name -> widget DictionaryObject (when it carries /T itself)
+    startxref: int  # offset of data's xref section (None if not a classic xref table)
+    trailer_entries: bytes  # serialized /Size /Root /Info /ID for an incremental-update trailer
+    reader: object  # pypdf.PdfReader over data, every object already resolved (cloned by render_full)
+    version: str  # sha256 of the source template file
+    stat_key: tuple  # (mtime_ns, size) of the source file when prepared
+    reader_lock: threading.Lock = dataclasses.field(default_factory=threading.Lock, compare=False)
+
+
+_template_cache = {}
+_template_cache_lock = threading.Lock()
+
+
+def _prepare_template(raw):
+    reader = pypdf.PdfReader(BytesIO(raw))
+    writer = pypdf.PdfWriter()
+    writer.append(reader)
+    writer.reattach_fields()
+    writer.set_need_appearances_writer(True)
+    _clear_readonly_fields(writer)
+    _add_default_font(writer)
+    buffer = BytesIO()
+    writer.write(buffer)
+    data = buffer.getvalue()
+
+    fields = {}
+    field_objects = {}
+    prepared = pypdf.PdfReader(BytesIO(data))
+    for annot_ref in prepared.pages[0].get("/Annots") or []:
+        annot = annot_ref.get_object()
+        field_name = annot.get("/T")
+        if field_name is None and "/Parent" in annot:
+            field_name = annot["/Parent"].get_object().get("/T")
+        elif field_name is not None:
+            field_objects[str(field_name)] = annot
+        if field_name is not None and hasattr(annot_ref, "idnum"):
+            fields[str(field_name)] = (annot_ref.idnum, annot_ref.generation)
+
+    # Trailer pieces for incremental updates (pypdf writes a classic xref table)
+    startxref = None
+    match = re.search(rb"startxref\s+(\d+)\s+%%EOF\s*$", data[-1024:])
+    if match and data[int(match.group(1)):int(match.group(1)) + 4] == b"xref":
+        startxref = int(match.group(1))
+    trailer = pypdf.generic.DictionaryObject({
+        pypdf.generic.NameObject(key): prepared.trailer.raw_get(key)
+        for key in ("/Size", "/Root", "/Info", "/ID") if key in prepared.trailer
+    })
+    entries = BytesIO()
+    trailer.write_to_stream(entries)
+    trailer_entries = entries.getvalue().strip()[2:-2].strip()  # drop the outer << >>
+    # Clone once so every object the fill path reaches is parsed and cached on the reader
+    pypdf.PdfWriter(clone_from=prepared)
+    return data, fields, field_objects, startxref, trailer_entries, prepared
+
+
+def get_prepared_template(path=None):
+    """
+    Return the PreparedTemplate for path (default NDA_TEMPLATE_PATH), cached per process.
+    The file is stat()ed on each call and re-prepared when its mtime or size changes
+    (or, with NDA_TEMPLATE_CACHE_VERIFY_HASH, when its sha256 changes).
+    """
+    path = Path(path or NDA_TEMPLATE_PATH)
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Template not found: {path}") from None
+    stat_key = (st.st_mtime_ns, st.st_size)
+    verify_hash = getattr(settings, "NDA_TEMPLATE_CACHE_VERIFY_HASH", False)
+    with _template_cache_lock:
+        cached = _template_cache.get(path)
+        if cached is not None and cached.stat_key == stat_key and not verify_hash:
+            return cached
+        raw = path.read_bytes()
+        version = hashlib.sha256(raw).hexdigest()
+        if cached is not None and cached.version == version:
+            if cached.stat_key != stat_key:
+                cached = _template_cache[path] = dataclasses.replace(cached, stat_key=stat_key)
+            return cached
+        prepared = _template_cache[path] = PreparedTemplate(*_prepare_template(raw), version, stat_key)
+        return prepared
+
+
+def clear_template_cache():
+    """Drop cached prepared templates (e.g. after add_form_fields_to_template)."""
+    with _template_cache_lock:
+        _template_cache.clear()
+
+
+def _add_default_font(writer: "pypdf.PdfWriter") -> None:
+    """
+    Give the AcroForm a /DR font for the fields' /Helv, so pypdf finds it when it builds
+    appearance streams instead of logging a warning and rebuilding Helvetica per field.
+    """
+    g = pypdf.generic
+    acroform = writer._root_object.get(g.NameObject("/AcroForm"))
+    if acroform is None:
+        return
+    resources = acroform.setdefault(g.NameObject("/DR"), g.DictionaryObject())
+    fonts = resources.setdefault(g.NameObject("/Font"), g.DictionaryObject())
+    if g.NameObject("/Helv") in fonts:
+        return
+    fonts[g.NameObject("/Helv")] = writer._add_object(g.DictionaryObject({
+        g.NameObject("/Type"): g.NameObject("/Font"),
+        g.NameObject("/Subtype"): g.NameObject("/Type1"),
+        g.NameObject("/BaseFont"): g.NameObject("/Helvetica"),
+        g.NameObject("/Encoding"): g.NameObject("/WinAnsiEncoding"),
+    }))
+
+
+def _clear_readonly_fields(writer: "pypdf.PdfWriter") -> None:
     """Clear the ReadOnly bit on all form fields so the PDF can be edited in viewers."""
+    FA = pypdf.constants.FieldDictionaryAttributes
+    NameObject, NumberObject = pypdf.generic.NameObject, pypdf.generic.NumberObject
     try:
         af = writer._root_object.get(NameObject("/AcroForm"))
         if af is None:
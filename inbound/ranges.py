@@ -0,0 +1,112 @@
+"""
+HTTP Range support (RFC 9110 §14) for the PDF views.
+
+PDF.js issues Range requests when a response advertises "Accept-Ranges: bytes" and a
+Content-Length, and renders page 1 as soon as the ranges it needs have arrived instead
+of waiting for the whole body. Only single byte ranges are served as 206; multi-range
+requests get the full 200 response, which the RFC allows.
+"""
+
+from django.http import HttpResponse
+from django.utils.http import parse_etags
+
+CHUNK_SIZE = 64 * 1024
+
+
+class RangeNotSatisfiable(Exception):
+    """The Range header is well-formed but lies outside the representation."""
+
+
+def parse_range(header, size):
+    """
+    Parse a Range header value against a body of size bytes.
+    Returns (start, end) with end inclusive, or None when the header should be ignored
+    (absent, malformed, not bytes, or several ranges). Raises RangeNotSatisfiable.
+    """
+    if not header or not header.startswith("bytes="):
+        return None
+    spec = header[len("bytes="):].strip()
+    if "," in spec or "-" not in spec:
+        return None
+    first, last = (s.strip() for s in spec.split("-", 1))
+    try:
+        if first == "":
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                raise RangeNotSatisfiable(header)
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start < 0 or end < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+    return start, min(end, size - 1)
+
+
+def requested_range(request, size, etag=None, last_modified=None):
+    """
+    The (start, end) range to serve for request, or None for the full body.
+    If-Range is honoured: a range is only served when the validator still matches.
+    Raises RangeNotSatisfiable.
+    """
+    if request.method != "GET":
+        return None
+    header = request.META.get("HTTP_RANGE")
+    if not header:
+        return None
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if if_range:
+        if if_range.startswith(('"', 'W/"')):
+            if not etag or if_range.startswith("W/") or parse_etags(if_range) != [etag]:
+                return None
+        elif last_modified is None or if_range.strip() != last_modified:
+            return None
+    return parse_range(header, size)
+
+
+def iter_parts_range(parts, start, end):
+    """Yield the bytes start..end (inclusive) of a body given as a list of byte chunks."""
+    offset = 0
+    for part in parts:
+        part_end = offset + len(part)
+        if part_end > start and offset <= end:
+            lo = max(start - offset, 0)
+            hi = min(end - offset + 1, len(part))
+            yield memoryview(part)[lo:hi]
+        offset = part_end
+        if offset > end:
+            break
+
+
+def iter_file_range(f, start, end, chunk_size=CHUNK_SIZE):
+    """Yield bytes start..end (inclusive) of an open binary file in chunk_size reads, then close it."""
+    try:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            data = f.read(min(chunk_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
+    finally:
+        f.close()
+
+
+def make_partial(response, start, end, size):
+    """Turn a response whose body is the range start..end into a 206 Partial Content."""
+    response.status_code = 206
+    response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Content-Length"] = str(end - start + 1)
+    return response
+
+
+def not_satisfiable(size):
+    """416 response for a Range outside a body of size bytes."""
+    response = HttpResponse(status=416)
+    response["Content-Range"] = f"bytes */{size}"
+    return response
@@ -0,0 +1,118 @@
+"""
+Full-text search over inbound emails with an SQLite FTS5 index.
+
+inbound_inboundemail_fts is an external-content FTS5 table over SEARCH_FIELDS: it
+stores only the index (the text stays in inbound_inboundemail) and triggers keep it
+in sync on every insert, delete and update of an indexed column, including writes
+that bypass the ORM. Created by migration 0010; rebuild with
+"python manage.py rebuild_email_search".
+
+search_emails() answers a query with one MATCH on the index (milliseconds at
+millions of rows) instead of LIKE '%term%' scans. On other databases, or SQLite
+builds without FTS5, it falls back to icontains filters.
+"""
+
+import logging
+import re
+
+from django.db import OperationalError, connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "inbound_inboundemail_fts"
+CONTENT_TABLE = "inbound_inboundemail"
+# The admin's search_fields plus html_body
+SEARCH_FIELDS = (
+    "subject", "text_body", "html_body", "name", "email", "from_address", "to_address",
+    "listing_id", "listing_name", "ref_id", "original_email_message_id",
+)
+# Terms beyond this are ignored (each one is another index lookup)
+MAX_TERMS = 8
+
+_columns = ", ".join(SEARCH_FIELDS)
+_new = ", ".join(f"new.{c}" for c in SEARCH_FIELDS)
+_old = ", ".join(f"old.{c}" for c in SEARCH_FIELDS)
+
+CREATE_SQL = (
+    # prefix indexes make "term"* queries (search-as-you-type) as cheap as exact ones
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5({_columns}, content='{CONTENT_TABLE}', "
+    f"content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {CONTENT_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {CONTENT_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.id, {_old}); END",
+    # Only updates of indexed columns re-index the row (not e.g. ghl_contact_id or parsed_at)
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF {_columns} ON {CONTENT_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.id, {_old}); "
+    f"INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new}); END",
+)
+DROP_SQL = (
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+)
+
+
+def create_search_index(connection):
+    """
+    Create the FTS5 table and triggers on an SQLite connection and index existing rows.
+    Returns False (and logs) when the connection is not SQLite or SQLite lacks FTS5.
+    """
+    if connection.vendor != "sqlite":
+        return False
+    with connection.cursor() as cursor:
+        try:
+            for statement in CREATE_SQL:
+                cursor.execute(statement)
+        except OperationalError as e:
+            if "fts5" not in str(e):
+                raise
+            logger.warning("SQLite has no FTS5; email search will use LIKE scans: %s", e)
+            return False
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return True
+
+
+def drop_search_index(connection):
+    """Drop the FTS5 table and triggers (SQLite only)."""
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for statement in DROP_SQL:
+            cursor.execute(statement)
+
+
+def has_search_index(using="default"):
+    """True when the database behind alias using has the FTS5 index."""
+    connection = connections[using]
+    return connection.vendor == "sqlite" and FTS_TABLE in connection.introspection.table_names()
+
+
+def search_terms(text):
+    """Word tokens of a search box entry (punctuation and FTS5 operators dropped)."""
+    return re.findall(r"\w+", text or "")[:MAX_TERMS]
+
+
+def match_expression(terms):
+    """FTS5 MATCH expression: every term required, each as a prefix ("term"*)."""
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def search_emails(queryset, text):
+    """Restrict an InboundEmail queryset to emails matching every word of text."""
+    terms = search_terms(text)
+    if not terms:
+        return queryset
+    if has_search_index(queryset.db):
+        return queryset.filter(pk__in=RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", (match_expression(terms),),
+        ))
+    for term in terms:
+        any_field = Q()
+        for field in SEARCH_FIELDS:
+            any_field |= Q(**{f"{field}__icontains": term})
+        queryset = queryset.filter(any_field)
+    return queryset
@@ -0,0 +1,9 @@
+"""
+Signals sent by the inbound app.
+"""
+
+from django.dispatch import Signal
+
+# Sent by ghl.sync_contact_to_ghl after a GHL contact is created.
+# Keyword arguments: contact_id (GHL contact id), email (the InboundEmail it was created from).
+contact_synced = Signal()
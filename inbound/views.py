@@ -9,7 +9,8 @@ import email as email_module
 import json
 import logging
 import re
-from datetime import datetime
+import stat
+from datetime import datetime, timedelta
 from decimal import Decimal
 from email import policy
 from pathlib import Path
@@ -18,21 +19,45 @@ from zoneinfo import ZoneInfo
 from django.conf import settings
 from django.utils import timezone as django_tz
 
-from django.http import HttpResponse, JsonResponse, RawPostDataException
+from django.http import FileResponse, HttpResponse, JsonResponse, RawPostDataException, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date, urlencode
 
-from .pdf_nda import fill_nda_pdf
+from .pdf_cache import cache_key, get_cache, get_or_render, linearize_enabled
+from .nda import (
+    nda_answers, nda_contact, nda_contact_emails, nda_value_map, queue_linearize, save_nda_answers,
+)
+from .pagination import keyset_page
+from .pdf_nda import fill_nda_pdf, finalize_signed_pdf
+from .ranges import (
+    RangeNotSatisfiable, iter_file_range, iter_parts_range, make_partial, not_satisfiable, requested_range,
+)
+from .search import search_emails
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.clickjacking import xframe_options_sameorigin
 
-from .models import InboundEmail
+from .archive import load_bodies
+from .models import LEAD_SOURCES, NDA_ANSWER_FIELDS, InboundEmail
+from . import metrics
+from .metrics import render_prometheus
 from .parsing import parse_email_with_deepseek
 from .ghl import sync_contact_to_ghl, on_nda_signed
 
 logger = logging.getLogger(__name__)
 
+EST = ZoneInfo('America/New_York')
+
+# NDA contacts page: rows per page and the only columns it reads
+NDA_CONTACTS_PAGE_SIZE = 100
+NDA_CONTACT_COLUMNS = ('id', 'ghl_contact_id', 'listing_id', 'listing_name', 'name', 'phone', 'email', 'received_at')
+
+# Email list: rows per page and the only columns it reads
+EMAIL_LIST_PAGE_SIZE = 100
+EMAIL_LIST_COLUMNS = ('id', 'from_address', 'to_address', 'subject', 'received_at', 'lead_source', 'ghl_contact_id')
+
 # SendGrid Inbound Parse form field names
 FIELDS = (
     'from', 'to', 'cc', 'subject', 'text', 'html',
@@ -365,15 +390,68 @@ def process_inbound_email(payload, request):
         logger.exception('DeepSeek parsing failed for email id=%s: %s', email.pk, e)
 
 
+def _email_list_filters(params):
+    """
+    Validated filters from GET params: q (search text), lead_source, synced ('yes'/'no'),
+    date_from and date_to (YYYY-MM-DD, inclusive, in the current time zone). Invalid values are dropped.
+    """
+    filters = {}
+    if params.get('q', '').strip():
+        filters['q'] = params['q'].strip()[:200]
+    if params.get('lead_source') in LEAD_SOURCES:
+        filters['lead_source'] = params['lead_source']
+    if params.get('synced') in ('yes', 'no'):
+        filters['synced'] = params['synced']
+    for name in ('date_from', 'date_to'):
+        try:
+            filters[name] = datetime.strptime(params.get(name, ''), '%Y-%m-%d').date()
+        except ValueError:
+            pass
+    return filters
+
+
+def _filter_emails(queryset, filters):
+    if 'q' in filters:
+        queryset = search_emails(queryset, filters['q'])
+    if 'lead_source' in filters:
+        queryset = queryset.filter(lead_source=filters['lead_source'])
+    if filters.get('synced') == 'yes':
+        queryset = queryset.exclude(ghl_contact_id='')
+    elif filters.get('synced') == 'no':
+        queryset = queryset.filter(ghl_contact_id='')
+    if 'date_from' in filters:
+        start = datetime.combine(filters['date_from'], datetime.min.time())
+        queryset = queryset.filter(received_at__gte=django_tz.make_aware(start))
+    if 'date_to' in filters:
+        end = datetime.combine(filters['date_to'] + timedelta(days=1), datetime.min.time())
+        queryset = queryset.filter(received_at__lt=django_tz.make_aware(end))
+    return queryset
+
+
 def email_list(request):
-    """Display list of received emails."""
-    emails = InboundEmail.objects.all()[:100]
-    return render(request, 'inbound/email_list.html', {'emails': emails})
+    """
+    Display list of received emails, newest first, with optional full-text search (?q=,
+    see inbound.search) and filters (?lead_source=, ?synced=yes|no, ?date_from=, ?date_to=). Paginated by cursor
+    (?after=...) and reading only the list columns, so each page costs the same.
+    """
+    filters = _email_list_filters(request.GET)
+    emails = _filter_emails(InboundEmail.objects.only(*EMAIL_LIST_COLUMNS), filters)
+    page, next_cursor = keyset_page(emails, request.GET.get('after'), EMAIL_LIST_PAGE_SIZE)
+    # Query strings for the pager links, keeping the active filters
+    filter_params = {k: (v.isoformat() if hasattr(v, 'isoformat') else v) for k, v in filters.items()}
+    return render(request, 'inbound/email_list.html', {
+        'emails': page,
+        'filters': filter_params,
+        'lead_sources': LEAD_SOURCES,
+        'first_page_query': urlencode(filter_params),
+        'next_page_query': urlencode({**filter_params, 'after': next_cursor}) if next_cursor else '',
+        'is_first_page': not request.GET.get('after'),
+    })
 
 
 def email_detail(request, pk):
-    """Display a single received email."""
-    email = get_object_or_404(InboundEmail, pk=pk)
+    """Display a single received email (archived bodies are read back from their segment file)."""
+    email = load_bodies(get_object_or_404(InboundEmail, pk=pk))
     return render(request, 'inbound/email_detail.html', {'email': email})
 
 
@@ -381,26 +459,18 @@ def nda_contacts_list(request):
     """
     List all available NDA pages: contacts that have ghl_contact_id, listing_id, and phone.
     One entry per (contact_id, listing_id); most recent email used for listing_name, created, name.
+    Deduplicated in SQL and paginated by cursor (?after=...), so each page costs the same.
     """
-    emails = InboundEmail.objects.filter(
-        ghl_contact_id__gt='',
-        listing_id__gt='',
-        phone__gt='',
-    ).order_by('-received_at')
-    seen = set()
+    emails = nda_contact_emails().only(*NDA_CONTACT_COLUMNS)
+    page, next_cursor = keyset_page(emails, request.GET.get('after'), NDA_CONTACTS_PAGE_SIZE)
     nda_entries = []
-    for e in emails:
-        key = (e.ghl_contact_id, e.listing_id)
-        if key in seen:
-            continue
-        seen.add(key)
+    for e in page:
         # Format created time in EST
         if e.received_at:
-            est = ZoneInfo('America/New_York')
             dt = e.received_at
             if dt.tzinfo is None:
                 dt = django_tz.make_aware(dt, django_tz.utc)
-            created_str = dt.astimezone(est).strftime('%Y-%m-%d %H:%M EST')
+            created_str = dt.astimezone(EST).strftime('%Y-%m-%d %H:%M EST')
         else:
             created_str = ''
         nda_entries.append({
@@ -412,50 +482,28 @@ def nda_contacts_list(request):
             'phone': e.phone or '',
             'email': e.email or '',
         })
-    return render(request, 'inbound/nda_contacts.html', {'nda_entries': nda_entries})
+    return render(request, 'inbound/nda_contacts.html', {
+        'nda_entries': nda_entries,
+        'next_cursor': next_cursor,
+        'is_first_page': not request.GET.get('after'),
+    })
 
 
-def _nda_pdf_response(contact_id, request):
-    """Build filled PDF bytes from contact and request GET params."""
-    def _get(key, default=''):
-        return request.GET.get(key, default) or default
-    contact = InboundEmail.objects.filter(ghl_contact_id=contact_id).order_by('-received_at').first()
-    extra = (contact.raw_parsed or {}) if contact else {}
-    return fill_nda_pdf(
-        contact_id=contact_id,
-        listing_id=(contact.listing_id if contact else '') or _get('listing_id'),
-        listing_name=(contact.listing_name if contact else '') or _get('listing_name'),
-        name=(contact.name if contact else '') or _get('name'),
-        email=(contact.email if contact else '') or _get('email'),
-        phone=(contact.phone if contact else '') or _get('phone'),
-        ref_id=(contact.ref_id if contact else '') or _get('ref_id'),
-        street_address=extra.get('street_address', '') or _get('street_address'),
-        city=extra.get('city', '') or _get('city'),
-        state=extra.get('state', '') or _get('state'),
-        zip_code=extra.get('zip', '') or _get('zip_code'),
-        signature=extra.get('signature', '') or _get('signature'),
-        will_manage=extra.get('will_manage', '') or _get('will_manage'),
-        other_deciders=extra.get('other_deciders', '') or _get('other_deciders'),
-        industry_experience=extra.get('industry_experience', '') or _get('industry_experience'),
-        timeframe=(contact.purchase_timeframe if contact else '') or _get('purchase_timeframe'),
-        liquid_assets=extra.get('liquid_assets', '') or _get('liquid_assets'),
-        real_estate=extra.get('real_estate', '') or _get('real_estate'),
-        retirement_401k=extra.get('retirement_401k', '') or _get('retirement_401k'),
-        funds_for_business=(contact.amount_to_invest if contact else '') or _get('funds_for_business'),
-        partner_name=(contact.lead_message if contact else '') or _get('partner_name'),
-        using=extra.get('using', '') or _get('using'),
-        govt_affiliation=extra.get('govt_affiliation', '') or _get('govt_affiliation'),
-        govt_explain=extra.get('govt_explain', '') or _get('govt_explain'),
-    )
+def _nda_value_map(contact_id, request):
+    """Resolve the NDA form field values from contact and request GET params (no rendering)."""
+    contact, answers, _ = nda_contact(contact_id)
+    return nda_value_map(contact_id, contact, request.GET, answers)
 
 
-def _save_signed_nda_to_static(contact_id, contact):
+def _save_signed_nda_to_static(contact_id, contact, answers=None):
     """
-    Generate filled NDA PDF from contact and save to inbound/static/inbound/nda_signed/.
-    Returns the saved file path (relative) or None on failure.
+    Generate filled NDA PDF from contact and its NDA answers and save to
+    inbound/static/inbound/nda_signed/. Returns the saved file path (relative) or None on failure.
     """
     logger.info("[NDA] _save_signed_nda_to_static started: contact_id=%s", contact_id)
-    extra = (contact.raw_parsed or {}) if contact else {}
+    if answers is None:
+        answers = nda_answers(contact_id, contact.listing_id) if contact else {}
+    extra = answers
     try:
         pdf_bytes = fill_nda_pdf(
             contact_id=contact_id,
@@ -478,7 +526,7 @@ def _save_signed_nda_to_static(contact_id, contact):
             real_estate=extra.get('real_estate', ''),
             retirement_401k=extra.get('retirement_401k', ''),
             funds_for_business=extra.get('funds_for_business', '') or (contact.amount_to_invest if contact else '') or '',
-            partner_name=(contact.lead_message if contact else '') or '',
+            partner_name=extra.get('partner_name', ''),
             using=extra.get('using', ''),
             govt_affiliation=extra.get('govt_affiliation', ''),
             govt_explain=extra.get('govt_explain', ''),
@@ -490,6 +538,15 @@ def _save_signed_nda_to_static(contact_id, contact):
         logger.exception("Failed to generate NDA PDF for save: %s", e)
         return None
 
+    if getattr(settings, 'NDA_SIGNED_FINALIZE', True):
+        try:
+            filled_size = len(pdf_bytes)
+            pdf_bytes = finalize_signed_pdf(pdf_bytes)
+            logger.info("[NDA] Finalized signed NDA: %s -> %s bytes (%.0f%% smaller)", filled_size,
+                        len(pdf_bytes), 100.0 * (1 - len(pdf_bytes) / filled_size) if filled_size else 0)
+        except Exception as e:
+            logger.exception("Failed to finalize signed NDA; saving the editable copy: %s", e)
+
     save_dir = Path(settings.BASE_DIR) / "inbound" / "static" / "inbound" / "nda_signed"
     save_dir.mkdir(parents=True, exist_ok=True)
     safe_id = re.sub(r'[^\w\-]', '_', str(contact_id))[:80]
@@ -504,7 +561,7 @@ def _save_signed_nda_to_static(contact_id, contact):
         # Upload to contact in GHL + add NDA_Signed tag
         logger.info("[NDA] Calling on_nda_signed: contact_id=%s file=%s", contact_id, filename)
         try:
-            on_nda_signed(contact_id, contact, str(filepath), filename)
+            on_nda_signed(contact_id, contact, str(filepath), filename, answers=answers)
         except Exception as err:
             logger.exception("GHL NDA post-sign actions failed (local save succeeded): %s", err)
         return f"inbound/nda_signed/{filename}"
@@ -517,8 +574,7 @@ def nda_page(request, contact_id):
     """
     Main NDA URL: HTML viewer with embedded PDF and footer bar (Requirements left + Next Req).
     """
-    contact = InboundEmail.objects.filter(ghl_contact_id=contact_id).order_by('-received_at').first()
-    context = _nda_form_context(contact_id, contact)
+    contact, _, context = nda_contact(contact_id)
     if not contact and request.method == 'GET':
         context['listing_id'] = request.GET.get('listing_id', '') or context.get('listing_id', '')
         context['listing_name'] = request.GET.get('listing_name', '') or context.get('listing_name', '')
@@ -533,6 +589,8 @@ def nda_signed_pdf(request, filename):
     """
     Serve a signed NDA PDF file. Used for public links saved to GHL.
     Replaces static URL so it works without static file serving.
+    The file is streamed from disk (never read into memory) with ETag / Last-Modified
+    validators and Range support; with NDA_SIGNED_SENDFILE the web server sends the bytes.
     """
     if not filename or not filename.endswith('.pdf') or '..' in filename or '/' in filename:
         return HttpResponse('Invalid filename', status=400)
@@ -540,29 +598,148 @@ def nda_signed_pdf(request, filename):
         return HttpResponse('Invalid filename format', status=400)
     save_dir = Path(settings.BASE_DIR) / "inbound" / "static" / "inbound" / "nda_signed"
     filepath = save_dir / filename
-    if not filepath.exists() or not filepath.is_file():
-        return HttpResponse('File not found', status=404)
     try:
-        pdf_bytes = filepath.read_bytes()
+        st = filepath.stat()
     except OSError:
-        return HttpResponse('Error reading file', status=500)
-    resp = HttpResponse(pdf_bytes, content_type='application/pdf')
+        return HttpResponse('File not found', status=404)
+    if not stat.S_ISREG(st.st_mode):
+        return HttpResponse('File not found', status=404)
+    etag = quote_etag(f"{st.st_mtime_ns:x}-{st.st_size:x}")
+    last_modified = http_date(st.st_mtime)
+    not_modified = get_conditional_response(request, etag=etag, last_modified=int(st.st_mtime))
+    if not_modified is not None:
+        return not_modified
+
+    sendfile = (getattr(settings, 'NDA_SIGNED_SENDFILE', '') or '').lower()
+    if sendfile == 'x-accel-redirect':
+        # nginx serves the file (and Range requests) from an internal location
+        resp = HttpResponse(content_type='application/pdf')
+        resp['X-Accel-Redirect'] = f"{settings.NDA_SIGNED_ACCEL_PREFIX.rstrip('/')}/{filename}"
+    elif sendfile == 'x-sendfile':
+        resp = HttpResponse(content_type='application/pdf')
+        resp['X-Sendfile'] = str(filepath)
+    else:
+        try:
+            byte_range = requested_range(request, st.st_size, etag=etag, last_modified=last_modified)
+        except RangeNotSatisfiable:
+            return not_satisfiable(st.st_size)
+        try:
+            f = open(filepath, 'rb')
+        except OSError:
+            return HttpResponse('Error reading file', status=500)
+        if byte_range is None:
+            resp = FileResponse(f, content_type='application/pdf')
+        else:
+            resp = make_partial(
+                StreamingHttpResponse(iter_file_range(f, *byte_range), content_type='application/pdf'),
+                *byte_range, st.st_size,
+            )
+        resp['Accept-Ranges'] = 'bytes'
     resp['Content-Disposition'] = f'inline; filename="{filename}"'
+    resp['ETag'] = etag
+    resp['Last-Modified'] = last_modified
+    # Personal documents: only the recipient's browser may keep a copy, never shared proxies or CDNs
+    resp['Cache-Control'] = f"private, max-age={getattr(settings, 'NDA_SIGNED_CACHE_MAX_AGE', 3600)}"
     return resp
 
 
 @xframe_options_sameorigin
 def nda_pdf_stream(request, contact_id):
-    """Return raw PDF bytes for embedding in viewer iframe."""
+    """
+    Return raw PDF bytes for embedding in viewer iframe.
+    The ETag is a hash of the field values and template version; repeat loads with a
+    matching If-None-Match get 304, and renders are reused from pdf_cache.
+    With NDA_PDF_LINEARIZE the linearized copy is served once a background job has cached
+    it (its own key and ETag); until then, or if qpdf fails, the plain PDF is served.
+    Single Range requests always get 206, but only the linearized copy advertises
+    Accept-Ranges, which switches PDF.js to range loading: for the plain file a full
+    download reaches page 1 sooner (bench_nda_first_page).
+    """
+    value_map = _nda_value_map(contact_id, request)
     try:
-        pdf_bytes = _nda_pdf_response(contact_id, request)
+        key = cache_key(value_map)
+        linearized_key = cache_key(value_map, linearized=True) if linearize_enabled() else None
     except FileNotFoundError:
         return HttpResponse('NDA template not found.', status=404)
-    resp = HttpResponse(pdf_bytes, content_type='application/pdf')
+    for candidate in filter(None, (linearized_key, key)):
+        not_modified = get_conditional_response(request, etag=quote_etag(candidate))
+        if not_modified is not None:
+            metrics.NDA_PDF_CACHE_REQUESTS.inc(result='not_modified')
+            not_modified['Cache-Control'] = 'private, no-cache'
+            return not_modified
+    parts = get_cache().get(linearized_key) if linearized_key else None
+    if parts is not None:
+        metrics.NDA_PDF_CACHE_REQUESTS.inc(result='hit')
+        key = linearized_key
+    else:
+        try:
+            _, parts = get_or_render(value_map, key)
+        except FileNotFoundError:
+            return HttpResponse('NDA template not found.', status=404)
+        if linearized_key:
+            queue_linearize(value_map, linearized_key)
+    etag = quote_etag(key)
+    size = sum(len(p) for p in parts)
+    try:
+        byte_range = requested_range(request, size, etag=etag)
+    except RangeNotSatisfiable:
+        return not_satisfiable(size)
+    if byte_range is None:
+        # Stream the chunks as-is: in incremental fill mode the first one is the shared template bytes
+        resp = StreamingHttpResponse(iter(parts), content_type='application/pdf')
+        resp['Content-Length'] = str(size)
+    else:
+        resp = make_partial(
+            StreamingHttpResponse(iter_parts_range(parts, *byte_range), content_type='application/pdf'),
+            *byte_range, size,
+        )
+    if key == linearized_key:
+        resp['Accept-Ranges'] = 'bytes'
     resp['Content-Disposition'] = 'inline; filename="NDA.pdf"'
+    resp['ETag'] = etag
+    # Let the browser keep the PDF but revalidate each load (answered with 304 when unchanged)
+    resp['Cache-Control'] = 'private, no-cache'
     return resp
 
 
+# InboundEmail columns the NDA form may edit (the lead's lead_message is never touched)
+NDA_CONTACT_FIELDS = (
+    'ref_id', 'listing_id', 'listing_name', 'name', 'email', 'phone', 'purchase_timeframe', 'amount_to_invest',
+)
+
+
+def _save_nda_values(contact_id, values):
+    """
+    Apply posted NDA values ({key: stripped str}): contact fields go to the latest
+    InboundEmail for contact_id, saving only the columns that changed (a new row when
+    there is none); answers go to its NdaSubmission. Returns (contact, answers).
+    """
+    updates = {key: values[key] for key in NDA_CONTACT_FIELDS if key in values}
+    if 'cell' in values and 'phone' not in values:
+        updates['phone'] = values['cell']
+    if 'timeframe' in values and 'purchase_timeframe' not in values:
+        updates['purchase_timeframe'] = values['timeframe']
+    contact = InboundEmail.objects.filter(ghl_contact_id=contact_id).order_by('-received_at').first()
+    if contact is None:
+        contact = InboundEmail(
+            ghl_contact_id=contact_id,
+            from_address=values.get('email') or 'nda@local',
+            subject='NDA',
+            **updates,
+        )
+        contact.save()
+    else:
+        changed = [key for key, value in updates.items() if getattr(contact, key) != value]
+        for key in changed:
+            setattr(contact, key, updates[key])
+        if changed:
+            contact.save(update_fields=changed)
+    answers = save_nda_answers(
+        contact_id, contact.listing_id, {key: values[key] for key in NDA_ANSWER_FIELDS if key in values},
+    )
+    return contact, answers
+
+
 def nda_save(request, contact_id):
     """POST: save fillable field values. Accepts application/json (from PDF.js form) or form data."""
     logger.info("[NDA] nda_save called: contact_id=%s method=%s content_type=%s", contact_id, request.method, request.content_type)
@@ -574,139 +751,30 @@ def nda_save(request, contact_id):
             data = json.loads(request.body.decode('utf-8'))
         except (ValueError, UnicodeDecodeError):
             return JsonResponse({'ok': False, 'error': 'Invalid JSON'}, status=400)
-        def get(key, alt=None):
-            v = data.get(key) or (data.get(alt) if alt else None)
-            if v is None:
-                return ''
-            return (v.strip() if isinstance(v, str) else str(v).strip())
-        contact = InboundEmail.objects.filter(ghl_contact_id=contact_id).order_by('-received_at').first()
-        contact = contact or InboundEmail(
-            ghl_contact_id=contact_id,
-            from_address=get('email') or 'nda@local',
-            subject='NDA',
-        )
-        for key in (
-            'ref_id', 'listing_id', 'listing_name', 'name', 'email', 'phone',
-            'purchase_timeframe', 'amount_to_invest', 'lead_message',
-        ):
-            if key in data:
-                setattr(contact, key, get(key))
-        if 'partner_name' in data:
-            contact.lead_message = get('partner_name')
-        if 'cell' in data and 'phone' not in data:
-            contact.phone = get('cell')
-        extra = contact.raw_parsed or {}
-        extra_keys = (
-            'signature', 'street_address', 'city', 'state', 'zip',
-            'will_manage', 'other_deciders', 'industry_experience', 'govt_affiliation', 'govt_explain',
-            'liquid_assets', 'real_estate', 'retirement_401k', 'funds_for_business', 'using',
-        )
-        for key in extra_keys:
-            if key in data:
-                extra[key] = get(key)
-        if 'timeframe' in data and 'purchase_timeframe' not in data:
-            contact.purchase_timeframe = get('timeframe')
-        contact.raw_parsed = extra
-        contact.save()
+        if not isinstance(data, dict):
+            return JsonResponse({'ok': False, 'error': 'Invalid JSON'}, status=400)
+        values = {
+            key: '' if v is None else (v.strip() if isinstance(v, str) else str(v).strip())
+            for key, v in data.items()
+        }
+        contact, answers = _save_nda_values(contact_id, values)
         logger.info("[NDA] Calling _save_signed_nda_to_static (JSON branch)")
-        _save_signed_nda_to_static(contact_id, contact)
+        _save_signed_nda_to_static(contact_id, contact, answers)
         return JsonResponse({'ok': True, 'received_keys': list(data.keys())})
 
     # Form POST (fallback)
-    contact = InboundEmail.objects.filter(ghl_contact_id=contact_id).order_by('-received_at').first()
-    contact = contact or InboundEmail(
-        ghl_contact_id=contact_id,
-        from_address=request.POST.get('email', '') or 'nda@local',
-        subject='NDA',
-    )
-    for key in (
-        'ref_id', 'listing_id', 'listing_name', 'name', 'email', 'phone',
-        'purchase_timeframe', 'amount_to_invest', 'lead_message',
-    ):
-        if key in request.POST:
-            setattr(contact, key, request.POST.get(key, '').strip())
-    if 'partner_name' in request.POST:
-        contact.lead_message = request.POST.get('partner_name', '').strip()
-    extra = contact.raw_parsed or {}
-    extra_keys = (
-        'signature', 'street_address', 'city', 'state', 'zip',
-        'will_manage', 'other_deciders', 'industry_experience', 'govt_affiliation', 'govt_explain',
-        'liquid_assets', 'real_estate', 'retirement_401k', 'funds_for_business', 'using',
-    )
-    for key in extra_keys:
-        if key in request.POST:
-            extra[key] = request.POST.get(key, '').strip()
-    if 'timeframe' in request.POST and 'purchase_timeframe' not in request.POST:
-        contact.purchase_timeframe = request.POST.get('timeframe', '').strip()
-    contact.raw_parsed = extra
-    contact.save()
+    values = {key: request.POST.get(key, '').strip() for key in request.POST}
+    contact, answers = _save_nda_values(contact_id, values)
     logger.info("[NDA] Calling _save_signed_nda_to_static (form POST branch)")
-    _save_signed_nda_to_static(contact_id, contact)
+    _save_signed_nda_to_static(contact_id, contact, answers)
     url = reverse('inbound:nda_page', kwargs={'contact_id': contact_id})
     return redirect(url + '?saved=1')
 
 
-# Required NDA fields for "Requirements left" count (empty = 1 requirement)
-NDA_REQUIRED_FIELDS = ('name', 'email', 'phone', 'ref_id', 'listing_id', 'listing_name', 'signature')
-
-
-def _nda_form_context(contact_id, contact):
-    """Build context for NDA form page from contact (or empty)."""
-    if not contact:
-        return {
-            'contact_id': contact_id,
-            'contact': None,
-            'ref_id': '',
-            'listing_id': '',
-            'listing_name': '',
-            'name': '',
-            'email': '',
-            'phone': '',
-            'signature': '',
-            'street_address': '',
-            'city': '',
-            'state': '',
-            'zip': '',
-            'purchase_timeframe': '',
-            'amount_to_invest': '',
-            'lead_message': '',
-            'will_manage': '',
-            'other_deciders': '',
-            'industry_experience': '',
-            'govt_affiliation': '',
-            'govt_explain': '',
-            'requirements_count': len(NDA_REQUIRED_FIELDS),
-        }
-    extra = contact.raw_parsed or {}
-    data = {
-        'contact_id': contact_id,
-        'contact': contact,
-        'ref_id': contact.ref_id or '',
-        'listing_id': contact.listing_id or '',
-        'listing_name': contact.listing_name or '',
-        'name': contact.name or '',
-        'email': contact.email or '',
-        'phone': contact.phone or '',
-        'signature': extra.get('signature', ''),
-        'street_address': extra.get('street_address', ''),
-        'city': extra.get('city', ''),
-        'state': extra.get('state', ''),
-        'zip': extra.get('zip', ''),
-        'purchase_timeframe': contact.purchase_timeframe or '',
-        'amount_to_invest': contact.amount_to_invest or '',
-        'lead_message': contact.lead_message or '',
-        'will_manage': extra.get('will_manage', ''),
-        'other_deciders': extra.get('other_deciders', ''),
-        'industry_experience': extra.get('industry_experience', ''),
-        'govt_affiliation': extra.get('govt_affiliation', ''),
-        'govt_explain': extra.get('govt_explain', ''),
-    }
-    # Count how many required fields are still empty
-    count = 0
-    for key in NDA_REQUIRED_FIELDS:
-        if not (data.get(key) or '').strip():
-            count += 1
-    data['requirements_count'] = count
-    return data
-
-
+@require_http_methods(['GET'])
+def prometheus_metrics(request):
+    """Expose in-process metrics (GHL call counts, latency, NDA caches) in Prometheus text format."""
+    token = getattr(settings, 'METRICS_TOKEN', '') or ''
+    if token and request.headers.get('Authorization', '') != f'Bearer {token}':
+        return HttpResponse('Unauthorized', status=401)
+    return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')